@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""Per subtest overhead of the unittest and native runners.
+
+Subtests are run by a function neither putting nor getting a PV, so that
+only the runner is measured, for successful and failing subtests. Usage:
+
+    python benchmarks/runner_overhead.py [NB_SUBTESTS]
+"""
+
+import logging
+import sys
+import time
+import unittest
+from queue import Queue
+from unittest import mock
+
+from wetest.testing.generator import TestData, test_generator
+from wetest.testing.runner import NativeRunner
+from wetest.testing.selectable_tests import SelectableTestCase
+from wetest.testing.selectable_tests import SelectableTestResult, SelectableTestSuite
+
+
+class BenchmarkTestCase(SelectableTestCase):
+    """Subtests of the benchmark."""
+
+    test_data = {}
+    func_backup = {}
+
+
+def succeed(test_case, test_data, result):
+    test_data.elapsed = 0.0
+    test_data.exception = None
+
+
+def fail(test_case, test_data, result):
+    test_data.elapsed = 0.0
+    test_data.exception = AssertionError("Expected RB to be 1, but got 2")
+    raise test_data.exception
+
+
+def make_suite(nb_subtests):
+    """Returns a SelectableTestSuite of nb_subtests subtests without PV access."""
+    BenchmarkTestCase.test_data.clear()
+    BenchmarkTestCase.func_backup.clear()
+    suite = SelectableTestSuite()
+    for idx in range(nb_subtests):
+        test_data = TestData(
+            test_title="benchmark",
+            subtest_title=str(idx),
+            test_id="test-0-0-%d" % idx,
+            on_failure="continue",
+            getter="RB",
+            get_value=1,
+        )
+        test_func, test_data = test_generator(test_data)
+        BenchmarkTestCase.add_test(test_data, test_func)
+        suite.add_selected_test(BenchmarkTestCase, test_data.id)
+    return suite
+
+
+def run_unittest(suite):
+    runner = unittest.TextTestRunner(
+        resultclass=SelectableTestResult, verbosity=0, stream=open("/dev/null", "w")
+    )
+    return runner.run(suite)
+
+
+def run_native(suite):
+    return NativeRunner().run(suite)
+
+
+def main(nb_subtests):
+    # queues of a run without GUI nor manager
+    SelectableTestResult.queue_to_gui = Queue()
+    SelectableTestResult.queue_to_runner = Queue()
+    SelectableTestResult.queue_to_pm = Queue()
+    logging.disable(logging.CRITICAL)
+
+    print("%d subtests, overhead per subtest:" % nb_subtests)
+    for run_test_data in [succeed, fail]:
+        for name, run in [("unittest", run_unittest), ("native", run_native)]:
+            suite = make_suite(nb_subtests)
+            with mock.patch(
+                "wetest.testing.generator.run_test_data", run_test_data
+            ), mock.patch("wetest.testing.runner.run_test_data", run_test_data):
+                start_time = time.time()
+                result = run(suite)
+                elapsed = time.time() - start_time
+            assert result.testsRun == nb_subtests
+            print(
+                "    %-8s  %-7s  %7.1f us"
+                % (name, run_test_data.__name__, elapsed / nb_subtests * 1e6)
+            )
+            SelectableTestResult.queue_to_gui = Queue()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
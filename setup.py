@@ -46,7 +46,10 @@ setup(
     package_data={"wetest": ["resources/*", "resources/icons/*", "resources/logo/*"]},
     install_requires=reqs,
     entry_points={
-        "console_scripts": ["wetest=wetest.command_line:main"],
+        "console_scripts": [
+            "wetest=wetest.command_line:main",
+            "wetest-sim=wetest.pvs.sim:main",
+        ],
     },
     zip_safe=False,
 )
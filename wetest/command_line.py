@@ -13,6 +13,7 @@
 # OR REDISTRIBUTION OF THIS SOFTWARE.
 
 from wetest.testing.reader import (
+    IncludeLoader,
     MacrosManager,
     ScenarioReader,
     FileNotFound,
@@ -22,10 +23,14 @@ from wetest.testing.selectable_tests import (
     SelectableTestSuite,
     SelectableTestResult,
 )
+from wetest.testing.bundle import BundleError, is_bundle, write_bundle
+from wetest.testing.bundle import gc_paused, read_bundle, outdated_sources
+from wetest.testing.cache import ScenarioCache
 from wetest.testing.generator import TestsGenerator
 from wetest.pvs.db_parser import pvs_from_path
 from wetest.pvs.naming import generate_naming, NamingError
-from wetest.pvs.core import PVsTable
+from wetest.pvs.core import PVsTable, CONNECTION_TIMEOUT
+from wetest.pvs.enexar import enexar_logger
 
 from wetest.gui.generator import GUIGenerator
 from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
@@ -48,6 +53,12 @@ DESCRIPTION = """WeTest is a testing facility for EPICS modules. Tests are descr
 YAML file, and executed over the Channel Access using pyepics library.
 A PDF report is generated with the tests results.
 It also enables to monitor PVs (extracted from the tests and from specified DB).
+Scenario files can be compiled ahead of runs, see `wetest compile --help`.
+"""
+
+COMPILE_DESCRIPTION = """Read, validate and create the tests of scenario files once,
+into a bundle that `wetest BUNDLE_FILE` runs without reading the scenario files
+again, unless they changed since.
 """
 
 
@@ -71,6 +82,7 @@ PREFIX = ""
 DELAY = 1
 FILE_PREFIX = "TEST-wetest.testing.generator.TestsSequence-"
 OUTPUT_DIR = "/tmp/"
+BUNDLE_OUTPUT = "wetest-suite.bundle"
 
 
 class ListStream(list):
@@ -87,41 +99,71 @@ class ListStream(list):
         pass
 
 
-def generate_tests(scenarios, macros_mgr=None, propagate=False):
-    """Create a test suite from a YAML file (suite or scenario).
+def read_tests(scenarios, macros_mgr=None, propagate=False, cache=None):
+    """Read tests from YAML files (suite or scenario), without a suite.
 
     :param scenario_file: A list of YAML scenario file path.
     :param macros_mgr:    MacrosManager with macros already defined
+    :param cache:         ScenarioCache of files already read, if any
 
-    :returns suite:       A unittest TestSuite object.
-    :returns configs:     Scenarios config blocks.
+    :returns title:        The suite name.
+    :returns generators:   A TestsGenerator per scenario.
+    :returns dependencies: Content hash of the files read and their includes.
     """
-    suite = SelectableTestSuite()
+    # parse files included several times once
+    loader = IncludeLoader()
 
     # get data from scenarios
     # read the first file
-    tests_data = ScenarioReader(
-        scenarios.pop(0), macros_mgr=macros_mgr, propagate=propagate
-    ).get_deserialized()
+    reader = ScenarioReader(
+        scenarios.pop(0),
+        macros_mgr=macros_mgr,
+        propagate=propagate,
+        cache=cache,
+        loader=loader,
+    )
+    dependencies = dict(reader.dependencies)
+    tests_data = reader.get_deserialized()
     if "scenarios" not in tests_data:
         tests_data["scenarios"] = []
     # append scenario from remaining files
     for scenario in scenarios:
-        new_tests_data = ScenarioReader(
-            scenario, macros_mgr=macros_mgr, propagate=propagate
-        ).get_deserialized()
-        tests_data["scenarios"] += new_tests_data["scenarios"]
+        reader = ScenarioReader(
+            scenario,
+            macros_mgr=macros_mgr,
+            propagate=propagate,
+            cache=cache,
+            loader=loader,
+        )
+        dependencies.update(reader.dependencies)
+        tests_data["scenarios"] += reader.get_deserialized()["scenarios"]
 
     # Get titles
     # Defaults title when several files from command line.
-    configs = [{"name": "WeTest Suite"}]
+    title = "WeTest Suite"
     # Overwise get top title from first file
     if len(scenarios) == 0 and "name" in tests_data:
-        configs = [{"name": tests_data["name"]}]
+        title = tests_data["name"]
+
+    logger.debug("Generate tests with TestGenerator...")
+    generators = [TestsGenerator(scenario) for scenario in tests_data["scenarios"]]
+
+    return title, generators, dependencies
+
+
+def populate_suite(title, generators):
+    """Create a test suite from the tests of generators.
+
+    :param title:      The suite name.
+    :param generators: A TestsGenerator per scenario.
+
+    :returns suite:       A unittest TestSuite object.
+    :returns configs:     Scenarios config blocks.
+    """
+    suite = SelectableTestSuite()
+    configs = [{"name": title}]
     # and populate TestSuite
-    for idx, scenario in enumerate(tests_data["scenarios"]):
-        logger.debug("Generate tests with TestGenerator...")
-        tests_gen = TestsGenerator(scenario)
+    for idx, tests_gen in enumerate(generators):
         configs.append(tests_gen.get_config())
 
         logger.debug("Append tests to suite...")
@@ -133,22 +175,195 @@ def generate_tests(scenarios, macros_mgr=None, propagate=False):
     logger.warning(
         "Loaded %s tests from `%s`:", suite.countTestCases(), configs[0]["name"]
     )
-    for scenario in tests_data["scenarios"]:
-        if str(scenario["config"]["type"]).lower() == "unit":
+    for config in configs[1:]:
+        if str(config["type"]).lower() == "unit":
             type_str = "unit tests (random)  "
-        elif str(scenario["config"]["type"]).lower() == "functional":
+        elif str(config["type"]).lower() == "functional":
             type_str = "functional (ordered) "
         else:
-            type_str = str(scenario["config"]["type"]) + " (??)"
+            type_str = str(config["type"]) + " (??)"
+        logger.warning("\t- %s `%s`", type_str, config.get("name", "Unnamed"))
+
+    return suite, configs
+
+
+def generate_tests(scenarios, macros_mgr=None, propagate=False, cache=None):
+    """Create a test suite from a YAML file (suite or scenario).
+
+    :param scenario_file: A list of YAML scenario file path.
+    :param macros_mgr:    MacrosManager with macros already defined
+    :param cache:         ScenarioCache of files already read, if any
+
+    :returns suite:       A unittest TestSuite object.
+    :returns configs:     Scenarios config blocks.
+    """
+    title, generators, _ = read_tests(scenarios, macros_mgr, propagate, cache)
+    return populate_suite(title, generators)
+
+
+def load_bundle(bundle_path, cache=None):
+    """Create a test suite from a bundle written by `wetest compile`.
+
+    The scenario files are read again if they changed since compiling it.
+
+    :param bundle_path: Path of the bundle.
+    :param cache:       ScenarioCache of files already read, if any
+
+    :returns suite:       A unittest TestSuite object.
+    :returns configs:     Scenarios config blocks.
+    :returns generation:  The bundle scenario files, macros and propagate.
+    """
+    with gc_paused():
+        bundle = read_bundle(bundle_path)
+        generation = bundle["generation"]
+        changed = outdated_sources(bundle)
+        if not changed:
+            suite, configs = populate_suite(
+                bundle["title"],
+                [
+                    TestsGenerator.from_tests_list(config, tests_list)
+                    for config, tests_list in bundle["scenarios"]
+                ],
+            )
+
+    if changed:
         logger.warning(
-            "\t- %s `%s`", type_str, scenario["config"].get("name", "Unnamed")
+            "Files changed since `%s` was compiled, reading scenario files:\n\t-%s",
+            bundle_path,
+            "\n\t-".join(changed),
+        )
+        suite, configs = generate_tests(
+            scenarios=list(generation["scenarios"]),
+            macros_mgr=MacrosManager(known_macros=generation["macros"]),
+            propagate=generation["propagate"],
+            cache=cache,
         )
+    return suite, configs, generation
 
-    return suite, configs
+
+def parse_macros(macros_args):
+    """CLI macros as a dict.
+
+    :param macros_args: Lists of MACRO=VALUE strings, as given by argparse.
+    """
+    cli_macros = {}
+    if macros_args:
+        # we get a list of list because we enable "append" action mode
+        for macros_list in macros_args:
+            for macro in macros_list:
+                try:
+                    k, v = macro.split("=", 1)
+                    if k in cli_macros:
+                        logger.error(
+                            "`%s` already defined in CLI, using value: %s",
+                            k,
+                            cli_macros[k],
+                        )
+                    else:
+                        cli_macros[k] = v
+                except ValueError:
+                    logger.critical("Could not parse a MACRO=VALUE in %s", macro)
+                    raise
+        logger.info(
+            "using CLI macros:\n%s",
+            "\n".join(["\t%s: %s" % (k, v) for k, v in list(cli_macros.items())]),
+        )
+    return cli_macros
+
+
+def add_macros_arguments(parser):
+    """Add the arguments setting macros to parser."""
+    parser.add_argument(
+        "-m",
+        "--macros",
+        metavar="MACRO=VALUE",
+        type=str,
+        nargs="+",
+        action="append",
+        help="Override macros defined in file.",
+    )
+    parser.add_argument(
+        "--propagate-macros",
+        action="store_true",
+        default=False,
+        help="Macros defined in a file are given to included files. Default behavior is that only macros set on the include line are given to the included file.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Read and validate all scenario files again, instead of reusing"
+        + " those already read with the same macros from ~/.cache/wetest.",
+    )
+
+
+def compile_main(argv):
+    """Entry point of `wetest compile`, writing a bundle of tests."""
+    parser = argparse.ArgumentParser(
+        prog="wetest compile", description=COMPILE_DESCRIPTION
+    )
+    parser.add_argument(
+        "scenario_file",
+        metavar="TEST_FILE",
+        type=str,
+        nargs="+",
+        help="One or several scenario files.",
+    )
+    add_macros_arguments(parser)
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="BUNDLE_FILE",
+        type=str,
+        default=BUNDLE_OUTPUT,
+        help="Specify bundle file name (otherwise defaults to %s)." % BUNDLE_OUTPUT,
+    )
+    args = parser.parse_args(argv)
+
+    scenarios = [os.path.abspath(scenario) for scenario in args.scenario_file]
+    cli_macros = parse_macros(args.macros)
+    try:
+        title, generators, dependencies = read_tests(
+            scenarios=list(scenarios),
+            macros_mgr=MacrosManager(known_macros=cli_macros),
+            propagate=args.propagate_macros,
+            cache=None if args.no_cache else ScenarioCache(),
+        )
+    except FileNotFound as e:
+        logger.error(e)
+        sys.exit(4)
+
+    bundle = write_bundle(
+        args.output,
+        title,
+        generators,
+        dependencies,
+        {
+            "scenarios": scenarios,
+            "macros": cli_macros,
+            "propagate": args.propagate_macros,
+        },
+    )
+    logger.warning(
+        "Compiled %d tests of %d scenarios from `%s`, using %d PVs, into %s",
+        sum(
+            len(subtests)
+            for tests_gen in generators
+            for subtests in tests_gen.tests_list
+            if subtests is not None
+        ),
+        len(generators),
+        title,
+        len(bundle["pvs"]),
+        args.output,
+    )
 
 
 def main():
     """Program's main entry point."""
+    if sys.argv[1:2] == ["compile"]:
+        return compile_main(sys.argv[2:])
+
     logger.info("Launching WeTest...")
 
     # parse arguments
@@ -180,21 +395,7 @@ def main():
         default=[],
         help="One or several scenario files (executed after positional arguments).",
     )
-    parser.add_argument(
-        "-m",
-        "--macros",
-        metavar="MACRO=VALUE",
-        type=str,
-        nargs="+",
-        action="append",
-        help="Override macros defined in file.",
-    )
-    parser.add_argument(
-        "--propagate-macros",
-        action="store_true",
-        default=False,
-        help="Macros defined in a file are given to included files. Default behavior is that only macros set on the include line are given to the included file.",
-    )
+    add_macros_arguments(parser)
 
     # PVs relative arguments
     pvs_group = parser.add_mutually_exclusive_group(required=False)
@@ -214,6 +415,14 @@ def main():
         default=False,
         help="Run withtout monitoring any PVs.",
     )
+    parser.add_argument(
+        "--connection-timeout",
+        metavar="SECONDS",
+        type=float,
+        default=CONNECTION_TIMEOUT,
+        help="Maximum time to wait for the PVs to connect before starting (defaults to %s)."
+        % CONNECTION_TIMEOUT,
+    )
     parser.add_argument(
         "-n",
         "--naming",
@@ -227,6 +436,43 @@ def main():
     parser.add_argument(
         "-G", "--no-gui", action="store_true", default=False, help="Do not open a GUI."
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="Run the tests of unit scenarios N at a time,"
+        + " tests sharing a setter PV still run one at a time (defaults to 1).",
+    )
+    parser.add_argument(
+        "-J",
+        "--scenario-jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="Run up to N scenarios at a time, scenarios sharing a PV"
+        + " still run in order (defaults to 1).",
+    )
+    parser.add_argument(
+        "-w",
+        "--processes",
+        metavar="N",
+        type=int,
+        default=1,
+        help="Run the tests in up to N worker processes, each with its own PV"
+        + " connections, scenarios sharing a PV still run in the same process"
+        + " (defaults to 1, running tests in WeTest process).",
+    )
+    parser.add_argument(
+        "--runner",
+        type=str,
+        default="unittest",
+        choices=["unittest", "native", "async"],
+        help="Run tests with unittest, or call them directly and only keep a"
+        + " one line summary of failures (native), or run them on an asyncio"
+        + " event loop, --jobs tests at a time (async) (defaults to unittest).",
+    )
     auto_play_group = parser.add_mutually_exclusive_group(required=False)
     auto_play_group.add_argument(
         "-p",
@@ -261,6 +507,15 @@ def main():
         help="Do not generate the PDF report with tests results.",
     )
 
+    parser.add_argument(
+        "--latency-output",
+        metavar="JSON_FILE",
+        type=str,
+        default=None,
+        help="Write PV operations latency histograms to a JSON file,"
+        + " refreshed while tests are running.",
+    )
+
     args = parser.parse_args()
 
     logger.info("Processing arguments...")
@@ -294,29 +549,23 @@ def main():
     pvs_from_files = [pv["name"] for pv in pvs_from_db]
 
     # deal with CLI macros
-    cli_macros = {}
-    if args.macros:
-        # we get a list of list because we enable "append" action mode
-        for macros_list in args.macros:
-            for macro in macros_list:
-                try:
-                    k, v = macro.split("=", 1)
-                    if k in cli_macros:
-                        logger.error(
-                            "`%s` already defined in CLI, using value: %s",
-                            k,
-                            cli_macros[k],
-                        )
-                    else:
-                        cli_macros[k] = v
-                except ValueError:
-                    logger.critical("Could not parse a MACRO=VALUE in %s", macro)
-                    raise
-        logger.info(
-            "using CLI macros:\n%s",
-            "\n".join(["\t%s: %s" % (k, v) for k, v in list(cli_macros.items())]),
-        )
+    cli_macros = parse_macros(args.macros)
     macros_mgr = MacrosManager(known_macros=cli_macros)
+    cache = None if args.no_cache else ScenarioCache()
+    generation = {
+        "scenarios": scenarios,
+        "macros": cli_macros,
+        "propagate": args.propagate_macros,
+        "cache": not args.no_cache,
+        "bundle": None,
+    }
+
+    # a single file may be a bundle written by `wetest compile`
+    if len(scenarios) == 1 and is_bundle(scenarios[0]):
+        generation["bundle"] = scenarios[0]
+        if cli_macros or args.propagate_macros:
+            logger.error("Macros of a bundle are set when compiling it.")
+            sys.exit(2)
 
     # file validation logging
     fv_list = ListStream()
@@ -326,13 +575,24 @@ def main():
 
     # generate tests from file
     suite, configs = None, [{"name": "No tests to run"}]
-    if len(scenarios) != 0:
+    if generation["bundle"] is not None:
+        logger.info("Will load tests from bundle: %s", generation["bundle"])
+        try:
+            suite, configs, bundle_generation = load_bundle(
+                generation["bundle"], cache=cache
+            )
+        except (BundleError, FileNotFound) as e:
+            logger.error(e)
+            exit(4)
+        generation.update(bundle_generation)
+    elif len(scenarios) != 0:
         logger.info("Will load tests from files:\n\t-%s", "\n\t-".join(scenarios))
         try:
             suite, configs = generate_tests(
-                scenarios=scenarios,
+                scenarios=list(scenarios),
                 macros_mgr=macros_mgr,
                 propagate=args.propagate_macros,
+                cache=cache,
             )
         except FileNotFound as e:
             logger.error(e)
@@ -349,13 +609,16 @@ def main():
     SelectableTestResult.queue_to_gui = queue_to_gui
     SelectableTestResult.queue_to_pm = queue_to_pm
     SelectableTestResult.queue_to_runner = queue_to_runner
+    enexar_logger.queue_to_gui = queue_to_gui
 
     # monitor PVs
+    pvs_table = None
     if args.no_pv:
         all_connected, pv_refs = True, {}
     else:
-        all_connected, pv_refs = PVsTable(queue_to_gui).register_pvs(
-            pv_list=pvs_from_files, suite=suite
+        pvs_table = PVsTable(queue_to_gui)
+        all_connected, pv_refs = pvs_table.register_pvs(
+            pv_list=pvs_from_files, suite=suite, timeout=args.connection_timeout
         )
 
     # show naming compatibility in CLI
@@ -407,6 +670,12 @@ def main():
         "configs": configs,
         "pdf_output": pdf_output,
         "naming": naming,
+        "latency_output": args.latency_output,
+        "jobs": args.jobs,
+        "scenario_jobs": args.scenario_jobs,
+        "runner": args.runner,
+        "processes": args.processes,
+        "generation": generation,
     }
 
     pm = ProcessManager(data, not with_gui, queue_to_gui, queue_to_pm, queue_to_runner)
@@ -438,6 +707,8 @@ def main():
             queue_to_pm.put(END_OF_GUI)
 
         pm.join()
+        if pvs_table is not None:
+            pvs_table.bus.close()
     except (KeyboardInterrupt, SystemExit):
         pm.terminate()
         logger.error("Aborting WeTest.")
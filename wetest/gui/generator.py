@@ -34,7 +34,8 @@ from wetest.gui.specific import (
     Suite,
 )
 from wetest.gui.base import Tooltip, ImageGif
-from wetest.pvs.core import PVData
+from wetest.pvs.core import PVData, PVStatusBatch
+from wetest.pvs.enexar import AcquisitionFailure, acquisition_failure_text
 from wetest.common.constants import VERBOSE_FORMATTER, FILE_HANDLER
 from wetest.common.constants import (
     SELECTION_FROM_GUI,
@@ -87,13 +88,13 @@ BT_TXT_LEN = 6
 
 
 def reorganise_subtests(tests_infos):
-    """Return the tests_infos sorted by scneario and test numbers"""
+    """Return the ids of tests_infos sorted by scneario and test numbers"""
     output = dict()
 
     # expected subtest id template
     regex = r"test-(?P<sc_id>\d+)-(?P<test_id>\d+)-\d+$"
 
-    for st_id, st_data in list(tests_infos.items()):
+    for st_id in tests_infos:
         match = re.match(regex, st_id)
         if match is None:
             logger.error("unexpected id format: %s" % st_id)
@@ -103,8 +104,8 @@ def reorganise_subtests(tests_infos):
         if sc_id not in output:
             output[sc_id] = dict()
         if test_id not in output[sc_id]:
-            output[sc_id][test_id] = dict()
-        output[sc_id][test_id][st_id] = st_data
+            output[sc_id][test_id] = list()
+        output[sc_id][test_id].append(st_id)
 
     for sc_id in output:
         for test_id in output[sc_id]:
@@ -114,19 +115,11 @@ def reorganise_subtests(tests_infos):
     return output
 
 
-def value_from_subtest(
-    key, test_infos, scenario_id, test_id, subtest_id=None, fallback="VALUE NOT FOUND"
-):
+def value_from_subtest(key, subtest_infos, fallback="VALUE NOT FOUND"):
     """Extract a value corresponding to key in the infos of the subtest.
     Use fallback value if it is not available.
     """
-    if subtest_id is None:
-        value = getattr(
-            list(test_infos[scenario_id][test_id].values())[0], key, fallback
-        )
-    else:
-        value = getattr(test_infos[scenario_id][test_id][subtest_id], key, fallback)
-    return value
+    return getattr(subtest_infos, key, fallback)
 
 
 def file_order_sort(subtest_id):
@@ -239,24 +232,18 @@ class GUIGenerator(object):
             if sc_id not in self.test_infos:
                 sc.add_traceback("UNEXPECTED", "", "No tests in this scenario.")
             for test_id in sorted(self.test_infos.get(sc_id, [])):
-                test_title = value_from_subtest(
-                    "test_title", self.test_infos, sc_id, test_id
-                )
-                test_desc = [
-                    value_from_subtest("test_message", self.test_infos, sc_id, test_id)
-                ]
+                # the infos of subtests of a range are made on each lookup
+                st_ids = self.test_infos[sc_id][test_id]
+                test_infos = self.suite.tests_infos[st_ids[0]]
+                test_title = value_from_subtest("test_title", test_infos)
+                test_desc = [value_from_subtest("test_message", test_infos)]
                 if test_desc[0] is None:
                     test_desc.pop(0)
                 test = sc.add_test(test_title, test_desc)
-                for st_id in sorted(
-                    self.test_infos[sc_id][test_id], key=file_order_sort
-                ):
-                    subtest_title = value_from_subtest(
-                        "desc", self.test_infos, sc_id, test_id, st_id
-                    )
-                    test.add_subtest(
-                        st_id, subtest_title, self.test_infos[sc_id][test_id][st_id]
-                    )
+                for st_id in sorted(st_ids, key=file_order_sort):
+                    st_infos = self.suite.tests_infos[st_id]
+                    subtest_title = value_from_subtest("desc", st_infos)
+                    test.add_subtest(st_id, subtest_title, st_infos)
 
         # if only one scenario for expand it
         if len(self.configs) == 1:
@@ -524,6 +511,9 @@ class GUIGenerator(object):
                     self.report_button["state"] = "normal"
                     EndTestsPopUp(root=self.master, gui=self)
 
+                elif isinstance(update, PVStatusBatch):
+                    self.suite_gui.update_pvs_status(update)
+
                 elif isinstance(update, list) and len(update) == 4:
                     test_id = update[0]
                     test_status = update[1]
@@ -560,6 +550,14 @@ class GUIGenerator(object):
                 elif isinstance(update, PVData):
                     self.suite_gui.update_pv(update)
 
+                elif isinstance(update, AcquisitionFailure):
+                    if update.test_id not in self.subtests_ref:
+                        logger.error("No %s in GUI" % update.test_id)
+                    else:
+                        self.subtests_ref[update.test_id].set_traceback(
+                            acquisition_failure_text(update)
+                        )
+
                 else:
                     logger.critical("Unexpected update in queue.")
                     logger.critical("Received: >%s<", update)
@@ -804,7 +804,9 @@ class SubtestFrame(InfosStatusFrame):
         # initialise attributes
         self.parent_test = parent_test
         self.id = st_id
-        self.test_data = infos
+        # only the PV names are kept, not the infos of a subtest of a range
+        self.setter = infos.setter
+        self.getter = infos.getter
 
         # add self to ids_handles
         ids_handle[self.id] = self
@@ -814,7 +816,7 @@ class SubtestFrame(InfosStatusFrame):
             self,
             parent=parent_widget,
             title=title,
-            infos=build_subtest_desc(st_id, self.test_data),
+            infos=build_subtest_desc(st_id, infos),
             indent=" " * 6,
             status=status,
             dynamic=dynamic,
@@ -839,23 +841,21 @@ class SubtestFrame(InfosStatusFrame):
             ],
         )
         self.popup_menu.add_command(
-            label="copy setter (%s)" % self.test_data.setter,
-            state="disabled" if self.test_data.setter is None else "normal",
-            command=clip_generator(self.test_data.setter),
+            label="copy setter (%s)" % self.setter,
+            state="disabled" if self.setter is None else "normal",
+            command=clip_generator(self.setter),
         )
         self.popup_menu.add_command(
-            label="copy getter (%s)" % self.test_data.getter,
-            state="disabled" if self.test_data.getter is None else "normal",
-            command=clip_generator(self.test_data.getter),
+            label="copy getter (%s)" % self.getter,
+            state="disabled" if self.getter is None else "normal",
+            command=clip_generator(self.getter),
         )
         self.popup_menu.add_command(
             label="copy setter and getter",
             state="disabled"
-            if self.test_data.setter is None or self.test_data.getter is None
+            if self.setter is None or self.getter is None
             else "normal",
-            command=clip_generator(
-                "%s %s" % (self.test_data.setter, self.test_data.getter)
-            ),
+            command=clip_generator("%s %s" % (self.setter, self.getter)),
         )
         self.popup_menu.add_separator()
         self.popup_menu.add_command(
@@ -1443,6 +1443,7 @@ class Suite(tk.Frame):
             ),
         }
         self.pvs_updates = {}
+        self.pvs_data = {}
         self.pvs_need_refreshing = False
         self.pvs_refreshing = False
         self.pvs_frame_placeholder = tk.Frame(self.frame)
@@ -1631,9 +1632,21 @@ class Suite(tk.Frame):
 
     def update_pv(self, pv):
         """Update tested PV list and their infos and status."""
+        self.pvs_data[pv.name] = pv
         self.pvs_updates[pv.name] = pv
         self.pvs_need_refreshing = True
 
+    def update_pvs_status(self, batch):
+        """Update the status of PVs already known, from (name, connected) pairs."""
+        for pv_name, connected in batch:
+            if pv_name not in self.pvs_data:
+                logger.error("No PV %s in GUI", pv_name)
+                continue
+            pv = self.pvs_data[pv_name]
+            pv.connected = connected
+            self.pvs_updates[pv_name] = pv
+        self.pvs_need_refreshing = True
+
     def check_pvs_needs_refreshing(self):
         """Check periodically if need to call self.refresh_pvs"""
         if self.pvs_need_refreshing and not self.pvs_refreshing:
@@ -3,7 +3,12 @@ import unittest
 import logging
 from queue import Queue
 
-from wetest.testing.selectable_tests import SelectableTestResult
+from wetest.testing.selectable_tests import SelectableTestResult, ConcurrentTestSuite
+from wetest.testing.selectable_tests import run_control
+from wetest.testing.runner import NativeRunner
+from wetest.testing.workers import WorkerPool
+from wetest.pvs.core import PVConnection
+from wetest.pvs.enexar import enexar_logger
 from wetest.report.generator import ReportGenerator
 
 from wetest.common.constants import LVL_RUN_CONTROL
@@ -28,6 +33,9 @@ from wetest.common.constants import (
 
 logger = logging.getLogger(__name__)
 
+# Time between two writes of the PV operations latency file (in seconds)
+LATENCY_PERIOD = 5.0
+
 
 def quiet_exception(*args):
     """No traceback will be shown for the provided exceptions."""
@@ -45,16 +53,19 @@ def quiet_exception(*args):
     return decorator
 
 
-def export_pdf(filename, tests, results, configs, naming):
+def export_pdf(filename, tests, results, configs, naming, acquisition_failures=None):
     """Export tests results to PDF file.
 
     :param filename: The PDF filename.
     :param tests:    The ran test case(s).
     :param results:  The test result(s).
     :param configs:   The report's suite and scenario configs.
+    :param acquisition_failures: The ENeXAr AcquisitionFailure, if any.
     """
     logger.info("Results will be exported as PDF...")
-    report = ReportGenerator(tests, results, filename, configs, naming)
+    report = ReportGenerator(
+        tests, results, filename, configs, naming, acquisition_failures
+    )
     report.save()
 
 
@@ -94,6 +105,12 @@ class ProcessManager(object):
         self.pdf_output = args["pdf_output"]
         self.configs = args["configs"]
         self.naming = args["naming"]
+        self.latency_output = args.get("latency_output")
+        self.jobs = args.get("jobs", 1)
+        self.scenario_jobs = args.get("scenario_jobs", 1)
+        self.runner_name = args.get("runner", "unittest")
+        self.processes = args.get("processes", 1)
+        self.generation = args.get("generation")
 
         # trace start request  (to unpause run process)
         self.evt_start = threading.Event()
@@ -181,10 +198,17 @@ class ProcessManager(object):
                 self.update_selection(selected=selection)
 
             logger.info("Running tests suite...")
+            # commands of a previous run
+            run_control().reset()
 
-            self.runner = unittest.TextTestRunner(
-                resultclass=SelectableTestResult, verbosity=0
-            )  # use verbosity for debug
+            if self.runner_name in ["native", "async"] or self.processes > 1:
+                self.runner = NativeRunner()
+                run_test = self.runner.run_test
+            else:
+                self.runner = unittest.TextTestRunner(
+                    resultclass=SelectableTestResult, verbosity=0
+                )  # use verbosity for debug
+                run_test = None
 
             # check that there are tests to run
             logger.info("Nbr tests: %d", self.suite.countTestCases())
@@ -195,20 +219,85 @@ class ProcessManager(object):
                 self.results = []
             else:
                 logger.info("Running %d tests...", nbr_tests)
-                self.results = self.runner.run(self.suite)
+                evt_tests_done = threading.Event()
+                if self.latency_output is not None:
+                    threading.Thread(
+                        target=self.dump_latencies,
+                        args=(evt_tests_done,),
+                        name="dump_latencies",
+                    ).start()
+                suite = self.suite
+                # configs[0] is the suite title, then one config per scenario
+                unit_scenarios = [
+                    idx
+                    for idx, config in enumerate(self.configs[1:])
+                    if str(config.get("type")).lower() == "unit"
+                ]
+                if self.jobs > 1 or self.scenario_jobs > 1:
+                    logger.info(
+                        "Running unit scenarios %s with %d jobs,"
+                        + " up to %d scenarios at a time.",
+                        unit_scenarios,
+                        self.jobs,
+                        self.scenario_jobs,
+                    )
+                if self.runner_name == "async" and self.processes == 1:
+                    # imported here, being Python 3 only
+                    from wetest.testing.aio import AsyncRunner
+
+                    if self.scenario_jobs > 1:
+                        logger.warning(
+                            "Scenarios are run one at a time by the async runner."
+                        )
+                    self.runner = AsyncRunner(self.jobs, unit_scenarios)
+                elif self.processes > 1:
+                    suite = WorkerPool(
+                        self.suite,
+                        self.processes,
+                        self.generation,
+                        self.jobs,
+                        unit_scenarios,
+                        self.scenario_jobs,
+                    )
+                elif self.jobs > 1 or self.scenario_jobs > 1:
+                    suite = ConcurrentTestSuite(
+                        self.suite,
+                        self.jobs,
+                        unit_scenarios,
+                        self.scenario_jobs,
+                        run_test=run_test,
+                    )
+                try:
+                    self.results = self.runner.run(suite)
+                finally:
+                    evt_tests_done.set()
 
             logger.info("Ran tests suite.")
+            logger.info("PV connection pool: %s", PVConnection.pool)
+            logger.info("PV operations latency:\n%s", PVConnection.latencies)
             if self.results.shouldStop:
                 return
             self.queue_to_pm.put(END_OF_TESTS)
 
         logger.warning("Done running tests.")
 
+        # Wait for data logging before reporting
+        enexar_logger.flush()
+        if enexar_logger.failures:
+            logger.error(
+                "%d ENeXAr acquisition(s) failed.", len(enexar_logger.failures)
+            )
+
         # Generate PDF
         if self.results and self.pdf_output is not None:
             logger.info("Will export result in PDF file: %s", self.pdf_output)
             export_pdf(
-                self.pdf_output, self.suite, self.results, self.configs, self.naming
+                self.pdf_output,
+                self.suite,
+                self.results,
+                self.configs,
+                self.naming,
+                enexar_logger.failures,
             )
             logger.warning("Done generating report: %s", self.pdf_output)
             self.queue_to_gui.put(REPORT_GENERATED + " " + self.pdf_output)
@@ -217,6 +306,13 @@ class ProcessManager(object):
 
         logger.debug("Leave run_and_report")
 
+    def dump_latencies(self, evt_done):
+        """Write PV operations latency to latency_output, until evt_done is set."""
+        while not evt_done.wait(LATENCY_PERIOD):
+            PVConnection.latencies.dump(self.latency_output)
+        PVConnection.latencies.dump(self.latency_output)
+        logger.warning("Done writing PV latency: %s", self.latency_output)
+
     def pause_runner(self):
         self.queue_to_gui.put(PAUSE_FROM_MANAGER)
         self.queue_to_runner.put(PAUSE_FROM_MANAGER)
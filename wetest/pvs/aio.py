@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""asyncio counterpart of wetest.pvs.core connections (Python 3 only).
+
+Puts, gets and connections are awaited instead of blocking the calling thread,
+so that a single event loop can keep thousands of them outstanding.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+
+import epics
+from p4p.client.asyncio import Context
+
+from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
+from wetest.pvs.core import PVConnectionPool, PVResult, pva_string
+from wetest.pvs.core import CONNECTION_TIMEOUT, GET_TIMEOUT, POLL_PERIOD, PUT_TIMEOUT
+
+# configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(TERSE_FORMATTER)
+logger.addHandler(stream_handler)
+logger.addHandler(FILE_HANDLER)
+
+
+def _set_result(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+def _resolve(future, result):
+    """Set a future result from any thread (pyepics callbacks run in CA threads)."""
+    future.get_loop().call_soon_threadsafe(_set_result, future, result)
+
+
+async def _wait(future, timeout):
+    """Return the future result, or False if it is not done before timeout."""
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        return False
+
+
+class AsyncPVConnection(object):
+    """A convenience class to manage awaitable EPICS connections.
+
+    Connections are shared through `pool`, the same way as PVConnection.
+    """
+
+    @classmethod
+    def get_pv_connection(cls, name, protocol):
+        return cls.pool.get(name, protocol)
+
+    @classmethod
+    def new_pv_connection(cls, name, protocol):
+        if protocol.upper() == "CA":
+            return cls.AsyncCaConnection(name)
+        elif protocol.upper() == "PVA":
+            return cls.AsyncPvaConnection(name)
+        raise NotImplementedError("Unknown protocol: %s" % protocol)
+
+    @classmethod
+    async def get_many(cls, names, protocol, as_string=False, timeout=GET_TIMEOUT):
+        """Get several PVs concurrently.
+
+        :param names:     PV names to read.
+        :param protocol:  EPICS protocol: either CA or PVA.
+        :param as_string: Read values as strings.
+        :param timeout:   Maximum time to wait for each value (in seconds).
+
+        :returns: a list of PVResult, in the same order as names.
+        """
+        names = list(names)
+        connections = [cls.get_pv_connection(name, protocol) for name in names]
+        values = await asyncio.gather(
+            *[
+                connection.get(as_string=as_string, timeout=timeout)
+                for connection in connections
+            ],
+            return_exceptions=True
+        )
+        return [
+            PVResult(name, None, value)
+            if isinstance(value, Exception)
+            else PVResult(name, value, None)
+            for name, value in zip(names, values)
+        ]
+
+    @classmethod
+    async def put_many(cls, values, protocol, wait=False, timeout=PUT_TIMEOUT):
+        """Put several PVs concurrently.
+
+        :param values:    A {PV name: value} dictionnary.
+        :param protocol:  EPICS protocol: either CA or PVA.
+        :param wait:      Wait for all the puts to be processed.
+        :param timeout:   Maximum time to wait for each put (in seconds).
+
+        :returns: a list of PVResult, in the same order as values.
+        """
+        names = list(values)
+        connections = [cls.get_pv_connection(name, protocol) for name in names]
+        status = await asyncio.gather(
+            *[
+                connection.put(values[name], wait=wait, timeout=timeout)
+                for name, connection in zip(names, connections)
+            ],
+            return_exceptions=True
+        )
+        return [
+            PVResult(name, None, st)
+            if isinstance(st, Exception)
+            else PVResult(name, None, None)
+            if st
+            else PVResult(name, None, "Unable to put %s" % name)
+            for name, st in zip(names, status)
+        ]
+
+    class AsyncCaConnection(object):
+        """pyepics PV whose callbacks resolve asyncio futures."""
+
+        def __init__(self, name):
+            self.pvname = name
+            self.monitored = False
+            # waiters are added by the event loop and resolved by CA threads
+            self._waiters_lock = threading.Lock()
+            self._connection_waiters = []
+            self._update_waiters = []
+            self.pv = epics.PV(name, connection_callback=self._connection_callback)
+            self.pv.add_callback(self._value_callback)
+
+        def _connection_callback(self, pvname=None, conn=None, **kws):
+            if conn:
+                with self._waiters_lock:
+                    waiters, self._connection_waiters = self._connection_waiters, []
+                for future in waiters:
+                    _resolve(future, True)
+
+        def _value_callback(self, **kws):
+            self.monitored = True
+            with self._waiters_lock:
+                waiters, self._update_waiters = self._update_waiters, []
+            for future in waiters:
+                _resolve(future, True)
+
+        @property
+        def status(self):
+            return self.pv.status
+
+        async def connect(self, timeout=CONNECTION_TIMEOUT):
+            """Wait for the PV to connect, returns whether it did."""
+            if self.pv.connected:
+                return True
+            future = asyncio.get_event_loop().create_future()
+            with self._waiters_lock:
+                self._connection_waiters.append(future)
+            # the connection may have happened before the future was registered
+            if self.pv.connected:
+                return True
+            return await _wait(future, timeout)
+
+        async def put(self, value, wait=False, timeout=PUT_TIMEOUT):
+            """Put value, and if wait, until processing completes.
+
+            :returns: whether the put was done (and completed) in time.
+            """
+            if not await self.connect():
+                return False
+            if not wait:
+                self.pv.put(value)
+                return True
+            future = asyncio.get_event_loop().create_future()
+            self.pv.put(value, callback=lambda **kws: _resolve(future, True))
+            return await _wait(future, timeout)
+
+        async def get(self, as_string=False, timeout=GET_TIMEOUT):
+            """Read the monitored value, or from a worker thread if not monitored."""
+            if self.monitored:
+                return self.pv.get(as_string=as_string)
+            if not await self.connect(timeout):
+                return None
+            return await asyncio.get_event_loop().run_in_executor(
+                None,
+                functools.partial(self.pv.get, as_string=as_string, timeout=timeout),
+            )
+
+        async def wait_for_update(self, timeout):
+            """Wait for the next monitor update, returns whether there was one.
+
+            Without monitor, only pause before polling again.
+            """
+            if not self.monitored:
+                await asyncio.sleep(min(POLL_PERIOD, timeout))
+                return True
+            future = asyncio.get_event_loop().create_future()
+            with self._waiters_lock:
+                self._update_waiters.append(future)
+            return await _wait(future, timeout)
+
+        def close(self):
+            self.pv.disconnect()
+
+    class AsyncPvaConnection(object):
+        """p4p asyncio client connection."""
+
+        ctxt = Context("pva")
+
+        def __init__(self, name):
+            self.pvname = name
+            self.connected = False
+
+        @property
+        def status(self):
+            return 1 if self.connected else 0
+
+        async def connect(self, timeout=CONNECTION_TIMEOUT):
+            """Wait for a first value, returns whether there was one."""
+            if not self.connected:
+                try:
+                    await self.get(timeout=timeout)
+                except (asyncio.TimeoutError, Exception):
+                    return False
+            return self.connected
+
+        async def put(self, value, wait=False, timeout=PUT_TIMEOUT):
+            """Put value, and if wait, until processing completes.
+
+            :returns: whether the put was done (and completed) in time.
+            """
+            try:
+                await asyncio.wait_for(
+                    self.ctxt.put(self.pvname, value, wait=True if wait else None),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                return False
+            self.connected = True
+            return True
+
+        async def get(self, as_string=False, timeout=GET_TIMEOUT):
+            value = await asyncio.wait_for(self.ctxt.get(self.pvname), timeout)
+            self.connected = True
+            return pva_string(value) if as_string else value
+
+        async def wait_for_update(self, timeout):
+            """No monitor to wait on, only pause before polling again."""
+            await asyncio.sleep(min(POLL_PERIOD, timeout))
+            return True
+
+        def close(self):
+            pass
+
+
+AsyncPVConnection.pool = PVConnectionPool(AsyncPVConnection.new_pv_connection)
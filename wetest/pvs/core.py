@@ -14,11 +14,17 @@
 
 from wetest.common.constants import LVL_PV_DISCONNECTED, LVL_PV_CONNECTED
 from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
+from wetest.common.constants import WeTestError
 import epics
 import p4p
-from p4p.client.thread import Context
+from p4p.client.thread import Context, TimeoutError
+import copy
+import json
+import math
 import time
 import logging
+import threading
+from collections import OrderedDict, namedtuple
 from builtins import object
 from builtins import str
 from future import standard_library
@@ -85,53 +91,632 @@ class PVData(object):
         return len(self.setter_subtests) > 0 or len(self.getter_subtests) > 0
 
 
+class PVConnectionPool(object):
+    """A thread-safe pool of PV connections, keyed by (name, protocol).
+
+    Connections are reused across subtests, retries and scenarios, the least
+    recently used one is dropped when the pool grows over `max_size`.
+    Dropped connections are not closed, as another thread may still be using
+    them, they are released once no longer referenced.
+
+    hits:           number of requests served by an already opened connection
+    misses:         number of requests that required a new connection
+    evictions:      number of connections dropped to make room for new ones
+    connect_time:   cumulated time spent opening new connections, until they
+                    are connected for connections that can be waited for
+                    (in seconds)
+    """
+
+    def __init__(self, factory, max_size=10000):
+        self.factory = factory
+        self.max_size = max_size
+        self._connections = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._connections)
+
+    def __contains__(self, key):
+        name, protocol = key
+        return (name, protocol.upper()) in self._connections
+
+    def get(self, name, protocol):
+        """Return the pooled connection to `name`, open it if necessary.
+
+        New connections are opened outside of the pool lock, for a slow
+        connection not to delay the lookups of other threads.
+        """
+        key = (name, protocol.upper())
+        with self._lock:
+            connection = self._connections.get(key)
+            if connection is not None:
+                # move to the end, as most recently used
+                self._connections[key] = self._connections.pop(key)
+                self.hits += 1
+                return connection
+            self.misses += 1
+
+        start_time = time.time()
+        connection = self.factory(name, protocol)
+        wait_for_connection = getattr(connection, "wait_for_connection", None)
+        if wait_for_connection is not None:
+            wait_for_connection(CONNECTION_TIMEOUT)
+        connect_time = time.time() - start_time
+
+        with self._lock:
+            self.connect_time += connect_time
+            pooled = self._connections.get(key)
+            if pooled is not None:
+                # opened meanwhile by another thread, ours is not used
+                connection.close()
+                return pooled
+
+            self._connections[key] = connection
+            while len(self._connections) > self.max_size:
+                old_key, _ = self._connections.popitem(last=False)
+                logger.debug("Evict connection to %s (%s)", *old_key)
+                self.evictions += 1
+
+        return connection
+
+    def clear(self):
+        """Close all the pooled connections."""
+        with self._lock:
+            while self._connections:
+                self._connections.popitem(last=False)[1].close()
+
+    def reset_stats(self):
+        """Reset hit, miss, eviction and connect time counters."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.connect_time = 0.0
+
+    def stats(self):
+        """Return a dictionnary with the pool counters."""
+        return {
+            "size": len(self._connections),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "connect_time": self.connect_time,
+        }
+
+    def __str__(self):
+        return (
+            "%(size)d connections, %(hits)d hits, %(misses)d misses, "
+            "%(evictions)d evictions, %(connect_time).3fs spent connecting"
+            % self.stats()
+        )
+
+
+# Outcome of a bulk operation on a single PV, error is None on success
+PVResult = namedtuple("PVResult", ["name", "value", "error"])
+
+# Latest value received from a monitor, timestamp is the local reception time
+CachedValue = namedtuple("CachedValue", ["value", "char_value", "timestamp"])
+
+# Default time to wait for a monitored value (in seconds)
+MONITOR_TIMEOUT = 5.0
+
+# Default time to wait for a get to complete (in seconds)
+GET_TIMEOUT = 5.0
+
+# Time between two reads when polling a PV without monitor (in seconds)
+POLL_PERIOD = 0.1
+
+# Default time to wait for a put to complete (in seconds)
+PUT_TIMEOUT = 60.0
+
+# Default time to wait for all the registered PVs to connect (in seconds)
+CONNECTION_TIMEOUT = 5.0
+
+# Time between two connection progress reports (in seconds)
+PROGRESS_PERIOD = 1.0
+
+# Time between two batches of PV connection changes sent to the GUI (in seconds)
+FLUSH_PERIOD = 0.2
+
+
+class LatencyHistogram(object):
+    """Durations counted in logarithmic buckets, each 10% wider than the previous.
+
+    Percentiles are the upper bound of the bucket they fall in,
+    so they are over-estimated by 10% at most.
+    """
+
+    RATIO = 1.1
+    MINIMUM = 1e-6
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        if duration <= self.MINIMUM:
+            idx = 0
+        else:
+            idx = int(math.ceil(math.log(duration / self.MINIMUM, self.RATIO)))
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def merge(self, other):
+        """Add the durations counted in another LatencyHistogram."""
+        for idx, count in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        """Duration under which percent % of the durations are."""
+        rank = self.count * percent / 100.0
+        cumulated = 0
+        for idx in sorted(self.buckets):
+            cumulated += self.buckets[idx]
+            if cumulated >= rank:
+                return min(self.MINIMUM * self.RATIO ** idx, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class LatencyStats(object):
+    """Thread-safe latency histograms of PV operations (connect, put, get, rpc),
+    per protocol and per PV."""
+
+    def __init__(self):
+        self.per_protocol = {}
+        self.per_pv = {}
+        self.lock = threading.Lock()
+
+    def record(self, operation, protocol, name, duration):
+        with self.lock:
+            for stats, key in [
+                (self.per_protocol, protocol.upper()),
+                (self.per_pv, name),
+            ]:
+                histograms = stats.setdefault(key, {})
+                if operation not in histograms:
+                    histograms[operation] = LatencyHistogram()
+                histograms[operation].add(duration)
+
+    def merge(self, other):
+        """Add the histograms of another LatencyStats, such as a worker's."""
+        with self.lock:
+            for stats, other_stats in [
+                (self.per_protocol, other.per_protocol),
+                (self.per_pv, other.per_pv),
+            ]:
+                for key, other_histograms in other_stats.items():
+                    histograms = stats.setdefault(key, {})
+                    for operation, other_histogram in other_histograms.items():
+                        if operation not in histograms:
+                            histograms[operation] = LatencyHistogram()
+                        histograms[operation].merge(other_histogram)
+
+    def clear(self):
+        with self.lock:
+            self.per_protocol.clear()
+            self.per_pv.clear()
+
+    def __getstate__(self):
+        with self.lock:
+            return copy.deepcopy((self.per_protocol, self.per_pv))
+
+    def __setstate__(self, state):
+        self.per_protocol, self.per_pv = state
+        self.lock = threading.Lock()
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                section: dict(
+                    (key, dict((op, h.to_dict()) for op, h in histograms.items()))
+                    for key, histograms in stats.items()
+                )
+                for section, stats in [
+                    ("protocols", self.per_protocol),
+                    ("pvs", self.per_pv),
+                ]
+            }
+
+    def dump(self, filename):
+        """Write the histograms as JSON, durations in seconds."""
+        with open(filename, "w") as json_file:
+            json.dump(self.to_dict(), json_file, indent=2, sort_keys=True)
+
+    def slowest(self, nb=5, percent=95):
+        """Returns the nb slowest (percentile, PV name, operation)."""
+        with self.lock:
+            latencies = [
+                (histogram.percentile(percent), name, operation)
+                for name, histograms in self.per_pv.items()
+                for operation, histogram in histograms.items()
+            ]
+        return sorted(latencies, reverse=True)[:nb]
+
+    def __str__(self):
+        output = []
+        for protocol, histograms in sorted(self.to_dict()["protocols"].items()):
+            for operation, h in sorted(histograms.items()):
+                output.append(
+                    "%s %s: %d ops, p50 %.1fms, p95 %.1fms, p99 %.1fms, max %.1fms"
+                    % (
+                        protocol,
+                        operation,
+                        h["count"],
+                        h["p50"] * 1e3,
+                        h["p95"] * 1e3,
+                        h["p99"] * 1e3,
+                        h["max"] * 1e3,
+                    )
+                )
+        for duration, name, operation in self.slowest():
+            output.append(
+                "slowest %s %s: p95 %.1fms" % (name, operation, duration * 1e3)
+            )
+        return "\n".join(output)
+
+
+class StaleValue(WeTestError):
+    """No value recent enough was received from the monitor in time."""
+
+    pass
+
+
+class PVValueCache(object):
+    """A thread-safe cache of the latest value of monitored PVs.
+
+    Each PV is subscribed once, then reads are answered locally. Entries are
+    tagged with their reception time so that a reader can request a value
+    newer than a given time (for instance the time of its last put).
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._values = {}
+        self._connections = {}
+        self._condition = threading.Condition()
+
+    def __contains__(self, key):
+        name, protocol = key
+        return (name, protocol.upper()) in self._connections
+
+    def subscribe(self, name, protocol):
+        """Start monitoring `name`, does nothing if already monitored."""
+        key = (name, protocol.upper())
+        with self._condition:
+            if key in self._connections:
+                return
+            connection = self.factory(name, protocol, monitor=True)
+            self._connections[key] = connection
+
+        connection.subscribe(
+            lambda value, char_value: self._update(key, value, char_value)
+        )
+
+    def _update(self, key, value, char_value):
+        with self._condition:
+            self._values[key] = CachedValue(value, char_value, time.time())
+            self._condition.notify_all()
+
+    def get(self, name, protocol, newer_than=None, timeout=MONITOR_TIMEOUT):
+        """Return the latest CachedValue received for `name`.
+
+        :param newer_than: If set, wait for a value received after this time.
+        :param timeout:    Maximum time to wait for such a value (in seconds).
+
+        :returns: a CachedValue, or raise StaleValue after timeout.
+        """
+        key = (name, protocol.upper())
+        deadline = time.time() + timeout
+        with self._condition:
+            while True:
+                entry = self._values.get(key)
+                if entry is not None and (
+                    newer_than is None or entry.timestamp > newer_than
+                ):
+                    return entry
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise StaleValue(
+                        "No value received from %s monitor in %.3Gs" % (name, timeout)
+                    )
+                self._condition.wait(remaining)
+
+    def clear(self):
+        """Stop monitoring all the PVs and forget their values."""
+        with self._condition:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections = {}
+            self._values = {}
+
+
+class CachedConnection(object):
+    """Reads a PV from PVValueCache, with the same interface as a PV connection."""
+
+    def __init__(self, cache, name, protocol, newer_than=None):
+        self.cache = cache
+        self.pvname = name
+        self.protocol = protocol
+        self.newer_than = newer_than
+        self.timestamp = None
+
+        self.cache.subscribe(name, protocol)
+
+    @property
+    def status(self):
+        try:
+            self.cache.get(self.pvname, self.protocol)
+        except StaleValue:
+            return None
+        return 1
+
+    def get(self, as_string=False, **kwargs):
+        entry = self.cache.get(self.pvname, self.protocol, newer_than=self.newer_than)
+        self.timestamp = entry.timestamp
+        if as_string and entry.char_value is not None:
+            return entry.char_value
+        return entry.value
+
+    def wait_for_update(self, timeout):
+        """Wait for a value newer than the last one read, at most timeout seconds.
+
+        :returns: whether a new value has been received.
+        """
+        try:
+            self.cache.get(
+                self.pvname, self.protocol, newer_than=self.timestamp, timeout=timeout
+            )
+        except StaleValue:
+            return False
+        return True
+
+
+def pva_string(value):
+    """A value read with p4p as a string, like CA reads with as_string:
+    the choice of an enum, or the value of a scalar without its timestamp."""
+    choice = getattr(value, "choice", None)
+    if choice is not None:
+        return choice
+    for value_type in [str, float, int]:
+        if isinstance(value, value_type):
+            return value_type.__str__(value)
+    return str(value)
+
+
 class PVConnection(object):
     """A convenience class to manage EPICS connections for PVInfo().
 
     connected:          whether last check showed PV as connected
+
+    Connections without connection_callback are shared through `pool`.
     """
 
     @classmethod
     def get_pv_connection(cls, name, protocol, connection_callback=None):
+        if connection_callback is None:
+            return cls.pool.get(name, protocol)
+        return cls.new_pv_connection(name, protocol, connection_callback)
+
+    @classmethod
+    def new_pv_connection(cls, name, protocol, connection_callback=None, monitor=False):
         if protocol.upper() == "CA":
-            return cls.CaConnection(name, connection_callback)
+            return cls.CaConnection(name, connection_callback, monitor)
         elif protocol.upper() == "PVA":
             return cls.PvaConnection(name, connection_callback)
+        raise NotImplementedError("Unknown protocol: %s" % protocol)
+
+    @classmethod
+    def get_cached_connection(cls, name, protocol, newer_than=None):
+        """Return a connection that reads `name` from the monitored values cache."""
+        return CachedConnection(cls.cache, name, protocol, newer_than)
+
+    @classmethod
+    def get_many(cls, names, protocol, as_string=False, timeout=GET_TIMEOUT):
+        """Get several PVs at once instead of one network round trip per PV.
+
+        :param names:     PV names to read.
+        :param protocol:  EPICS protocol: either CA or PVA.
+        :param as_string: Read values as strings.
+        :param timeout:   Maximum time to wait for the values (in seconds).
+
+        :returns: a list of PVResult, in the same order as names.
+        """
+        names = list(names)
+        if len(names) == 0:
+            return []
+
+        if protocol.upper() == "CA":
+            values = epics.caget_many(names, as_string=as_string, timeout=timeout)
+            return [
+                PVResult(name, value, None)
+                if value is not None
+                else PVResult(name, None, "Unable to get %s" % name)
+                for name, value in zip(names, values)
+            ]
+        elif protocol.upper() == "PVA":
+            values = cls.PvaConnection.ctxt.get(names, timeout=timeout, throw=False)
+            return [
+                PVResult(name, None, value)
+                if isinstance(value, Exception)
+                else PVResult(name, pva_string(value) if as_string else value, None)
+                for name, value in zip(names, values)
+            ]
+        raise NotImplementedError("Unknown protocol: %s" % protocol)
+
+    @classmethod
+    def put_many(cls, values, protocol, wait=False, timeout=PUT_TIMEOUT):
+        """Put several PVs at once instead of one network round trip per PV.
+
+        :param values:    A {PV name: value} dictionnary.
+        :param protocol:  EPICS protocol: either CA or PVA.
+        :param wait:      Wait for all the puts to be processed.
+        :param timeout:   Maximum time to wait for the puts (in seconds).
+
+        :returns: a list of PVResult, in the same order as values.
+        """
+        names = list(values)
+        if len(names) == 0:
+            return []
+        new_values = [values[name] for name in names]
+
+        if protocol.upper() == "CA":
+            status = epics.caput_many(
+                names,
+                new_values,
+                wait="all" if wait else False,
+                put_timeout=timeout,
+            )
+            return [
+                PVResult(name, None, None)
+                if st is not None and st > 0
+                else PVResult(name, None, "Unable to put %s" % name)
+                for name, st in zip(names, status)
+            ]
+        elif protocol.upper() == "PVA":
+            status = cls.PvaConnection.ctxt.put(
+                names,
+                new_values,
+                timeout=timeout,
+                throw=False,
+                wait=True if wait else None,
+            )
+            return [
+                PVResult(name, None, st)
+                if isinstance(st, Exception)
+                else PVResult(name, None, None)
+                for name, st in zip(names, status)
+            ]
+        raise NotImplementedError("Unknown protocol: %s" % protocol)
 
     class CaConnection:
-        def __init__(self, name, connection_callback):
+        def __init__(self, name, connection_callback, monitor=False):
             self.pvname = name
-            self.pv = epics.PV(name, connection_callback=connection_callback)
+            self.connection_callback = connection_callback
+            self.creation_time = time.time()
+            self.connect_recorded = False
+            self.pv = epics.PV(
+                name,
+                connection_callback=self.connection_callback_wrapper,
+                auto_monitor=True if monitor else None,
+            )
+
+        def connection_callback_wrapper(self, pvname=None, conn=None, **kws):
+            if conn and not self.connect_recorded:
+                self.connect_recorded = True
+                PVConnection.latencies.record(
+                    "connect", "CA", self.pvname, time.time() - self.creation_time
+                )
+            if self.connection_callback is not None:
+                self.connection_callback(pvname=pvname, conn=conn, **kws)
 
         def check_connection(self):
             return self.pv.connect(timeout=0)
 
+        def wait_for_connection(self, timeout):
+            """Wait for the PV to connect, returns whether it did."""
+            return self.pv.wait_for_connection(timeout=timeout)
+
         @property
         def status(self):
             return self.pv.status
 
-        def put(self, value):
-            self.pv.put(value)
+        def put(self, value, wait=False, timeout=PUT_TIMEOUT):
+            """Put value, waiting for the put callback if wait.
+
+            :returns: False if the put did not complete within timeout.
+            """
+            start_time = time.time()
+            status = self.pv.put(value, wait=wait, timeout=timeout)
+            PVConnection.latencies.record(
+                "put", "CA", self.pvname, time.time() - start_time
+            )
+            return not wait or (status is not None and status > 0)
 
         def get(self, **kwargs):
-            return self.pv.get(**kwargs)
+            start_time = time.time()
+            value = self.pv.get(**kwargs)
+            PVConnection.latencies.record(
+                "get", "CA", self.pvname, time.time() - start_time
+            )
+            return value
+
+        def wait_for_update(self, timeout):
+            """No monitor to wait on, only pause before polling again."""
+            time.sleep(min(POLL_PERIOD, timeout))
+            return True
+
+        def subscribe(self, callback):
+            """Call callback(value, char_value) on each monitor update.
+
+            Also called at once with the current value if already connected,
+            its first monitor update having been received before.
+            """
+            self.pv.add_callback(
+                lambda value=None, char_value=None, **kws: callback(value, char_value),
+                run_now=True,
+            )
+
+        def close(self):
+            self.pv.disconnect()
 
     class PvaConnection:
         ctxt = Context("pva")
+        nturi_types = {}
 
         def __init__(self, name, connection_callback):
             self.pvname = name
             self.connection_callback = connection_callback
             self.connected = False
+            self.monitor = None
+            self.creation_time = time.time()
 
             if self.connection_callback is not None:
                 self.monitor = self.ctxt.monitor(name, self.connection_callback_wrapper)
 
         def check_connection(self):
-            self.monitor.close()
+            self.close()
             return self.connected
 
+        def wait_for_update(self, timeout):
+            """No monitor to wait on, only pause before polling again."""
+            time.sleep(min(POLL_PERIOD, timeout))
+            return True
+
+        def subscribe(self, callback):
+            """Call callback(value, None) on each monitor update."""
+
+            def monitor_callback(value):
+                if not isinstance(value, Exception):
+                    callback(value, None)
+
+            self.monitor = self.ctxt.monitor(self.pvname, monitor_callback)
+
+        def close(self):
+            if self.monitor is not None:
+                self.monitor.close()
+
         def connection_callback_wrapper(self, value):
+            if not self.connected:
+                PVConnection.latencies.record(
+                    "connect", "PVA", self.pvname, time.time() - self.creation_time
+                )
             self.connected = True
             self.connection_callback(pvname=self.pvname, conn=True)
 
@@ -139,27 +724,73 @@ class PVConnection(object):
         def status(self):
             return 1 if self.connected else 0
 
-        def put(self, value):
-            self.ctxt.put(self.pvname, value)
+        def put(self, value, wait=False, timeout=PUT_TIMEOUT):
+            """Put value, waiting for the record to be processed if wait.
 
-        def get(self, **kwargs):
-            return self.ctxt.get(self.pvname)
+            :returns: False if the put did not complete within timeout.
+            """
+            start_time = time.time()
+            try:
+                if wait:
+                    self.ctxt.put(self.pvname, value, timeout=timeout, wait=True)
+                else:
+                    self.ctxt.put(self.pvname, value)
+            except TimeoutError:
+                if not wait:
+                    raise
+                return False
+            finally:
+                PVConnection.latencies.record(
+                    "put", "PVA", self.pvname, time.time() - start_time
+                )
+            return True
+
+        def get(self, as_string=False, **kwargs):
+            start_time = time.time()
+            value = self.ctxt.get(self.pvname)
+            PVConnection.latencies.record(
+                "get", "PVA", self.pvname, time.time() - start_time
+            )
+            return pva_string(value) if as_string else value
 
         def rpc(self, value):
-            type_list = self._build_type(value)
-            uri = p4p.nt.NTURI(type_list).wrap(self.pvname, kws=value)
-            return self.ctxt.rpc(self.pvname, uri)
+            start_time = time.time()
+            uri = self._get_nturi(value).wrap(self.pvname, kws=value)
+            try:
+                return self.ctxt.rpc(self.pvname, uri)
+            finally:
+                PVConnection.latencies.record(
+                    "rpc", "PVA", self.pvname, time.time() - start_time
+                )
+
+        def _get_nturi(self, data):
+            """NTURI types are built once per request shape."""
+            shape = self._shape(data)
+            if shape not in self.nturi_types:
+                self.nturi_types[shape] = p4p.nt.NTURI(self._build_type(data))
+            return self.nturi_types[shape]
+
+        def _shape(self, data):
+            return tuple(
+                (key, self._shape(data[key]) if isinstance(data[key], dict) else None)
+                for key in data
+            )
 
         def _build_type(self, data):
             anames = []
             for key in data:
-                if type(data[key]) == dict:
+                if isinstance(data[key], dict):
                     anames.append((key, ("S", None, self._build_type(data[key]))))
                 else:
                     anames.append((key, "s"))
             return anames
 
 
+PVConnection.pool = PVConnectionPool(PVConnection.new_pv_connection)
+PVConnection.cache = PVValueCache(PVConnection.new_pv_connection)
+PVConnection.latencies = LatencyStats()
+
+
 class PVInfo(object):
     """A convenience class to manage PVData()
 
@@ -291,7 +922,7 @@ def pvs_from_suite(suite, ref_dict=None, connection_callback=None):
     else:
         pvs_refs = ref_dict
 
-    for test_data in list(suite.tests_infos.values()):
+    for test_data in suite.tests_infos.values():
         # Set default protocol for the test
         PVConnection.default_protocol = test_data.protocol
 
@@ -319,6 +950,80 @@ def pvs_from_suite(suite, ref_dict=None, connection_callback=None):
     return pvs_refs
 
 
+class PVStatusBatch(list):
+    """A list of (name, connected) PV connection changes."""
+
+    pass
+
+
+class PVEventBus(object):
+    """Coalesces PV connection events before forwarding them to a queue.
+
+    Only the latest state of each PV is kept, pending states are flushed every
+    `period` seconds as a single PVStatusBatch. The first time a PV is
+    forwarded, its PVData is sent instead, for its subtests to be known.
+
+    received:   number of events posted
+    delivered:  number of PV states forwarded
+    batches:    number of PVStatusBatch forwarded
+    """
+
+    def __init__(self, queue, period=FLUSH_PERIOD):
+        self.queue = queue
+        self.period = period
+        self.received = 0
+        self.delivered = 0
+        self.batches = 0
+        self._pending = OrderedDict()
+        self._known = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def post(self, pv_data):
+        """Register the latest state of a PV, to be forwarded on next flush."""
+        with self._lock:
+            self.received += 1
+            self._pending[pv_data.name] = pv_data
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pv_event_bus")
+                self._thread.daemon = True
+                self._thread.start()
+
+    def flush(self):
+        """Forward the pending PV states now."""
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+            batch = PVStatusBatch()
+            for name, pv_data in pending.items():
+                if name in self._known:
+                    batch.append((name, pv_data.connected))
+                else:
+                    self._known.add(name)
+                    self.queue.put(pv_data)
+            if len(batch) > 0:
+                self.queue.put(batch)
+                self.batches += 1
+            self.delivered += len(pending)
+
+    def close(self):
+        """Stop the periodic flush, after a last one."""
+        self._stop.set()
+        self.flush()
+        logger.info("PV connection events: %s", self)
+
+    def _run(self):
+        while not self._stop.wait(self.period):
+            self.flush()
+
+    def __str__(self):
+        return "%d events received, %d delivered in %d batches" % (
+            self.received,
+            self.delivered,
+            self.batches,
+        )
+
+
 class PVsTable(object):
     """A class to reference PVs to be monitored,
     a queue can be provided to forward connection status with PV data"""
@@ -331,9 +1036,17 @@ class PVsTable(object):
         else:
             self.queue = queue
         self.pvs_refs = {}
+        self.bus = PVEventBus(self.queue)
+
+        # names of the connected PVs, updated by connection_callback
+        self._connected = set()
+        self._connection_change = threading.Condition()
 
-    def register_pvs(self, suite=None, pv_list=None):
-        """Check connection of all the PVs declared in suite"""
+    def register_pvs(self, suite=None, pv_list=None, timeout=CONNECTION_TIMEOUT):
+        """Check connection of all the PVs declared in suite
+
+        Returns as soon as all the PVs are connected, or after timeout seconds.
+        """
         if suite is None and pv_list is None:
             raise NotImplementedError("Expecting pv_list or suite to be provided")
         # collect all the PVs and initialize the callback
@@ -351,29 +1064,73 @@ class PVsTable(object):
 
         all_connected = True
 
-        # send PV status to GUI at least once per PV
-        time.sleep(1)  # give some time to PV connection to settle
+        # give some time to PV connection to settle
+        self.wait_for_connections(timeout)
 
+        # send PV status to GUI at least once per PV
         for pv in list(self.pvs_refs.values()):
             # make sure that unreachable PV are displayed in stdout at least once
             if not pv.check_connection():
                 all_connected = False
                 logger.log(LVL_PV_DISCONNECTED, "PV is unreachable: %s" % pv.name)
-                self.queue.put(pv.data)
+                self.bus.post(pv.data)
 
         return all_connected, self.pvs_refs
 
+    def wait_for_connections(self, timeout=CONNECTION_TIMEOUT):
+        """Wait for all the registered PVs to be connected, at most timeout seconds.
+
+        Connection progress is logged every PROGRESS_PERIOD seconds.
+
+        :returns: the number of connected PVs.
+        """
+        nb_pvs = len(self.pvs_refs)
+        start_time = time.time()
+        deadline = start_time + timeout
+        next_report = start_time + PROGRESS_PERIOD
+
+        with self._connection_change:
+            while True:
+                nb_connected = len(self._connected)
+                now = time.time()
+                if nb_connected >= nb_pvs or now >= deadline:
+                    break
+                if now >= next_report:
+                    logger.info(
+                        "%d/%d connected after %.1fs",
+                        nb_connected,
+                        nb_pvs,
+                        now - start_time,
+                    )
+                    next_report += PROGRESS_PERIOD
+                self._connection_change.wait(min(deadline, next_report) - now)
+
+        logger.info(
+            "%d/%d connected after %.1fs",
+            nb_connected,
+            nb_pvs,
+            time.time() - start_time,
+        )
+        return nb_connected
+
     def connection_callback(self, pvname=None, conn=None, **kws):
-        """Updates PV status in pvs_refs and put data in queue"""
+        """Updates PV status in pvs_refs and post data to the queue's bus"""
         if not conn:
             logger.log(LVL_PV_DISCONNECTED, "PV changed to unreachable: %s" % pvname)
         else:
             logger.log(LVL_PV_CONNECTED, "PV changed to connected: %s" % pvname)
 
+        with self._connection_change:
+            if conn:
+                self._connected.add(pvname)
+            else:
+                self._connected.discard(pvname)
+            self._connection_change.notify()
+
         try:
             pv = self.pvs_refs[pvname]
             pv.connected = conn
-            self.queue.put(pv.data)
+            self.bus.post(pv.data)
         except KeyError:
             logger.critical(
                 "connection_callback called on %s which is not referenced in PVsTable %s yet",
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""Log PV data with ENeXAr without blocking the tests."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from queue import Queue, Empty
+
+from p4p.client.thread import TimeoutError as RPCTimeout
+
+from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
+from wetest.pvs.core import PVConnection
+
+ACQUIRE_SUFFIX = "ACQUIRE_S"
+QUEUE_SIZE = 1000
+BATCH_SIZE = 50
+FLUSH_TIMEOUT = 60.0
+
+# configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(TERSE_FORMATTER)
+logger.addHandler(stream_handler)
+logger.addHandler(FILE_HANDLER)
+
+AcquisitionRequest = namedtuple("AcquisitionRequest", ["test_id", "server", "value"])
+AcquisitionFailure = namedtuple("AcquisitionFailure", ["test_id", "pv", "message"])
+
+
+def acquisition_request(test_id, entry):
+    """Convert an entry of a test `logger` block to an ENeXAr request.
+
+    :param test_id: The test requiring the acquisition.
+    :param entry:   A dictionnary with at least `server`, `pv` and `path`.
+
+    :returns: An AcquisitionRequest, its value being the RPC arguments.
+    """
+    value = entry.copy()
+    server = value.pop("server")
+    if "acquisitions" in value:
+        value["n_acq"] = str(value.pop("acquisitions"))
+    if not value["path"].endswith(".h5") and not value["path"].endswith(".hdf5"):
+        value["path"] = value["path"] + ".h5"
+    return AcquisitionRequest(test_id, server, value)
+
+
+def acquisition_failure_text(failure):
+    """Describe an AcquisitionFailure, for the GUI and the report."""
+    return "ENeXAr acquisition of %s failed: %s" % (failure.pv, failure.message)
+
+
+class ENeXArLogger(object):
+    """Sends acquisition requests to ENeXAr servers from a background thread.
+
+    Requests wait in a bounded queue, submitting blocks when it is full.
+    They are then sent in batches, grouped per server, and an unreachable
+    server fails the rest of its group without waiting again.
+    Failures are logged as they happen, kept in `failures` for the report,
+    and put in `queue_to_gui` if set, for the GUI to show them on their test.
+    """
+
+    def __init__(self, max_size=QUEUE_SIZE, batch_size=BATCH_SIZE):
+        self.queue = Queue(max_size)
+        self.batch_size = batch_size
+        self.failures = []
+        self.queue_to_gui = None
+        self.sent = 0
+        self._pending = 0
+        self._done = threading.Condition()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, test_id, pvlogger):
+        """Queue the acquisitions of a test `logger` block.
+
+        :param test_id:  The test requiring the acquisitions.
+        :param pvlogger: The list of entries of the `logger` block.
+        """
+        self._start()
+        for entry in pvlogger:
+            try:
+                request = acquisition_request(test_id, entry)
+            except Exception as e:
+                # not to make the test fail, whatever the entry
+                value = entry if isinstance(entry, dict) else {}
+                self._fail(
+                    AcquisitionRequest(test_id, None, value),
+                    "Invalid logger entry %s (%s: %s)" % (entry, type(e).__name__, e),
+                )
+                continue
+            with self._done:
+                self._pending += 1
+            if self.queue.full():
+                logger.warning("ENeXAr queue is full, waiting for pending requests.")
+            self.queue.put(request)
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """Wait for the queued requests to be sent.
+
+        :param timeout: Maximum time to wait (in seconds).
+
+        :returns: whether all the requests were sent in time.
+        """
+        deadline = time.time() + timeout
+        with self._done:
+            while self._pending > 0:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logger.error(
+                        "%d ENeXAr request(s) still pending after %.1fs.",
+                        self._pending,
+                        timeout,
+                    )
+                    return False
+                self._done.wait(remaining)
+        return True
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="enexar_logger")
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Empty:
+                    break
+
+            per_server = OrderedDict()
+            for request in batch:
+                per_server.setdefault(request.server, []).append(request)
+            for server, requests in per_server.items():
+                self._send(server, requests)
+
+            with self._done:
+                self._pending -= len(batch)
+                self._done.notify_all()
+
+    def _send(self, server, requests):
+        enexar = PVConnection.get_pv_connection(server + ACQUIRE_SUFFIX, "PVA")
+        for idx, request in enumerate(requests):
+            try:
+                status = enexar.rpc(request.value)
+            except RPCTimeout:
+                message = (
+                    'Could not connect to the ENeXAr server with prefix "%s". '
+                    "Please check that it is available." % server
+                )
+                for failed in requests[idx:]:
+                    self._fail(failed, message)
+                return
+            except Exception as e:
+                self._fail(request, e)
+                continue
+            if status is False:
+                self._fail(request, "Request rejected by %s" % server)
+            else:
+                self.sent += 1
+
+    def _fail(self, request, message):
+        # as a string, to be sent to other processes
+        failure = AcquisitionFailure(
+            request.test_id, request.value.get("pv"), str(message)
+        )
+        self.failures.append(failure)
+        if self.queue_to_gui is not None:
+            self.queue_to_gui.put(failure)
+        logger.error(
+            "An error ocurred while trying to log PV %s to ENeXAr for %s.\n%s",
+            failure.pv,
+            failure.test_id,
+            failure.message,
+        )
+
+
+enexar_logger = ENeXArLogger()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""Simulated IOC serving the PVs of scenarios, to run WeTest without real IOCs.
+
+Getters follow their setters: putting a setter value moves each getter tested
+with it to the value expected by the test, or to the same value otherwise.
+PVA PVs are served with p4p, CA PVs with pcaspy when it is installed.
+"""
+
+import argparse
+import logging
+import math
+import random
+import threading
+import time
+
+from p4p.nt import NTScalar
+from p4p.server import Server
+from p4p.server.thread import SharedPV
+
+from wetest.command_line import add_macros_arguments, parse_macros
+from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
+from wetest.testing.cache import ScenarioCache
+from wetest.testing.generator import TestsGenerator, convert_values
+from wetest.testing.reader import MacrosManager, ScenarioReader
+
+try:
+    import pcaspy
+except ImportError:
+    pcaspy = None
+
+# Default time before a put completes (in seconds)
+LATENCY = 0.0
+
+# Default time for a getter to reach its new value (in seconds)
+SETTLE_TIME = 0.0
+
+# Default standard deviation of the noise added to numbers
+NOISE = 0.0
+
+# Time between two updates of moving or noisy PVs (in seconds)
+UPDATE_PERIOD = 0.05
+
+# configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(TERSE_FORMATTER)
+logger.addHandler(stream_handler)
+logger.addHandler(FILE_HANDLER)
+logging.getLogger("wetest.testing.generator").setLevel(logging.ERROR)
+logging.getLogger("wetest.testing.reader").setLevel(logging.WARNING)
+
+
+def value_type(value):
+    """Returns the NTScalar type code to serve value with."""
+    if isinstance(value, list):
+        return "ad"
+    if isinstance(value, str):
+        return "s"
+    return "d"
+
+
+def value_key(value):
+    """Returns a hashable value, numbers being compared as floats."""
+    if isinstance(value, list):
+        return tuple(value_key(v) for v in value)
+    if isinstance(value, str):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def coerce(value, type_code):
+    """Convert a received value to the type of the PV."""
+    if type_code == "s":
+        return str(value)
+    if type_code == "ad":
+        return [float(v) for v in convert_values(list(value))]
+    return float(value)
+
+
+class SimulatedPV(object):
+    """A served PV value, moving towards its target in settle_time seconds.
+
+    Numbers follow a first order response, and get a gaussian noise.
+    """
+
+    def __init__(self, name, initial, settle_time=SETTLE_TIME, noise=NOISE):
+        self.name = name
+        self.type = value_type(initial)
+        self.settle_time = settle_time
+        self.noise = noise if self.type == "d" else 0
+        self.start = self.target = coerce(initial, self.type)
+        self.start_time = 0
+
+    def move_to(self, target, settle=True):
+        """Change the target value, immediately if not settle."""
+        target = coerce(target, self.type)
+        self.start = self.value() if settle else target
+        self.target = target
+        self.start_time = time.time()
+
+    def changing(self, margin=0):
+        """Whether the value is still moving, or was margin seconds ago."""
+        if self.type != "d" or self.settle_time <= 0:
+            return False
+        return time.time() - self.start_time < self.settle_time + margin
+
+    def value(self):
+        """Current value, noise included."""
+        if self.changing():
+            # within 1% of the step after settle_time
+            tau = self.settle_time / math.log(100)
+            elapsed = time.time() - self.start_time
+            current = self.target + (self.start - self.target) * math.exp(
+                -elapsed / tau
+            )
+        else:
+            current = self.target
+        if self.noise:
+            current += random.gauss(0, self.noise)
+        return current
+
+
+class SimulatedIOC(object):
+    """Serves the PVs used by tests, getters following their setters.
+
+    latency:     time before a put completes (in seconds)
+    settle_time: time for a getter to reach its new value (in seconds)
+    noise:       standard deviation of the noise added to numbers
+    """
+
+    def __init__(
+        self, tests_data, latency=LATENCY, settle_time=SETTLE_TIME, noise=NOISE
+    ):
+        self.latency = latency
+        self.pvs = {}
+        self.protocols = {}
+        # (setter, set value) -> [(getter, get value)]
+        self.responses = {}
+        # setter -> getters tested with it
+        self.followers = {}
+
+        for test_data in tests_data:
+            setter, getter = test_data.setter, test_data.getter
+            for name, value in [
+                (setter, test_data.set_value),
+                (getter, test_data.get_value),
+            ]:
+                if name is not None and value is not None and name not in self.pvs:
+                    self.pvs[name] = SimulatedPV(
+                        name,
+                        value,
+                        settle_time=0 if name == setter else settle_time,
+                        noise=noise,
+                    )
+                    self.protocols[name] = test_data.protocol.upper()
+
+            if setter is None or getter is None or setter == getter:
+                continue
+            if test_data.set_value is None or test_data.get_value is None:
+                continue
+            self.followers.setdefault(setter, set()).add(getter)
+            key = (setter, value_key(test_data.set_value))
+            self.responses.setdefault(key, []).append((getter, test_data.get_value))
+
+        self.backends = []
+        self._stop = threading.Event()
+
+    def put(self, name, value):
+        """Apply a put on name to the PV and the getters following it."""
+        value = coerce(value, self.pvs[name].type)
+        self.pvs[name].move_to(value, settle=False)
+        self.post(name)
+
+        responses = self.responses.get((name, value_key(value)))
+        if responses is None:
+            responses = [(getter, value) for getter in self.followers.get(name, [])]
+        for getter, getter_value in responses:
+            try:
+                self.pvs[getter].move_to(getter_value)
+            except (TypeError, ValueError):
+                logger.error("Can not set %s to %s", getter, getter_value)
+                continue
+            self.post(getter)
+
+    def post(self, name):
+        for backend in self.backends:
+            if name in backend:
+                backend.post(name, self.pvs[name].value())
+
+    def update(self):
+        """Post the new values of moving and noisy PVs, until stopped."""
+        while not self._stop.wait(UPDATE_PERIOD):
+            for name, pv in self.pvs.items():
+                # keep posting a bit after settle_time, for the target to be reached
+                if pv.noise or pv.changing(margin=2 * UPDATE_PERIOD):
+                    self.post(name)
+
+    def names(self, protocol):
+        return [name for name in self.pvs if self.protocols[name] == protocol]
+
+    def serve(self):
+        """Serve the PVs until interrupted."""
+        ca_names = self.names("CA")
+        pva_names = self.names("PVA")
+        if ca_names and pcaspy is None:
+            logger.error(
+                "pcaspy is not installed, serving %d CA PVs with PVA instead.",
+                len(ca_names),
+            )
+            pva_names += ca_names
+            ca_names = []
+
+        pva = PvaBackend(self, pva_names)
+        self.backends.append(pva)
+        ca = None
+        if ca_names:
+            ca = CaBackend(self, ca_names)
+            self.backends.append(ca)
+
+        updater = threading.Thread(target=self.update, name="sim_update")
+        updater.daemon = True
+        updater.start()
+
+        logger.warning(
+            "Serving %d PVA and %d CA PVs, press Ctrl+C to stop.",
+            len(pva_names),
+            len(ca_names),
+        )
+        try:
+            with Server(providers=[pva.pvs]):
+                while True:
+                    if ca is not None:
+                        ca.process(UPDATE_PERIOD)
+                    else:
+                        time.sleep(UPDATE_PERIOD)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+
+
+class PvaBackend(object):
+    """Serves PVs with p4p."""
+
+    def __init__(self, ioc, names):
+        self.ioc = ioc
+        self.pvs = {}
+        for name in names:
+            pv = ioc.pvs[name]
+            shared_pv = SharedPV(nt=NTScalar(pv.type), initial=pv.value())
+            shared_pv.put(self._put_handler(name))
+            self.pvs[name] = shared_pv
+
+    def __contains__(self, name):
+        return name in self.pvs
+
+    def _put_handler(self, name):
+        def handler(shared_pv, op):
+            try:
+                self.ioc.put(name, op.value())
+            except (TypeError, ValueError) as e:
+                op.done(error=str(e))
+                return
+            if self.ioc.latency > 0:
+                threading.Timer(self.ioc.latency, op.done).start()
+            else:
+                op.done()
+
+        return handler
+
+    def post(self, name, value):
+        self.pvs[name].post(value)
+
+
+class CaBackend(object):
+    """Serves PVs with pcaspy."""
+
+    CA_TYPES = {"d": "float", "s": "string", "ad": "float"}
+
+    def __init__(self, ioc, names):
+        self.ioc = ioc
+        self.names = set(names)
+        self.lock = threading.Lock()
+        pvdb = {}
+        for name in names:
+            pv = ioc.pvs[name]
+            pvdb[name] = {"type": self.CA_TYPES[pv.type], "value": pv.value()}
+            if pv.type == "ad":
+                pvdb[name]["count"] = max(len(pv.target), 1)
+        self.server = pcaspy.SimpleServer()
+        self.server.createPV("", pvdb)
+        self.driver = self._create_driver()
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def _create_driver(self):
+        backend = self
+
+        class Driver(pcaspy.Driver):
+            def write(self, reason, value):
+                backend.ioc.put(reason, value)
+                if backend.ioc.latency > 0:
+                    time.sleep(backend.ioc.latency)
+                return True
+
+        return Driver()
+
+    def post(self, name, value):
+        with self.lock:
+            self.driver.setParam(name, value)
+            self.driver.updatePVs()
+
+    def process(self, period):
+        self.server.process(period)
+
+
+def tests_from_scenarios(scenarios, macros_mgr=None, propagate=False, cache=None):
+    """Returns the TestData of all the tests in the scenarios files."""
+    tests_data = []
+    for scenario_file in scenarios:
+        deserialized = ScenarioReader(
+            scenario_file, macros_mgr=macros_mgr, propagate=propagate, cache=cache
+        ).get_deserialized()
+        for scenario in deserialized.get("scenarios", []):
+            for subtests in TestsGenerator(scenario).tests_list:
+                if subtests is not None:
+                    tests_data += subtests
+    return tests_data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the PVs used by WeTest scenarios from a simulated IOC."
+    )
+    parser.add_argument(
+        "scenario_files",
+        metavar="TEST_FILE",
+        nargs="+",
+        help="Scenario files whose PVs will be served.",
+    )
+    add_macros_arguments(parser)
+    parser.add_argument(
+        "--latency",
+        metavar="SECONDS",
+        type=float,
+        default=LATENCY,
+        help="Time before a put completes (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--settle-time",
+        metavar="SECONDS",
+        type=float,
+        default=SETTLE_TIME,
+        help="Time for a getter to reach its new value (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--noise",
+        metavar="STDDEV",
+        type=float,
+        default=NOISE,
+        help="Gaussian noise added to numbers (default: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    tests_data = tests_from_scenarios(
+        args.scenario_files,
+        macros_mgr=MacrosManager(known_macros=parse_macros(args.macros)),
+        propagate=args.propagate_macros,
+        cache=None if args.no_cache else ScenarioCache(),
+    )
+    SimulatedIOC(
+        tests_data,
+        latency=args.latency,
+        settle_time=args.settle_time,
+        noise=args.noise,
+    ).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ import logging
 
 import datetime
 import re
+from collections import namedtuple
 from pkg_resources import resource_filename
 
 from reportlab.lib import colors
@@ -33,6 +34,7 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Image
 from wetest.common.constants import VERBOSE_FORMATTER, FILE_HANDLER
 
 from wetest.pvs.core import pvs_from_suite
+from wetest.pvs.enexar import acquisition_failure_text
 from wetest.pvs.naming import NamingError
 
 # configure logging
@@ -98,14 +100,21 @@ def get_para_with_style(
     return Paragraph(html, paragraph_style)
 
 
+# what the report shows of a test data
+_Titles = namedtuple(
+    "_Titles", ["test_title", "test_message", "subtest_title", "subtest_message"]
+)
+
+
 class _TestInfo(object):
     """Combine information about tests success status."""
 
-    def __init__(self, test_suite, test_results):
+    def __init__(self, test_suite, test_results, acquisition_failures=None):
         """Initialize _TestInfo.
 
         :param test_suite:   The ran TestSuite.
         :param test_results: The TestResults object.
+        :param acquisition_failures: The ENeXAr AcquisitionFailure, if any.
         """
         logger.debug("init _TestInfo object")
 
@@ -116,72 +125,63 @@ class _TestInfo(object):
 
         self.combined = []
 
-        for test in self.test_suite:
-            short_id = test.id().split(".")[-1]
-            logger.debug("test with id %s in test_suite", test.id())
-            success = True
-            for result, trace in self.test_results.failures:
-                logger.debug("test with id %s in test_results", result.id())
-                logger.debug("test trace: %s", trace)
-                if test.id() == result.id():
-                    self._append_to_combined(
-                        test,
-                        "Failure",
-                        "red",
-                        trace,
-                        infos=test_suite.tests_infos[short_id],
-                    )
-                    success = False
-
-            for result, trace in self.test_results.errors:
-                logger.debug("test with id %s in test_results", result.id())
-                logger.debug("test trace: %s", trace)
-                if test.id() == result.id():
-                    self._append_to_combined(
-                        test,
-                        "Error",
-                        "orange",
-                        trace,
-                        infos=test_suite.tests_infos[short_id],
-                    )
-                    success = False
+        # ENeXAr failures of each test
+        self.acquisitions = {}
+        for failure in acquisition_failures or []:
+            self.acquisitions.setdefault(failure.test_id, []).append(
+                acquisition_failure_text(failure)
+            )
 
-            for result, trace in self.test_results.skipped:
+        # outcomes of each test, by short id
+        outcomes = {}
+        for results, status, color in [
+            (self.test_results.failures, "Failure", "red"),
+            (self.test_results.errors, "Error", "orange"),
+            (self.test_results.skipped, "Skipped", "grey"),
+        ]:
+            for result, trace in results:
                 logger.debug("test with id %s in test_results", result.id())
                 logger.debug("test trace: %s", trace)
-                if test.id() == result.id():
-                    self._append_to_combined(
-                        test, "Skipped", "grey", infos=test_suite.tests_infos[short_id]
-                    )
-                    success = False
-
-            if success:
-                self._append_to_combined(
-                    test, "Success", "green", infos=test_suite.tests_infos[short_id]
+                outcomes.setdefault(result.id().split(".")[-1], []).append(
+                    (status, color, trace)
                 )
 
+        # the data of subtests of a range is made on each lookup
+        for short_id, infos in test_suite.tests_infos.items():
+            logger.debug("test with id %s in test_suite", short_id)
+            for status, color, trace in outcomes.get(
+                short_id, [("Success", "green", None)]
+            ):
+                self._append_to_combined(short_id, status, color, trace, infos)
+
         # # Reorder results by their execution order
         # self.combined = sorted(self.combined, key=lambda k: k['id'])
         # iterating through suite now returns the tests in execution order
 
-    def _append_to_combined(self, test, status, color, trace=None, infos=None):
+    def _append_to_combined(self, test_id, status, color, trace=None, infos=None):
         """Append test information to combined test list.
 
-        :param test:   The test function.
-        :param status: A string describing the result status.
-        :param color:  The text color.
-        :param trace:  In case of failure, the stacktrace.
-        :param infos:  A dictionnary of original test attributes.
+        :param test_id: The test id.
+        :param status:  A string describing the result status.
+        :param color:   The text color.
+        :param trace:   In case of failure, the stacktrace.
+        :param infos:   The test data, only its titles and messages are kept.
         """
         logger.debug("test info: %s#####################", infos)
 
         self.combined.append(
             {
-                "id": test.id(),
+                "id": test_id,
                 "result": status,
                 "trace": shortenTrace(trace),
                 "color": color,
-                "infos": infos,
+                "infos": _Titles(
+                    infos.test_title,
+                    infos.test_message,
+                    infos.subtest_title,
+                    infos.subtest_message,
+                ),
+                "acquisitions": self.acquisitions.get(test_id, []),
             }
         )
 
@@ -189,13 +189,22 @@ class _TestInfo(object):
 class ReportGenerator(object):
     """Generates a PDF report from test unit results."""
 
-    def __init__(self, test_suite, test_results, filename, scenario_data, naming):
+    def __init__(
+        self,
+        test_suite,
+        test_results,
+        filename,
+        scenario_data,
+        naming,
+        acquisition_failures=None,
+    ):
         """Initialize ReportGenerator.
 
         :param test_suite:   The ran TestSuite.
         :param test_results: The tests results.
         :param filename:     The PDF filename.
         :param scenario_data:        The suite and scenarios config from yaml file.
+        :param acquisition_failures: The ENeXAr AcquisitionFailure, if any.
         """
         self.test_suite = test_suite
         self.test_results = test_results
@@ -204,7 +213,9 @@ class ReportGenerator(object):
         self.naming = naming
 
         self.pvs_infos = pvs_from_suite(self.test_suite)
-        self.test_info = _TestInfo(self.test_suite, self.test_results)
+        self.test_info = _TestInfo(
+            self.test_suite, self.test_results, acquisition_failures
+        )
 
     def _parse_id(self, test_id):
         """Return a scn_nb and test_nb from the id string."""
@@ -401,6 +412,12 @@ class ReportGenerator(object):
                         test["trace"], align="left", color=test["color"], style="Italic"
                     )
                 )
+            for acquisition in test["acquisitions"]:
+                middle_cell.append(
+                    get_para_with_style(
+                        acquisition, align="left", color="orange", style="Italic"
+                    )
+                )
 
             array.append(
                 [
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""Runs generated tests on an asyncio event loop (Python 3 only).
+
+run_test_data_async is the async variant of generator.run_test_data:
+connections, puts, gets and delays are awaited on wetest.pvs.aio connections
+instead of blocking a thread. AsyncRunner drives it, running the tests of
+concurrent scenarios as tasks of a single event loop.
+
+What has no asyncio variant is run in the loop executor: pipelined batches,
+reads from the monitored values cache and waiting for the manager to play.
+"""
+
+import asyncio
+import functools
+import time
+from itertools import groupby
+
+from wetest.common.constants import CONTINUE_FROM_TEST, PAUSE_FROM_TEST, ABORT_FROM_TEST
+from wetest.common.constants import LVL_TEST_ERRORED, LVL_TEST_FAILED
+from wetest.common.constants import LVL_TEST_SUCCESS, LVL_TEST_RUNNING, LVL_RUN_CONTROL
+from wetest.gui.specific import STATUS_RETRY
+from wetest.gui.specific import STATUS_SUCCESS, STATUS_FAIL, STATUS_ERROR
+from wetest.pvs.aio import AsyncPVConnection
+from wetest.pvs.core import PVConnection, PUT_TIMEOUT, test_id_sort
+from wetest.pvs.enexar import enexar_logger
+from wetest.testing.generator import PUT_CALLBACK, run_pipelined, tr_logger
+from wetest.testing.reader import CONTINUE, PAUSE
+from wetest.testing.runner import NativeRunner, summarize
+from wetest.testing.selectable_tests import SelectableTestResult, run_control
+
+
+async def in_executor(func, *args, **kwargs):
+    """Call a blocking function in the loop executor."""
+    return await asyncio.get_event_loop().run_in_executor(
+        None, functools.partial(func, *args, **kwargs)
+    )
+
+
+class BlockingConnection(object):
+    """Awaitable adapter of a wetest.pvs.core connection, such as a
+    CachedConnection, its blocking calls being run in the loop executor."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.pvname = connection.pvname
+
+    async def connect(self):
+        return await in_executor(getattr, self.connection, "status") is not None
+
+    async def get(self, as_string=False):
+        return await in_executor(self.connection.get, as_string=as_string)
+
+    async def wait_for_update(self, timeout):
+        return await in_executor(self.connection.wait_for_update, timeout)
+
+
+async def check_getter_async(test_case, test_data, getter):
+    """Read the getter PV and check its value with the test plan.
+
+    With test_data.settle_timeout, the getter is read again on each update
+    (or polled) until it matches or the timeout expires.
+
+    :param test_case: A unittest.TestCase, used for assertions.
+    :param test_data: A TestData instance.
+    :param getter:    An awaitable connection to the getter PV.
+
+    :raises AssertionError: if the getter value does not match (in time).
+    """
+    plan = test_data.plan
+    deadline = time.time() + (test_data.settle_timeout or 0)
+    while True:
+        value = await getter.get(as_string=plan.as_string)
+        try:
+            plan.check(test_case, value)
+            return
+        except AssertionError as exception:
+            if test_data.settle_timeout is None:
+                raise
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise AssertionError(
+                    "%s\n(not settled after %.3Gs)"
+                    % (exception, test_data.settle_timeout)
+                )
+        await getter.wait_for_update(remaining)
+
+
+async def checkpoint(result):
+    """Wait while the manager paused the run, stop result if it aborted,
+    without blocking the event loop."""
+    if run_control().must_wait():
+        await in_executor(run_control().checkpoint, result)
+
+
+async def run_test_data_async(test_case, test_data, result):
+    """Run a test from its data, retrying it if needed, see run_test_data.
+
+    :param test_case: The test case running it, used for assertions.
+    :param test_data: A TestData instance.
+    :param result:    The result of the run, stopped on abort from the manager.
+
+    :raises AssertionError: if the test fails.
+    :raises Exception:      if the test can not be executed.
+    """
+    if test_data.on_failure == CONTINUE:
+        on_failure = CONTINUE_FROM_TEST
+    elif test_data.on_failure == PAUSE:
+        on_failure = PAUSE_FROM_TEST
+    else:
+        on_failure = ABORT_FROM_TEST
+    tr_logger.log(LVL_TEST_RUNNING, "")
+    tr_logger.log(LVL_TEST_RUNNING, "Running    %s    %s", test_data.id, test_data.desc)
+
+    nb_exec = 0
+    setter_error = False
+    getter_error = False
+    while nb_exec <= test_data.retry:
+        start_time = time.time()
+        nb_exec += 1
+        try:
+            plan = test_data.plan
+            if plan.error is not None:
+                raise plan.error
+
+            if test_data.sweep is not None and nb_exec == 1:
+                # retries are run one subtest at a time
+                getter_error = True
+                await in_executor(run_pipelined, test_case, test_data)
+                getter_error = False
+            else:
+                test_data.put_duration = None
+                put_time = None
+
+                # Set PV if required
+                setter_error = True
+                if test_data.setter and test_data.set_value is not None:
+                    setter = AsyncPVConnection.get_pv_connection(
+                        test_data.setter, test_data.protocol
+                    )
+                    test_case.assertTrue(
+                        await setter.connect(),
+                        "Unable to connect to setter PV %s" % (setter.pvname),
+                    )
+
+                    # monitor updates may arrive before a put callback completes
+                    put_time = time.time()
+                    if test_data.put_mode == PUT_CALLBACK:
+                        completed = await setter.put(
+                            plan.set_value, wait=True, timeout=PUT_TIMEOUT
+                        )
+                        test_data.put_duration = time.time() - put_time
+                        test_case.assertTrue(
+                            completed,
+                            "Put on setter PV %s did not complete within %.3Gs"
+                            % (setter.pvname, PUT_TIMEOUT),
+                        )
+                    else:
+                        test_case.assertTrue(
+                            await setter.put(plan.set_value),
+                            "Unable to put setter PV %s" % (setter.pvname),
+                        )
+                setter_error = False
+
+                # Delay, unless the put completed or waiting for the getter to settle
+                if test_data.settle_timeout is None and test_data.put_duration is None:
+                    await asyncio.sleep(test_data.delay)
+
+                # Get and test if required
+                getter_error = True
+                if test_data.getter and test_data.get_value is not None:
+                    if test_data.monitor:
+                        # not a value cached before the put
+                        getter = BlockingConnection(
+                            PVConnection.get_cached_connection(
+                                test_data.getter,
+                                test_data.protocol,
+                                newer_than=put_time,
+                            )
+                        )
+                    else:
+                        getter = AsyncPVConnection.get_pv_connection(
+                            test_data.getter, test_data.protocol
+                        )
+                    test_case.assertTrue(
+                        await getter.connect(),
+                        "Unable to connect to getter PV %s" % (getter.pvname),
+                    )
+                    await check_getter_async(test_case, test_data, getter)
+                getter_error = False
+
+            test_data.elapsed = time.time() - start_time
+            test_data.exception = None
+            tr_logger.log(
+                LVL_TEST_SUCCESS,
+                "Success of %s    (in %.3fs) %s",
+                test_data.id,
+                test_data.elapsed,
+                ""
+                if test_data.put_duration is None
+                else "put completed in %.3fs" % test_data.put_duration,
+            )
+
+            # Logging data using ENeXAr, in background
+            if test_data.pvlogger is not None:
+                enexar_logger.submit(test_data.id, test_data.pvlogger)
+
+            break  # no exception then no need for retry
+
+        # test fails
+        except AssertionError as exception:
+            test_data.elapsed = time.time() - start_time
+            test_data.exception = exception
+            # loop again if they are retries left
+            if nb_exec <= test_data.retry:
+                tr_logger.log(
+                    LVL_TEST_RUNNING,
+                    "Retry (%d/%s) %s    (in %.3fs) %s",
+                    nb_exec,
+                    test_data.retry,
+                    test_data.id,
+                    test_data.elapsed,
+                    exception,
+                )
+                SelectableTestResult.queue_to_gui.put(
+                    [
+                        test_data.id,
+                        STATUS_RETRY,
+                        test_data.elapsed,
+                        test_data.exception,
+                    ]
+                )
+                continue
+
+            # otherwise mark as failed
+            tr_logger.log(
+                LVL_TEST_FAILED,
+                "Failure of %s    (in %.3fs) %s",
+                test_data.id,
+                test_data.elapsed,
+                test_data.exception,
+            )
+            tr_logger.log(LVL_RUN_CONTROL, "%s", on_failure)
+            raise
+
+        # something is not right with this test (ignore retry)
+        except Exception as e:
+            test_data.elapsed = time.time() - start_time
+            test_data.exception = e
+            tr_logger.log(
+                LVL_TEST_ERRORED,
+                "Error   of %s    (in %.3fs) %s%s%s",
+                test_data.id,
+                test_data.elapsed,
+                "[setter error] " * setter_error,
+                "[getter error] " * getter_error,
+                e,
+            )
+            tr_logger.log(LVL_RUN_CONTROL, "%s", on_failure)
+            raise
+
+        finally:
+            await checkpoint(result)
+
+
+class AsyncRunner(NativeRunner):
+    """Runs a suite of SelectableTestCase on an asyncio event loop.
+
+    The tests of the concurrent scenarios (each test with its subtests in
+    order) are run up to `jobs` at a time as tasks of the loop, subtests
+    sharing a setter PV being serialized, as ConcurrentTestSuite does with
+    threads. Other scenarios run their tests in order.
+    """
+
+    def __init__(self, jobs=1, concurrent_scenarios=()):
+        self.jobs = jobs
+        self.concurrent_scenarios = set(concurrent_scenarios)
+        self._setter_locks = {}
+
+    def _run(self, suite, result):
+        asyncio.run(self._run_async(suite, result))
+
+    async def _run_async(self, suite, result):
+        # locks of the previous run belong to its event loop
+        self._setter_locks = {}
+        for scenario, scenario_suite in suite.split_scenarios():
+            if result.shouldStop:
+                break
+            if scenario in self.concurrent_scenarios and self.jobs > 1:
+                await self._run_concurrently(scenario_suite, result)
+            else:
+                await self._run_group(scenario_suite, result)
+
+    async def _run_concurrently(self, suite, result):
+        slots = asyncio.Semaphore(self.jobs)
+
+        async def run_one(group):
+            async with slots:
+                await self._run_group(group, result)
+
+        # a suite per test, its tests being made when run
+        await asyncio.gather(
+            *[
+                run_one(suite.subset(test_ids))
+                for _, test_ids in groupby(
+                    suite.tests_infos, key=lambda test_id: test_id_sort(test_id)[1]
+                )
+            ]
+        )
+
+    async def _run_group(self, tests, result):
+        for test in tests:
+            if result.shouldStop:
+                return
+            setter = test.test_data[test._testMethodName].setter
+            if setter is None:
+                await self.run_test_async(test, result)
+            else:
+                lock = self._setter_locks.setdefault(setter, asyncio.Lock())
+                async with lock:
+                    await self.run_test_async(test, result)
+
+    async def run_test_async(self, test, result):
+        """Run a SelectableTestCase test and record its outcome in result."""
+        test_id = test._testMethodName
+        if not type(test).is_selected(test_id):
+            self.run_test(test, result)
+            return
+
+        try:
+            await run_test_data_async(test, test.test_data[test_id], result)
+        except AssertionError as e:
+            status, summary = STATUS_FAIL, summarize(e)
+        except Exception as e:
+            status, summary = STATUS_ERROR, summarize(e)
+        else:
+            status, summary = STATUS_SUCCESS, None
+
+        if status == STATUS_SUCCESS:
+            result.add_outcome(test, status, summary)
+        else:
+            # may pause until the manager plays again
+            await in_executor(result.add_outcome, test, status, summary)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""Bundles of tests already read from scenario files, see `wetest compile`.
+
+A bundle keeps the tests of each scenario as created by TestsGenerator, with
+the scenario config blocks, the PVs they use, and the content hash of the
+scenario files and their includes. Loading a bundle skips reading,
+substituting macros, validating and creating the tests; only adding them to
+a suite remains, so that unit scenarios are still run in a random order.
+"""
+
+import gc
+import logging
+import os
+from contextlib import contextmanager
+import pickle
+
+from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
+from wetest.common.constants import WeTestError
+from wetest.testing.cache import VERSION, file_hash
+from wetest.testing.generator import TestData
+
+# configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(TERSE_FORMATTER)
+stream_handler.setLevel(logging.WARNING)
+logger.addHandler(stream_handler)
+logger.addHandler(FILE_HANDLER)
+
+# first bytes of a bundle file
+MAGIC = b"WeTest bundle\n"
+
+
+class BundleError(WeTestError):
+    """Unable to load a bundle."""
+
+    pass
+
+
+@contextmanager
+def gc_paused():
+    """Pause the garbage collector, while creating many lasting objects."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def is_bundle(file_path):
+    """Whether file_path is a bundle rather than a scenario file."""
+    try:
+        with open(file_path, "rb") as bundle_file:
+            return bundle_file.read(len(MAGIC)) == MAGIC
+    except (IOError, OSError):
+        return False
+
+
+def pvs_from_generators(generators):
+    """Names of the PVs put or read by the tests of generators, sorted."""
+    pvs = set()
+    for tests_gen in generators:
+        for subtests in tests_gen.tests_list:
+            for test_data in subtests or []:
+                pvs.update(pv for pv in [test_data.setter, test_data.getter] if pv)
+    return sorted(pvs)
+
+
+def write_bundle(file_path, title, generators, dependencies, generation):
+    """Write the tests of generators in a bundle.
+
+    :param file_path:    Path of the bundle to write.
+    :param title:        The suite name.
+    :param generators:   A TestsGenerator per scenario, in order.
+    :param dependencies: Content hash of the scenario files and their includes.
+    :param generation:   The absolute path of the `scenarios` files, the CLI
+                         `macros` and whether to `propagate` them, to read
+                         the scenario files again if they changed.
+
+    :returns: The bundle, as a dict.
+    """
+    scenarios = []
+    for tests_gen in generators:
+        for subtests in tests_gen.tests_list:
+            for test_data in subtests or []:
+                # compiling again is faster than unpickling test plans
+                if isinstance(test_data, TestData):
+                    test_data._plan = None
+        scenarios.append((tests_gen.get_config(), tests_gen.tests_list))
+
+    bundle = {
+        "version": VERSION,
+        "title": title,
+        "scenarios": scenarios,
+        "pvs": pvs_from_generators(generators),
+        "dependencies": dependencies,
+        "generation": generation,
+    }
+
+    # write then rename, not to let a partial bundle be read
+    tmp_path = "%s.%d.tmp" % (file_path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as bundle_file:
+            bundle_file.write(MAGIC)
+            pickle.dump(bundle, bundle_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return bundle
+
+
+def read_bundle(file_path):
+    """Read a bundle written by write_bundle.
+
+    :raises BundleError: if file_path is not a bundle of this WeTest version.
+    """
+    try:
+        with open(file_path, "rb") as bundle_file:
+            if bundle_file.read(len(MAGIC)) != MAGIC:
+                raise BundleError("Not a WeTest bundle: %s" % file_path)
+            bundle = pickle.load(bundle_file)
+    except (IOError, OSError, pickle.UnpicklingError, EOFError) as e:
+        raise BundleError("Unable to read bundle %s: %s" % (file_path, e))
+
+    if bundle.get("version") != VERSION:
+        raise BundleError(
+            "Bundle %s was compiled with WeTest %s, compile it again with WeTest %s."
+            % (file_path, bundle.get("version"), VERSION)
+        )
+    return bundle
+
+
+def outdated_sources(bundle):
+    """Scenario files and includes that changed since bundle was written."""
+    return sorted(
+        file_path
+        for file_path, sha in bundle["dependencies"].items()
+        if file_hash(file_path) != sha
+    )
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""On-disk cache of the scenario files read and validated by ScenarioReader.
+
+An entry is keyed by the file path and content, the macros known before
+reading it and the WeTest version. It keeps the content hash of the file and
+of all its includes, the entry being discarded if one of them changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+
+import pkg_resources
+
+from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
+
+# configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(TERSE_FORMATTER)
+stream_handler.setLevel(logging.WARNING)
+logger.addHandler(stream_handler)
+logger.addHandler(FILE_HANDLER)
+
+VERSION = pkg_resources.require("WeTest")[0].version
+
+
+def default_cache_dir():
+    """The wetest directory of the user cache directory."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "wetest")
+
+
+def content_hash(content):
+    """SHA-256 of a file content, as a hexadecimal string."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def file_hash(file_path):
+    """SHA-256 of a file content, or None if it can not be read."""
+    try:
+        with open(file_path, "r") as wetest_file:
+            return content_hash(wetest_file.read())
+    except (IOError, OSError, UnicodeDecodeError):
+        return None
+
+
+class ScenarioCache(object):
+    """Stores the result of reading scenario files, one file per entry."""
+
+    def __init__(self, directory=None):
+        """
+        :param directory: Where to store entries, by default ~/.cache/wetest.
+        """
+        self.directory = directory if directory is not None else default_cache_dir()
+
+    def key(self, file_path, sha, macros_mgr, propagate, suite_macros):
+        """Key of a scenario file read with macros_mgr in its current state.
+
+        :param sha: The file content hash, see content_hash.
+        """
+        description = json.dumps(
+            [
+                VERSION,
+                file_path,
+                sha,
+                macros_mgr.known_macros,
+                sorted(macros_mgr.used_macros),
+                macros_mgr.unknown_macros,
+                bool(propagate),
+                sorted(suite_macros),
+            ],
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def load(self, key):
+        """The entry stored for key, or None if missing or outdated."""
+        try:
+            with open(self._path(key), "rb") as entry_file:
+                entry = pickle.load(entry_file)
+        except (IOError, OSError):
+            return None
+        except Exception as e:
+            logger.debug("Ignoring unreadable cache entry %s: %s", key, e)
+            return None
+
+        for file_path, sha in entry["dependencies"].items():
+            if file_hash(file_path) != sha:
+                logger.debug("Outdated cache entry %s: %s changed", key, file_path)
+                return None
+        return entry
+
+    def store(self, key, entry):
+        """Store entry for key, a dict with at least the `dependencies` hashes."""
+        tmp_path = None
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            # write then rename, not to let a partial entry be read
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as entry_file:
+                pickle.dump(entry, entry_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except (IOError, OSError, pickle.PicklingError) as e:
+            logger.warning(
+                "Could not write scenario cache in %s: %s", self.directory, e
+            )
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
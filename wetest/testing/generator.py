@@ -17,23 +17,23 @@
 from builtins import str
 from builtins import range
 from builtins import object
+from collections import deque
+from collections.abc import Mapping
 import logging
 import numpy
 import random
 import time
 
 from .selectable_tests import SelectableTestCase, SelectableTestResult
+from .selectable_tests import run_control, skipped_test_factory
 
-from wetest.pvs.core import PVConnection
+from wetest.pvs.core import PVConnection, PUT_TIMEOUT
+from wetest.pvs.enexar import enexar_logger
 from wetest.common.constants import CONTINUE_FROM_TEST, PAUSE_FROM_TEST, ABORT_FROM_TEST
 from wetest.common.constants import LVL_TEST_ERRORED, LVL_TEST_FAILED
 from wetest.common.constants import LVL_TEST_SUCCESS, LVL_TEST_RUNNING, LVL_RUN_CONTROL
 from wetest.common.constants import VERBOSE_FORMATTER, TERSE_FORMATTER, FILE_HANDLER
 from wetest.common.constants import WeTestError, to_string
-from wetest.common.constants import (
-    PAUSE_FROM_MANAGER,
-    ABORT_FROM_MANAGER,
-)
 
 from wetest.gui.specific import STATUS_RETRY
 
@@ -42,6 +42,16 @@ from wetest.testing.reader import ABORT, PAUSE, CONTINUE
 
 NO_KIND = "Missing test kind (values, range or commands)"
 
+# put_mode values: wait for delay after the put, or for the put to complete
+PUT_DELAY = "delay"
+PUT_CALLBACK = "callback"
+
+# Number of differences detailed when waveforms do not match
+DIFF_REPORT_SIZE = 5
+
+# Relative difference under which range values are considered the same
+RANGE_TOLERANCE = 1e-9
+
 # configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -110,6 +120,9 @@ class TestData(object):
         subtest_message=None,
         protocol="PVA",
         pvlogger=None,
+        monitor=False,
+        settle_timeout=None,
+        put_mode=PUT_DELAY,
     ):
         """Initialize a TestData structure.
 
@@ -130,6 +143,11 @@ class TestData(object):
         :param subtest_message: If any a subtest message.
         :param protocol: EPICS protocol: either CA or PVA.
         :param pvlogger: PV and configuration to save data using ENeXAr.
+        :param monitor: Read getter from a monitor instead of a network get.
+        :param settle_timeout: If set, instead of waiting for delay, wait at most
+                               settle_timeout seconds for the getter to match.
+        :param put_mode: Either PUT_DELAY, or PUT_CALLBACK to wait for the put
+                         completion instead of delay.
         """
         if on_failure.lower() not in [ABORT, PAUSE, CONTINUE]:
             logger.critical("Unexpected on_failure value: %s" % on_failure)
@@ -153,6 +171,15 @@ class TestData(object):
         self.subtest_message = subtest_message
         self.protocol = protocol
         self.pvlogger = pvlogger
+        self.monitor = monitor
+        self.settle_timeout = settle_timeout
+        self.put_mode = put_mode
+        # time for the put to complete, with PUT_CALLBACK
+        self.put_duration = None
+        # TestPlan, compiled on first use
+        self._plan = None
+        # set by TestsGenerator for pipelined tests
+        self.sweep = None
 
         logger.debug("set_value: %s (%s)", set_value, type(set_value))
         logger.debug("get_value: %s (%s)", get_value, type(get_value))
@@ -177,6 +204,18 @@ class TestData(object):
 
         logger.debug("%s", self)
 
+    def compile(self):
+        """Compile this test into a TestPlan, see TestData.plan."""
+        self._plan = TestPlan(self)
+        return self._plan
+
+    @property
+    def plan(self):
+        """The TestPlan to run this test, compiled on first use."""
+        if self._plan is None:
+            self.compile()
+        return self._plan
+
     def __str__(self):
         output = self.__repr__()
         output += "\n\ttest_title: %s" % self.test_title
@@ -197,6 +236,9 @@ class TestData(object):
         output += "\n\tdesc: %s" % self.desc
         output += "\n\tprotocol: %s" % self.protocol
         output += "\n\tpvlogger: %s" % self.pvlogger
+        output += "\n\tmonitor: %s" % self.monitor
+        output += "\n\tsettle_timeout: %s" % self.settle_timeout
+        output += "\n\tput_mode: %s" % self.put_mode
         return output
 
 
@@ -259,70 +301,495 @@ def get_key(prefered, backup, key):
     return prefered.get(key, backup.get(key))
 
 
-def test_generator(test_data):
-    """Generates a test function from test's data.
+def check_consistency(test_data):
+    """Check that test_data describes a test that can be executed.
 
-    :param test_data: a TestData instance (usually extracted from a YAML file).
-    :param description: the test's docstring.
+    :param test_data: A TestData instance.
 
-    :returns: a test function, to be add to a unittest.TestCase.
+    :raises EmptyTest:        if there is nothing to set nor get.
+    :raises InconsistantTest: if a setter or getter misses its value, or the opposite.
     """
-    logger.info("Generating test: %s", test_data.desc)
+    if test_data.subtest_title == NO_KIND:
+        raise EmptyTest("Test has no range, values nor commands.")
 
-    @add_doc(test_data.desc)
-    def test(self):
-        """A test case generated from test's data.
+    if test_data.setter is None and test_data.getter is None:
+        raise EmptyTest("No setter nor getter set for this test.")
+
+    if test_data.setter is not None and test_data.set_value is None:
+        raise InconsistantTest("[setter error] No value associated to setter.")
+
+    if test_data.getter is not None and test_data.get_value is None:
+        raise InconsistantTest("[getter error] No value associated to getter.")
+
+    if test_data.set_value is not None and test_data.setter is None:
+        raise InconsistantTest("[setter error] No setter associated to set value.")
+
+    if test_data.get_value is not None and test_data.getter is None:
+        raise InconsistantTest("[getter error] No getter associated to get value.")
 
-        If margin is used, the comparison is not a strict equality, but more
-        or less the given percentage. For instance, if margin is used with a
-        value of 10%, all values between 9V and 11V will be considered as good
-        value.
 
+def convert_values(values):
+    """Convert values to what pyepics expects.
+
+    pyepics expect single characters to be passed as integer,
+    strings in a list are converted to int or float where possible.
+    """
+    if not isinstance(values, list):
+        return values
+    converted = []
+    for v in values:
+        if isinstance(v, str):
+            if len(v) == 1:
+                converted.append(ord(v))
+            else:
+                try:
+                    converted.append(int(v))
+                except ValueError:
+                    converted.append(float(v))
+        else:
+            converted.append(v)
+    return converted
+
+
+class TestPlan(object):
+    """A TestData compiled once into what running it requires.
+
+    error:     exception to raise when running the test, if it is inconsistent
+    set_value: value to put in the setter, converted for pyepics
+    as_string: whether the getter should be read as a string
+    check:     check(test_case, measured_value) compares the getter value with
+               the expected value, with the error message prepared beforehand
+    """
+
+    def __init__(self, test_data):
+        """Check test_data consistency, convert its values and pick a comparison.
+
+        :param test_data: A TestData instance.
         """
-        if test_data.on_failure == CONTINUE:
-            on_failure = CONTINUE_FROM_TEST
-        elif test_data.on_failure == PAUSE:
-            on_failure = PAUSE_FROM_TEST
+        self.getter = test_data.getter
+        self.error = None
+        self.set_value = None
+        self.as_string = False
+        self.check = None
+        try:
+            check_consistency(test_data)
+            self.set_value = convert_values(test_data.set_value)
+            if test_data.getter is not None:
+                self._compile_check(test_data)
+        except Exception as e:
+            self.error = e
+
+    def _compile_check(self, test_data):
+        get_value = test_data.get_value
+
+        # recover margin and delta
+        margin_delta_str = ""
+        if test_data.margin is not None:
+            margin_delta_str += " ±%.3G%%" % (test_data.margin * 100)
+        if test_data.margin is not None and test_data.delta is not None:
+            margin_delta_str += " or"
+        if test_data.delta is not None:
+            margin_delta_str += " ±%.3G" % test_data.delta
+
+        # check a string value
+        if isinstance(get_value, str):
+            self.as_string = True
+            self.expected = get_value
+            self.message = "Expected %s to be %s, but got " % (
+                self.getter,
+                to_string(get_value),
+            )
+            self.check = self._check_equal
+
+        # check a table of values
+        elif isinstance(get_value, list):
+            self.expected = numpy.array(convert_values(get_value))
+            self.padded = self.expected
+            self.rtol = test_data.margin
+            self.atol = test_data.delta
+            self.margin_delta_str = margin_delta_str
+            self.check = self._check_array
+
+        # check a number or boolean without margin or delta
+        elif not test_data.margin and not test_data.delta:
+            self.expected = get_value
+            self.message = "Expected %s to be %s, but got " % (
+                self.getter,
+                to_string(get_value),
+            )
+            self.check = self._check_equal
+
+        # check a number or boolean with margin or delta
         else:
-            on_failure = ABORT_FROM_TEST
-        tr_logger.log(LVL_TEST_RUNNING, "")
-        tr_logger.log(
-            LVL_TEST_RUNNING, "Running    %s    %s", test_data.id, test_data.desc
+            if test_data.margin is not None:
+                margin = abs(float(get_value) * float(test_data.margin))
+            else:
+                margin = 0
+            if test_data.delta is not None:
+                delta = abs(float(test_data.delta))
+            else:
+                delta = 0
+
+            if margin > delta:
+                self.max_delta = margin
+                margin_delta_str = "±%.3G%%" % (test_data.margin * 100)
+            else:
+                self.max_delta = delta
+                margin_delta_str = "±%.3G" % delta
+
+            self.expected = float(get_value)
+            self.message = (
+                "Expected %s to be %.3G %s (ie. within [%.3G,%.3G]), but got "
+                % (
+                    self.getter,
+                    self.expected,
+                    margin_delta_str,
+                    self.expected - self.max_delta,
+                    self.expected + self.max_delta,
+                )
+            )
+            self.check = self._check_tolerance
+
+    def _check_equal(self, test_case, measured_value):
+        if not self.expected == measured_value:
+            test_case.assertEqual(
+                self.expected, measured_value, self.message + to_string(measured_value)
+            )
+
+    def _check_tolerance(self, test_case, measured_value):
+        measured_value = (
+            float("NaN") if measured_value is None else float(measured_value)
         )
+        if not abs(self.expected - measured_value) <= self.max_delta:
+            test_case.assertAlmostEqual(
+                self.expected,
+                measured_value,
+                delta=self.max_delta,
+                msg=self.message + "%.3G" % measured_value,
+            )
+
+    def _padded_expected(self, length):
+        """Expected values padded with zeros to length, kept for the next runs."""
+        if len(self.padded) != length:
+            self.padded = numpy.zeros(length, dtype=self.expected.dtype)
+            self.padded[: len(self.expected)] = self.expected
+        return self.padded
+
+    def _check_array(self, test_case, measured_value):
+        if not isinstance(measured_value, numpy.ndarray):
+            if len(self.expected) == 1:
+                # pyepics get does not return a list in case of
+                # a single-element waveform
+                measured_value = numpy.array([measured_value])
+            else:
+                raise ValueError(
+                    "Expected %s to be an array but got %s"
+                    % (self.getter, to_string(measured_value))
+                )
 
-        nb_exec = 0
-        setter_error = False
-        getter_error = False
-        while nb_exec <= test_data.retry:
-            start_time = time.time()
-            nb_exec += 1
-            try:
-                # Check for empty or inconsistant test
-                if test_data.subtest_title == NO_KIND:
-                    raise EmptyTest("Test has no range, values nor commands.")
-
-                if test_data.setter is None and test_data.getter is None:
-                    raise EmptyTest("No setter nor getter set for this test.")
-
-                if test_data.setter is not None and test_data.set_value is None:
-                    raise InconsistantTest(
-                        "[setter error] No value associated to setter."
-                    )
+        if len(measured_value) < len(self.expected):
+            test_case.fail(
+                "Expected %s to be %s elements long, and not %s: %s"
+                % (
+                    self.getter,
+                    len(self.expected),
+                    len(measured_value),
+                    short_string(measured_value),
+                )
+            )
+
+        # add zero after the expected values
+        expected_value = self._padded_expected(len(measured_value))
+
+        # compare and allow margin and delta, as floats not to wrap integers
+        isclose = measured_value == expected_value
+        if self.rtol is not None or self.atol is not None:
+            abs_error = numpy.abs(measured_value.astype(numpy.float64) - expected_value)
+            tolerance = 0
+            if self.rtol is not None:
+                tolerance = self.rtol * numpy.abs(expected_value)
+            if self.atol is not None:
+                tolerance = numpy.maximum(tolerance, self.atol)
+            isclose |= abs_error <= tolerance
+
+        if not isclose.all():  # describe differences only if not OK
+            test_case.fail(
+                self._describe_mismatch(expected_value, measured_value, isclose)
+            )
+
+    def _describe_mismatch(self, expected_value, measured_value, isclose):
+        """Summary of the differences, bounded whatever the waveform length."""
+        mismatches = numpy.flatnonzero(~isclose)
+        expected_mis = expected_value[mismatches].astype(numpy.float64)
+        measured_mis = measured_value[mismatches].astype(numpy.float64)
+        abs_error = numpy.abs(measured_mis - expected_mis)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            rel_error = abs_error / numpy.abs(expected_mis)
+        worst = mismatches[numpy.argsort(-abs_error, kind="stable")[:DIFF_REPORT_SIZE]]
+
+        def describe(indexes):
+            return ", ".join(
+                "[%d] %s instead of %s"
+                % (idx, to_string(measured_value[idx]), to_string(expected_value[idx]))
+                for idx in indexes
+            )
+
+        return (
+            "Expected %s to be %s%s,\nbut got %s,\n"
+            "%d of %d elements differ, max abs error %.3G, max rel error %.3G,\n"
+            "first differences: %s,\nworst differences: %s"
+            % (
+                self.getter,
+                short_string(expected_value),
+                self.margin_delta_str,
+                short_string(measured_value),
+                len(mismatches),
+                len(measured_value),
+                numpy.fmax.reduce(abs_error),
+                numpy.fmax.reduce(rel_error),
+                describe(mismatches[:DIFF_REPORT_SIZE]),
+                describe(worst),
+            )
+        )
 
-                if test_data.getter is not None and test_data.get_value is None:
-                    raise InconsistantTest(
-                        "[getter error] No value associated to getter."
-                    )
 
-                if test_data.set_value is not None and test_data.setter is None:
-                    raise InconsistantTest(
-                        "[setter error] No setter associated to set value."
-                    )
+def short_string(array):
+    """String of an array, summarized in its first and last elements if long."""
+    return numpy.array2string(
+        numpy.asarray(array),
+        separator=", ",
+        threshold=2 * DIFF_REPORT_SIZE,
+        edgeitems=DIFF_REPORT_SIZE,
+    ).replace("\n", "")
 
-                if test_data.get_value is not None and test_data.getter is None:
-                    raise InconsistantTest(
-                        "[getter error] No getter associated to get value."
-                    )
+
+def check_getter(test_case, test_data, getter):
+    """Check the getter value against the expected value of test_data.
+
+    If margin is used, the comparison is not a strict equality, but more
+    or less the given percentage. For instance, if margin is used with a
+    value of 10%, all values between 9V and 11V will be considered as good
+    value.
+
+    :param test_case: The running unittest.TestCase, used for assertions.
+    :param test_data: A TestData instance.
+    :param getter:    A connection to the getter PV.
+
+    :raises AssertionError: if the getter value does not match.
+    """
+    plan = test_data.plan
+    plan.check(test_case, getter.get(as_string=plan.as_string))
+
+
+def wait_until_match(test_case, test_data, getter):
+    """Check the getter value until it matches or test_data.settle_timeout expires.
+
+    The getter is checked again on each monitor update, or polled otherwise.
+    At the deadline, the last mismatch (with the last value seen) is raised.
+
+    :param test_case: The running unittest.TestCase, used for assertions.
+    :param test_data: A TestData instance.
+    :param getter:    A connection to the getter PV.
+
+    :raises AssertionError: if the getter value never matched in time.
+    """
+    deadline = time.time() + test_data.settle_timeout
+    while True:
+        try:
+            check_getter(test_case, test_data, getter)
+            return
+        except AssertionError as exception:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise AssertionError(
+                    "%s\n(not settled after %.3Gs)"
+                    % (exception, test_data.settle_timeout)
+                )
+        getter.wait_for_update(remaining)
+
+
+class Sweep(object):
+    """Runs the subtests of a pipelined test in batches.
+
+    A batch puts the setters of consecutive subtests at once, waits for the
+    longest delay once, then gets all their getters at once. A batch ends
+    before a subtest putting a PV already put or read in the batch.
+    Each subtest then checks its own value, when it is run.
+    """
+
+    def __init__(self, subtests):
+        """
+        :param subtests: The TestData of the test, in execution order,
+                         or the LazySubtests of a range.
+        """
+        self.subtests = subtests
+        # subtests appended later, such as the finally statement, are not run
+        self.length = len(subtests)
+        self._positions = None
+        # (test_data, put error, PVResult of the getter) of the current batch
+        self.pending = deque()
+
+    def __getstate__(self):
+        # positions are object ids, made again when unpickled
+        return {"subtests": self.subtests, "length": self.length}
+
+    def __setstate__(self, state):
+        # subtests may not be unpickled yet, they share the sweep
+        self.subtests = state["subtests"]
+        self.length = state["length"]
+        self._positions = None
+        self.pending = deque()
+
+    def position(self, test_data):
+        """Index of test_data in the subtests."""
+        if isinstance(test_data, SubtestView):
+            return test_data.row
+        if self._positions is None:
+            if isinstance(self.subtests, LazySubtests):
+                # views of the rows are made again on each access, found by row
+                others = enumerate(self.subtests.appended, len(self.subtests.table))
+            else:
+                others = enumerate(self.subtests)
+            self._positions = {id(subtest): idx for idx, subtest in others}
+        return self._positions[id(test_data)]
+
+    def next_batch(self, test_case_cls, test_data):
+        """Returns the subtests to run in a batch starting with test_data."""
+        batch = []
+        used_pvs = set()
+        start = self.position(test_data)
+        for idx in range(start, self.length):
+            if idx == start:
+                subtest = test_data
+            else:
+                subtest = self.subtests[idx]
+                if not test_case_cls.is_selected(subtest.id):
+                    continue
+            if subtest.setter is not None and subtest.setter in used_pvs:
+                break
+            batch.append(subtest)
+            used_pvs.update(pv for pv in [subtest.setter, subtest.getter] if pv)
+        return batch
+
+    def run_batch(self, batch):
+        """Put, wait and get for all the subtests of batch."""
+        protocol = batch[0].protocol
+        values = {}
+        for subtest in batch:
+            if subtest.setter and subtest.set_value is not None:
+                values[subtest.setter] = subtest.plan.set_value
+        wait = batch[0].put_mode == PUT_CALLBACK
+        put_errors = {}
+        start_time = time.time()
+        for result in PVConnection.put_many(values, protocol, wait=wait):
+            if result.error is not None:
+                put_errors[result.name] = result.error
+        put_duration = time.time() - start_time
+
+        # no delay once the puts are completed
+        if wait and values:
+            for subtest in batch:
+                if subtest.setter in values:
+                    subtest.put_duration = put_duration
+        else:
+            time.sleep(max(subtest.delay for subtest in batch))
+
+        getters = {}
+        for subtest in batch:
+            if subtest.getter and subtest.get_value is not None:
+                getters.setdefault(subtest.plan.as_string, set()).add(subtest.getter)
+        got = {}
+        for as_string, names in getters.items():
+            for result in PVConnection.get_many(names, protocol, as_string=as_string):
+                got[(result.name, as_string)] = result
+
+        logger.info(
+            "Pipelined %d subtests: %d puts and %d gets",
+            len(batch),
+            len(values),
+            len(got),
+        )
+        self.pending = deque(
+            (
+                subtest,
+                put_errors.get(subtest.setter),
+                got.get((subtest.getter, subtest.plan.as_string)),
+            )
+            for subtest in batch
+        )
+
+    def results(self, test_case_cls, test_data):
+        """Returns the subtest of the batch, put error and getter PVResult of
+        test_data, the subtest keeping the plan compiled by the batch.
+
+        A new batch is run unless test_data is the next subtest of the current one.
+        """
+        if not self.pending or self.position(self.pending[0][0]) != self.position(
+            test_data
+        ):
+            self.run_batch(self.next_batch(test_case_cls, test_data))
+        return self.pending.popleft()
+
+
+def run_pipelined(test_case, test_data):
+    """Check test_data from the results of its batch, see Sweep.
+
+    :param test_case: The running SelectableTestCase, used for assertions.
+    :param test_data: A TestData instance, with a sweep.
+
+    :raises AssertionError: if the put failed or the getter value does not match.
+    """
+    subtest, put_error, get_result = test_data.sweep.results(type(test_case), test_data)
+    test_case.assertIsNone(
+        put_error,
+        "Unable to put setter PV %s: %s" % (test_data.setter, put_error),
+    )
+    if test_data.getter and test_data.get_value is not None:
+        test_case.assertIsNone(
+            get_result.error,
+            "Unable to get getter PV %s: %s" % (test_data.getter, get_result.error),
+        )
+        subtest.plan.check(test_case, get_result.value)
+
+
+def run_test_data(test_case, test_data, result):
+    """Run a test from its data, retrying it if needed.
+
+    :param test_case: The test case running it, used for assertions.
+    :param test_data: A TestData instance.
+    :param result:    The result of the run, stopped on abort from the manager.
+
+    :raises AssertionError: if the test fails.
+    :raises Exception:      if the test can not be executed.
+    """
+    if test_data.on_failure == CONTINUE:
+        on_failure = CONTINUE_FROM_TEST
+    elif test_data.on_failure == PAUSE:
+        on_failure = PAUSE_FROM_TEST
+    else:
+        on_failure = ABORT_FROM_TEST
+    tr_logger.log(LVL_TEST_RUNNING, "")
+    tr_logger.log(LVL_TEST_RUNNING, "Running    %s    %s", test_data.id, test_data.desc)
+
+    nb_exec = 0
+    setter_error = False
+    getter_error = False
+    while nb_exec <= test_data.retry:
+        start_time = time.time()
+        nb_exec += 1
+        try:
+            plan = test_data.plan
+            if plan.error is not None:
+                raise plan.error
+
+            if test_data.sweep is not None and nb_exec == 1:
+                # retries are run one subtest at a time
+                getter_error = True
+                run_pipelined(test_case, test_data)
+                getter_error = False
+            else:
+                test_data.put_duration = None
+                put_time = None
 
                 # Set PV if required
 
@@ -331,324 +798,498 @@ def test_generator(test_data):
                     setter = PVConnection.get_pv_connection(
                         test_data.setter, test_data.protocol
                     )
-                    self.assertIsNotNone(
+                    test_case.assertIsNotNone(
                         setter.status,
                         "Unable to connect to setter PV %s" % (setter.pvname),
                     )
 
-                    # pyepics expect single characters to be passed as integer
-                    # convert string to int or float where possible
-                    if isinstance(test_data.set_value, list):
-                        set_value = []
-                        for v in test_data.set_value:
-                            if isinstance(v, str):
-                                if len(v) == 1:
-                                    set_value.append(ord(v))
-                                else:
-                                    try:
-                                        set_value.append(int(v))
-                                    except ValueError:
-                                        set_value.append(float(v))
-                            else:
-                                set_value.append(v)
+                    # monitor updates may arrive before a put callback completes
+                    put_time = time.time()
+                    if test_data.put_mode == PUT_CALLBACK:
+                        completed = setter.put(
+                            plan.set_value, wait=True, timeout=PUT_TIMEOUT
+                        )
+                        test_data.put_duration = time.time() - put_time
+                        test_case.assertTrue(
+                            completed,
+                            "Put on setter PV %s did not complete within %.3Gs"
+                            % (setter.pvname, PUT_TIMEOUT),
+                        )
                     else:
-                        set_value = test_data.set_value
-
-                    setter.put(set_value)
+                        setter.put(plan.set_value)
 
                 setter_error = False
 
-                # Delay
-                time.sleep(test_data.delay)
+                # Delay, unless the put completed or waiting for the getter to settle
+                if test_data.settle_timeout is None and test_data.put_duration is None:
+                    time.sleep(test_data.delay)
 
                 # Get and test if required
                 getter_error = True
                 if test_data.getter and test_data.get_value is not None:
 
-                    getter = PVConnection.get_pv_connection(
-                        test_data.getter, test_data.protocol
-                    )
-                    self.assertIsNotNone(
+                    if test_data.monitor:
+                        # not a value cached before the put
+                        getter = PVConnection.get_cached_connection(
+                            test_data.getter, test_data.protocol, newer_than=put_time
+                        )
+                    else:
+                        getter = PVConnection.get_pv_connection(
+                            test_data.getter, test_data.protocol
+                        )
+                    test_case.assertIsNotNone(
                         getter.status,
                         "Unable to connect to getter PV %s" % (getter.pvname),
                     )
 
-                    # check a string value
-                    if isinstance(test_data.get_value, str):
-                        expected_value = test_data.get_value
-                        measured_value = getter.get(as_string=True)
-
-                        self.assertEqual(
-                            expected_value,
-                            measured_value,
-                            "Expected %s to be %s, but got %s"
-                            % (
-                                getter.pvname,
-                                to_string(expected_value),
-                                to_string(measured_value),
-                            ),
-                        )
-
-                    # check a table of values
-                    elif isinstance(test_data.get_value, list):
-
-                        # get the measured value to know the lenght of the table to compare
-                        measured_value = getter.get()
-                        if not isinstance(measured_value, numpy.ndarray):
-                            if len(test_data.get_value) == 1:
-                                # pyepics get does not return a list in case of
-                                # a single-element waveform
-                                measured_value = numpy.array([measured_value])
-                            else:
-                                raise ValueError(
-                                    "Expected %s to be an array but got %s"
-                                    % (getter.pvname, to_string(measured_value))
-                                )
-
-                        # pyepics expect single characters to be passed as integer
-                        # convert string to int or float where possible
-                        expected_value = []
-                        for v in test_data.get_value:
-                            if isinstance(v, str):
-                                if len(v) == 1:
-                                    expected_value.append(ord(v))
-                                else:
-                                    try:
-                                        expected_value.append(int(v))
-                                    except ValueError:
-                                        expected_value.append(float(v))
-                            else:
-                                expected_value.append(v)
-
-                        # add zero after the expected values
-                        expected_value += [0] * (
-                            len(measured_value) - len(test_data.get_value)
-                        )
-
-                        self.assertTrue(
-                            len(expected_value) == len(measured_value),
-                            "Expected %s to be %s elements long, and not %s: %s"
-                            % (
-                                getter.pvname,
-                                len(expected_value),
-                                len(measured_value),
-                                to_string(measured_value),
-                            ),
-                        )
-
-                        # recover margin and delta
-                        margin_delta_str = ""
-                        rtol = None
-                        atol = None
-                        if test_data.margin is not None:
-                            margin_delta_str += " ±%.3G%%" % (test_data.margin * 100)
-                            rtol = test_data.margin
-                        if test_data.margin is not None and test_data.delta is not None:
-                            margin_delta_str += " or"
-                        if test_data.delta is not None:
-                            margin_delta_str += " ±%.3G" % test_data.delta
-                            atol = test_data.delta
-
-                        # compare and allow margin and delta
-                        isclose = numpy.equal(measured_value, expected_value)
-                        if rtol is not None:
-                            isclose_marging = numpy.isclose(
-                                measured_value, expected_value, rtol=rtol, atol=0
-                            )
-                            isclose = numpy.logical_or(isclose, isclose_marging)
-                        if atol is not None:
-                            isclose_delta = numpy.isclose(
-                                measured_value, expected_value, rtol=0, atol=atol
-                            )
-                            isclose = numpy.logical_or(isclose, isclose_delta)
-
-                        # show "OK" if close otherwise show difference
-                        all_close = numpy.all(isclose)
-                        if not all_close:  # compute diff only if not OK
-                            diff = numpy.abs(measured_value - expected_value)
-                            diff[isclose is True] = 0
-                            diff_str = ["OK" if x == 0 else x for x in diff]
-
-                            self.assertTrue(
-                                all_close,
-                                "Expected %s to be %s%s,\nbut got %s,\ndifference is %s"
-                                % (
-                                    getter.pvname,
-                                    to_string(expected_value),
-                                    margin_delta_str,
-                                    to_string(measured_value),
-                                    to_string(diff_str),
-                                ),
-                            )
-
-                    # check a number or boolean without margin or delta
-                    elif not test_data.margin and not test_data.delta:
-                        expected_value = test_data.get_value
-                        measured_value = getter.get()
-                        self.assertEqual(
-                            expected_value,
-                            measured_value,
-                            "Expected %s to be %s, but got %s"
-                            % (
-                                getter.pvname,
-                                to_string(expected_value),
-                                to_string(measured_value),
-                            ),
-                        )
-
-                    # check a number or boolean with margin or delta
+                    if test_data.settle_timeout is None:
+                        plan.check(test_case, getter.get(as_string=plan.as_string))
                     else:
-                        if test_data.margin is not None:
-                            margin = abs(
-                                float(test_data.get_value) * float(test_data.margin)
-                            )
-                        else:
-                            margin = 0
-                        if test_data.delta is not None:
-                            delta = abs(float(test_data.delta))
-                        else:
-                            delta = 0
-
-                        if margin > delta:
-                            max_delta = margin
-                            margin_delta_str = "±%.3G%%" % (test_data.margin * 100)
-                        else:
-                            max_delta = delta
-                            margin_delta_str = "±%.3G" % delta
-
-                        expected_value = (
-                            float("NaN")
-                            if test_data.get_value is None
-                            else float(test_data.get_value)
-                        )
-                        measured_value = (
-                            float("NaN")
-                            if getter.get() is None
-                            else float(getter.get())
-                        )
-
-                        self.assertAlmostEqual(
-                            test_data.get_value,
-                            measured_value,
-                            delta=max_delta,
-                            msg="Expected %s to be %.3G %s (ie. within [%.3G,%.3G]), but got %.3G"
-                            % (
-                                getter.pvname,
-                                expected_value,
-                                margin_delta_str,
-                                expected_value - max_delta,
-                                expected_value + max_delta,
-                                measured_value,
-                            ),
-                        )
+                        wait_until_match(test_case, test_data, getter)
 
                 getter_error = False
-                test_data.elapsed = time.time() - start_time
-                test_data.exception = None
+            test_data.elapsed = time.time() - start_time
+            test_data.exception = None
+            tr_logger.log(
+                LVL_TEST_SUCCESS,
+                "Success of %s    (in %.3fs) %s",
+                test_data.id,
+                test_data.elapsed,
+                ""
+                if test_data.put_duration is None
+                else "put completed in %.3fs" % test_data.put_duration,
+            )
+
+            # Logging data using ENeXAr, in background
+            if test_data.pvlogger is not None:
+                enexar_logger.submit(test_data.id, test_data.pvlogger)
+
+            break  # no exception then no need for retry
+
+        # test fails
+        except (AssertionError) as exception:
+            test_data.elapsed = time.time() - start_time
+            test_data.exception = exception
+            # loop again if they are retries left
+            if nb_exec <= test_data.retry:
                 tr_logger.log(
-                    LVL_TEST_SUCCESS,
-                    "Success of %s    (in %.3fs) ",
+                    LVL_TEST_RUNNING,
+                    "Retry (%d/%s) %s    (in %.3fs) %s",
+                    nb_exec,
+                    test_data.retry,
                     test_data.id,
                     test_data.elapsed,
+                    exception,
                 )
-
-                # Logging data using ENeXAr
-                if test_data.pvlogger is not None:
-                    for pv in test_data.pvlogger:
-                        try:
-                            enexar = PVConnection.get_pv_connection(
-                                pv["server"] + "ACQUIRE_S", "PVA"
-                            )
-                            rpc_value = pv.copy()
-                            rpc_value.pop("server")
-                            if "acquisitions" in rpc_value:
-                                rpc_value["n_acq"] = str(rpc_value.pop("acquisitions"))
-                            if not rpc_value["path"].endswith(".h5") and not rpc_value[
-                                "path"
-                            ].endswith(".hdf5"):
-                                rpc_value["path"] = rpc_value["path"] + ".h5"
-                            status = enexar.rpc(rpc_value)
-                            if status is False:
-                                logger.error(
-                                    "An error ocurred while trying to log PV {0} to ENeXAr.\n{1}.".format(
-                                        rpc_value["pv"], status.alarm.message
-                                    )
-                                )
-                        except Exception:
-                            logger.error(
-                                'Could not connect to the ENeXAr server with prefix "{0}". Please check that it is available.'.format(
-                                    pv["server"]
-                                )
-                            )
-
-                break  # no exception then no need for retry
-
-            # test fails
-            except (AssertionError) as exception:
-                test_data.elapsed = time.time() - start_time
-                test_data.exception = exception
-                # loop again if they are retries left
-                if nb_exec <= test_data.retry:
-                    tr_logger.log(
-                        LVL_TEST_RUNNING,
-                        "Retry (%d/%s) %s    (in %.3fs) %s",
-                        nb_exec,
-                        test_data.retry,
+                SelectableTestResult.queue_to_gui.put(
+                    [
                         test_data.id,
+                        STATUS_RETRY,
                         test_data.elapsed,
-                        exception,
-                    )
-                    SelectableTestResult.queue_to_gui.put(
-                        [
-                            test_data.id,
-                            STATUS_RETRY,
-                            test_data.elapsed,
-                            test_data.exception,
-                        ]
-                    )
+                        test_data.exception,
+                    ]
+                )
 
-                    continue
+                continue
 
-                # otherwise mark as failed
-                tr_logger.log(
-                    LVL_TEST_FAILED,
-                    "Failure of %s    (in %.3fs) %s",
-                    test_data.id,
-                    test_data.elapsed,
-                    test_data.exception,
-                )
-                tr_logger.log(LVL_RUN_CONTROL, "%s", on_failure)
+            # otherwise mark as failed
+            tr_logger.log(
+                LVL_TEST_FAILED,
+                "Failure of %s    (in %.3fs) %s",
+                test_data.id,
+                test_data.elapsed,
+                test_data.exception,
+            )
+            tr_logger.log(LVL_RUN_CONTROL, "%s", on_failure)
+
+            raise
+
+        # something is not right with this test (ignore retry)
+        except (EmptyTest, InconsistantTest, Exception) as e:
+            test_data.elapsed = time.time() - start_time
+            test_data.exception = e
+            tr_logger.log(
+                LVL_TEST_ERRORED,
+                "Error   of %s    (in %.3fs) %s%s%s",
+                test_data.id,
+                test_data.elapsed,
+                "[setter error] " * setter_error,
+                "[getter error] " * getter_error,
+                e,
+            )
+            tr_logger.log(LVL_RUN_CONTROL, "%s", on_failure)
+
+            raise
+
+        finally:
+            run_control().checkpoint(result)
 
-                raise
 
-            # something is not right with this test (ignore retry)
-            except (EmptyTest, InconsistantTest, Exception) as e:
-                test_data.elapsed = time.time() - start_time
-                test_data.exception = e
-                tr_logger.log(
-                    LVL_TEST_ERRORED,
-                    "Error   of %s    (in %.3fs) %s%s%s",
-                    test_data.id,
-                    test_data.elapsed,
-                    "[setter error] " * setter_error,
-                    "[getter error] " * getter_error,
-                    e,
-                )
-                tr_logger.log(LVL_RUN_CONTROL, "%s", on_failure)
+def test_generator(test_data):
+    """Generates a test function from test's data.
+
+    :param test_data: a TestData instance (usually extracted from a YAML file).
+    :param description: the test's docstring.
 
-                raise
+    :returns: a test function, to be add to a unittest.TestCase.
+    """
+    desc = test_data.desc
+    logger.info("Generating test: %s", desc)
 
-            finally:
-                if not SelectableTestResult.queue_to_runner.empty():
-                    cmd = SelectableTestResult.queue_to_runner.get_nowait()
-                    while cmd == PAUSE_FROM_MANAGER:
-                        cmd = SelectableTestResult.queue_to_runner.get()
-                    if cmd == ABORT_FROM_MANAGER:
-                        self._outcome.result.stop()
+    @add_doc(desc)
+    def test(self):
+        """A test case generated from test's data."""
+        run_test_data(self, test_data, self._outcome.result)
 
     return test, test_data
 
 
+def range_values(
+    start, stop, step, lin, geom, include_start=True, include_stop=True, sort="True"
+):
+    """Values tested by a range test, as a NumPy array.
+
+    The values from step, lin and geom are merged, values closer than
+    RANGE_TOLERANCE (relative to the range bounds) being tested only once.
+
+    :param start:         Starting value.
+    :param stop:          End value.
+    :param step:          Space between values from start to stop, or 0.
+    :param lin:           Number of values linearly spaced, or 0.
+    :param geom:          Number of values geometrically spaced, or 0.
+    :param include_start: Whether to test the start value.
+    :param include_stop:  Whether to test the stop value.
+    :param sort:          "True", "reverse", or "False" or "random" to shuffle.
+
+    :returns: The values in execution order.
+    """
+    parts = []
+    if step != 0:
+        parts.append(numpy.arange(start, stop, step))
+    if lin != 0:
+        parts.append(numpy.linspace(start, stop, lin, endpoint=include_stop))
+    if geom != 0:
+        parts.append(numpy.geomspace(start, stop, geom, endpoint=include_stop))
+    values = numpy.sort(numpy.concatenate(parts))
+
+    # merge values only differing by rounding errors
+    tolerance = RANGE_TOLERANCE * max(abs(start), abs(stop))
+    if len(values) > 1:
+        values = values[numpy.concatenate([[True], numpy.diff(values) > tolerance])]
+
+    # test the exact start and stop values, or not at all
+    for bound, include in [(start, include_start), (stop, include_stop)]:
+        values = values[numpy.abs(values - bound) > tolerance]
+        if include:
+            values = numpy.append(values, bound)
+    values = numpy.sort(values)
+
+    # sort or randomize the values
+    if sort.lower() in ["true"]:
+        pass
+    elif sort.lower() in ["reverse"]:
+        values = values[::-1]
+    elif sort.lower() in ["false", "random"]:
+        values = numpy.random.permutation(values)
+    else:
+        logger.error("Unexpected value for `sort` field: %s", sort)
+    return values
+
+
+def value_title(set_value, get_value):
+    """Subtest title of a range or values test."""
+    if set_value is not None and get_value is not None:
+        return str(set_value)
+    elif set_value is not None:
+        return " set " + str(set_value)
+    elif get_value is not None:
+        return " get " + str(get_value)
+    return "no setter nor getter"
+
+
+def value_subtest(value, setter, getter, **kwargs):
+    """TestData of a range or values test, testing value.
+
+    :param value:  The value to set in setter and to read back in getter.
+    :param setter: The setter PV name, or None.
+    :param getter: The getter PV name, or None.
+    :param kwargs: The other TestData arguments.
+    """
+    # use value only if setter or getter
+    set_value = value if setter is not None else None
+    get_value = value if getter is not None else None
+
+    return TestData(
+        subtest_title=value_title(set_value, get_value),
+        setter=setter,
+        getter=getter,
+        set_value=set_value,
+        get_value=get_value,
+        **kwargs
+    )
+
+
+class SubtestTable(object):
+    """Columnar store of the subtests of a range test.
+
+    Subtests only differ by their value, kept in a NumPy column, the other
+    fields being stored once in a template TestData. Durations are stored
+    in columns too, so that filtering and statistics can be vectorized.
+    """
+
+    def __init__(self, values, **kwargs):
+        """
+        :param values: The tested values, in execution order.
+        :param kwargs: The TestData arguments shared by the subtests.
+        """
+        self.values = values
+        self.template = TestData(subtest_title="", **kwargs)
+        self.elapsed = numpy.full(len(values), numpy.nan)
+        self.put_duration = numpy.full(len(values), numpy.nan)
+        # only failed or errored subtests have an exception
+        self.exceptions = {}
+        # test ids are id_prefix followed by the row, unless set otherwise
+        self.id_prefix = None
+        self.ids = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def value(self, row):
+        return self.values[row].item()
+
+
+def _nan_to_none(value):
+    return None if numpy.isnan(value) else float(value)
+
+
+class SubtestView(object):
+    """A row of a SubtestTable, with the attributes of a TestData.
+
+    Fields shared by the subtests are read from the table template. The
+    test plan is compiled on first use, and kept as long as the view.
+    """
+
+    __slots__ = ("table", "row", "_plan")
+
+    def __init__(self, table, row):
+        object.__setattr__(self, "table", table)
+        object.__setattr__(self, "row", row)
+        object.__setattr__(self, "_plan", None)
+
+    def __getattr__(self, name):
+        return getattr(self.table.template, name)
+
+    def __setattr__(self, name, value):
+        if name in ["elapsed", "put_duration"]:
+            column = getattr(self.table, name)
+            column[self.row] = numpy.nan if value is None else value
+        elif name == "exception":
+            if value is None:
+                self.table.exceptions.pop(self.row, None)
+            else:
+                self.table.exceptions[self.row] = value
+        elif name == "id":
+            prefix, _, row = value.rpartition("-")
+            if self.table.id_prefix is None and row == str(self.row):
+                self.table.id_prefix = prefix + "-"
+            if self.table.id_prefix + str(self.row) != value:
+                self.table.ids[self.row] = value
+        elif name == "sweep":
+            self.table.template.sweep = value
+        else:
+            raise AttributeError("Can not set %s of a subtest of a range" % name)
+
+    def __reduce__(self):
+        return SubtestView, (self.table, self.row)
+
+    def __str__(self):
+        return TestData.__dict__["__str__"](self)
+
+    @property
+    def set_value(self):
+        return None if self.setter is None else self.table.value(self.row)
+
+    @property
+    def get_value(self):
+        return None if self.getter is None else self.table.value(self.row)
+
+    @property
+    def subtest_title(self):
+        return value_title(self.set_value, self.get_value)
+
+    @property
+    def desc(self):
+        return (
+            str(self.test_title).replace("\n", " ")
+            + ": "
+            + str(self.subtest_title).replace("\n", " ")
+        )
+
+    @property
+    def id(self):
+        if self.row in self.table.ids:
+            return self.table.ids[self.row]
+        if self.table.id_prefix is None:
+            return ""
+        return self.table.id_prefix + str(self.row)
+
+    @property
+    def elapsed(self):
+        return _nan_to_none(self.table.elapsed[self.row])
+
+    @property
+    def put_duration(self):
+        return _nan_to_none(self.table.put_duration[self.row])
+
+    @property
+    def exception(self):
+        return self.table.exceptions.get(self.row)
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self.compile()
+        return self._plan
+
+    def compile(self):
+        object.__setattr__(self, "_plan", TestPlan(self))
+        return self._plan
+
+
+class LazySubtests(object):
+    """The subtests of a range test, as views of a SubtestTable.
+
+    Views are made again on each access, their state being kept in the table.
+    Subtests appended afterwards (such as the finally statement) are kept as
+    they are.
+    """
+
+    def __init__(self, table):
+        """
+        :param table: The SubtestTable of the range.
+        """
+        self.table = table
+        self.appended = []
+
+    def __len__(self):
+        return len(self.table) + len(self.appended)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if idx < len(self.table):
+            return SubtestView(self.table, idx)
+        return self.appended[idx - len(self.table)]
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def append(self, subtest):
+        self.appended.append(subtest)
+
+
+class GeneratedSubtests(Mapping):
+    """Subtests of the tests added to a suite by TestsGenerator, by test id.
+
+    Test ids are the id prefix of their test followed by their index.
+    Subtests of a range are made again for each lookup, see LazySubtests.
+    """
+
+    def __init__(self):
+        # subtests of each test, and the reason of those skipped, by id prefix
+        self.tests = {}
+
+    def add(self, prefix, subtests):
+        """Add the subtests of a test, all selected."""
+        self.tests[prefix] = (subtests, {})
+
+    def find(self, test_id):
+        """The subtests of the test of test_id, the reason of those skipped
+        and the index of test_id, or None if test_id was not added.
+        """
+        prefix = test_id.rstrip("0123456789")
+        if prefix not in self.tests or prefix == test_id:
+            return None
+        subtests, skipped = self.tests[prefix]
+        idx = int(test_id[len(prefix) :])
+        if idx >= len(subtests):
+            return None
+        return subtests, skipped, idx
+
+    def __getitem__(self, test_id):
+        found = self.find(test_id)
+        if found is None:
+            raise KeyError(test_id)
+        subtests, _, idx = found
+        return subtests[idx]
+
+    def __iter__(self):
+        for prefix, (subtests, _) in self.tests.items():
+            for idx in range(len(subtests)):
+                yield prefix + str(idx)
+
+    def __len__(self):
+        return sum(len(subtests) for subtests, _ in self.tests.values())
+
+
+class GeneratedTestCase(SelectableTestCase):
+    """Runs a subtest of GeneratedSubtests, made only when the suite reaches it.
+
+    Subtests are skipped and selected in GeneratedSubtests, other tests
+    being left to SelectableTestCase.
+    """
+
+    test_data = GeneratedSubtests()
+
+    def __init__(self, test_id):
+        # the subtest is kept as long as the test case, views of a range too
+        test_data = GeneratedTestCase.test_data[test_id]
+        self.test_data = {test_id: test_data}
+        # test method of the subtest, made when the suite reaches it
+        _, skipped, idx = GeneratedTestCase.test_data.find(test_id)
+        if idx in skipped:
+            test = skipped_test_factory(test_data, skipped[idx])
+        else:
+            test, _ = test_generator(test_data)
+        setattr(self, test_id, test.__get__(self, type(self)))
+        SelectableTestCase.__init__(self, test_id)
+
+    @classmethod
+    def add_subtests(cls, prefix, subtests):
+        """Add the subtests of a test, all selected."""
+        cls.test_data.add(prefix, subtests)
+
+    @classmethod
+    def skip(cls, test_id, reason):
+        found = cls.test_data.find(test_id)
+        if found is None:
+            SelectableTestCase.skip(test_id, reason)
+        else:
+            _, skipped, idx = found
+            skipped[idx] = reason
+
+    @classmethod
+    def select(cls, test_id):
+        found = cls.test_data.find(test_id)
+        if found is None:
+            SelectableTestCase.select(test_id)
+        else:
+            _, skipped, idx = found
+            skipped.pop(idx, None)
+
+    @classmethod
+    def is_selected(cls, test_id):
+        found = cls.test_data.find(test_id)
+        if found is None:
+            return SelectableTestCase.is_selected(test_id)
+        _, skipped, idx = found
+        return idx not in skipped
+
+
 class TestsGenerator(object):
     """TestGenerator generates unittest test cases from a YAML file."""
 
@@ -665,6 +1306,18 @@ class TestsGenerator(object):
 
         logger.debug("Initialized TestGenerator.")
 
+    @classmethod
+    def from_tests_list(cls, config, tests_list):
+        """A TestsGenerator of tests already created, such as from a bundle.
+
+        :param config:     The scenario config block.
+        :param tests_list: The tests_list of a TestsGenerator of the scenario.
+        """
+        tests_gen = cls.__new__(cls)
+        tests_gen.data = {"config": config}
+        tests_gen.tests_list = tests_list
+        return tests_gen
+
     def _create_tests_list(self):
         """Create a list of TestData objects from deserialized file."""
         # TODO: use functions that return a subtestlist instead.
@@ -689,6 +1342,11 @@ class TestsGenerator(object):
             on_failure = test_raw_data.get("on_failure", self.get_config("on_failure"))
             retry = test_raw_data.get("retry", self.get_config("retry"))
             protocol = test_raw_data.get("protocol", self.get_config("protocol"))
+            monitor = test_raw_data.get("monitor", self.get_config("monitor"))
+            settle_timeout = test_raw_data.get(
+                "settle_timeout", self.get_config("settle_timeout")
+            )
+            put_mode = test_raw_data.get("put_mode", self.get_config("put_mode"))
 
             if "logger" in test_raw_data:
                 pvlogger = test_raw_data["logger"]
@@ -736,66 +1394,20 @@ class TestsGenerator(object):
                     if geom != 0:
                         geom += 1
 
-                # generate the list from step, lin and geom
-                value_list = set()
-                if step != 0:
-                    value_list.update(numpy.arange(start, stop, step))
-                if lin != 0:
-                    value_list.update(
-                        numpy.linspace(start, stop, lin, endpoint=include_stop)
-                    )
-                if geom != 0:
-                    value_list.update(
-                        numpy.geomspace(start, stop, geom, endpoint=include_stop)
-                    )
-
-                # check if stop value should be tested or not
-                if include_stop and stop not in value_list:
-                    value_list.add(stop)
-                if not include_stop and stop in value_list:
-                    value_list.remove(stop)
-
-                # check if start value should be tested or not
-                if include_start and start not in value_list:
-                    value_list.add(start)
-                if not include_start and start in value_list:
-                    value_list.remove(start)
-
-                ordered_values = list(value_list)
-                # sort or randomize the values
-                if sort.lower() in ["true"]:
-                    ordered_values = sorted(value_list)
-                elif sort.lower() in ["reverse"]:
-                    ordered_values = sorted(value_list, reverse=True)
-                elif sort.lower() in ["false", "random"]:
-                    random.shuffle(ordered_values)
-                else:
-                    logging.error("Unexpected value for `sort` field: %s", sort)
-
-                for value in ordered_values:
-                    # use value only if setter or getter
-                    set_value = value if setter is not None else None
-                    get_value = value if getter is not None else None
-                    if set_value is not None and get_value is not None:
-                        subtest_title = str(set_value)
-                    elif set_value is not None:
-                        subtest_title = " set " + str(set_value)
-                    elif get_value is not None:
-                        subtest_title = " get " + str(get_value)
-                    else:
-                        subtest_title = "no setter nor getter"
+                values = range_values(
+                    start, stop, step, lin, geom, include_start, include_stop, sort
+                )
 
-                    logger.debug("adding new range subtest")
-                    test_data = TestData(
+                # subtests are views of a table, made when first reached
+                subtests_list = LazySubtests(
+                    SubtestTable(
+                        values,
+                        setter=setter,
+                        getter=getter,
                         on_failure=on_failure,
                         retry=retry,
                         test_title=test_raw_data["name"],
-                        subtest_title=subtest_title,
                         skip=skip,
-                        getter=getter,
-                        setter=setter,
-                        get_value=get_value,
-                        set_value=set_value,
                         prefix=prefix,
                         delay=delay,
                         margin=get_margin(test_raw_data),
@@ -803,9 +1415,11 @@ class TestsGenerator(object):
                         test_message=test_raw_data.get("message", None),
                         protocol=protocol,
                         pvlogger=pvlogger,
-                    )
-
-                    subtests_list.append(test_data)
+                        monitor=monitor,
+                        settle_timeout=settle_timeout,
+                        put_mode=put_mode,
+                    ),
+                )
 
             elif "values" in test_raw_data:
                 # subtests_list = []
@@ -819,29 +1433,15 @@ class TestsGenerator(object):
                     logger.info("No setter in : %s", test_raw_data)
 
                 for value in test_raw_data["values"]:
-                    # use value only if setter or getter
-                    set_value = value if setter is not None else None
-                    get_value = value if getter is not None else None
-                    if set_value is not None and get_value is not None:
-                        subtest_title = str(set_value)
-                    elif set_value is not None:
-                        subtest_title = " set " + str(set_value)
-                    elif get_value is not None:
-                        subtest_title = " get " + str(get_value)
-                    else:
-                        subtest_title = "no setter nor getter"
-
                     logger.debug("adding new value subtest")
-                    test_data = TestData(
+                    test_data = value_subtest(
+                        value,
+                        setter=setter,
+                        getter=getter,
                         on_failure=on_failure,
                         retry=retry,
                         test_title=test_raw_data["name"],
-                        subtest_title=subtest_title,
                         skip=skip,
-                        getter=getter,
-                        setter=setter,
-                        get_value=get_value,
-                        set_value=set_value,
                         prefix=prefix,
                         delay=delay,
                         margin=get_margin(test_raw_data),
@@ -849,6 +1449,9 @@ class TestsGenerator(object):
                         test_message=test_raw_data.get("message", None),
                         protocol=protocol,
                         pvlogger=pvlogger,
+                        monitor=monitor,
+                        settle_timeout=settle_timeout,
+                        put_mode=put_mode,
                     )
 
                     subtests_list.append(test_data)
@@ -898,6 +1501,12 @@ class TestsGenerator(object):
                     retry = command.get(
                         "retry", test_raw_data.get("retry", self.get_config("retry"))
                     )
+                    settle_timeout = command.get(
+                        "settle_timeout",
+                        test_raw_data.get(
+                            "settle_timeout", self.get_config("settle_timeout")
+                        ),
+                    )
 
                     logger.debug("adding new command subtest")
                     test_data = TestData(
@@ -918,6 +1527,9 @@ class TestsGenerator(object):
                         subtest_message=command.get("message", None),
                         protocol=protocol,
                         pvlogger=pvlogger,
+                        monitor=monitor,
+                        settle_timeout=settle_timeout,
+                        put_mode=put_mode,
                     )
 
                     subtests_list.append(test_data)
@@ -936,6 +1548,9 @@ class TestsGenerator(object):
 
                     subtests_list.append(test_data)
 
+            if test_raw_data.get("pipeline", False) and subtests_list:
+                self._pipeline(test_raw_data["name"], subtests_list)
+
             if "finally" in test_raw_data and not ignore:
                 logger.debug("Found finally statement in %s", test_raw_data)
                 if subtests_list is None:
@@ -975,6 +1590,22 @@ class TestsGenerator(object):
 
         logger.info("Test list initialized")
 
+    def _pipeline(self, test_title, subtests_list):
+        """Share a Sweep between the subtests of a pipelined test."""
+        if isinstance(subtests_list, LazySubtests):
+            # the rows of a range share the fields of their template
+            shared = [subtests_list.table.template]
+        else:
+            shared = subtests_list = list(subtests_list)
+        if any(subtest.settle_timeout is not None for subtest in shared):
+            logger.warning(
+                "Test %s can not be pipelined with settle_timeout.", test_title
+            )
+            return
+        sweep = Sweep(subtests_list)
+        for subtest in shared:
+            subtest.sweep = sweep
+
     def _randomize_order(self):
         """Generate a random order for test execution.
 
@@ -1019,39 +1650,32 @@ class TestsGenerator(object):
         """
         order = self._randomize_order()
 
-        # add each test with the new id to define the order
-        Test_case = SelectableTestCase
-
+        # add each test with the new id to define the order,
+        # its subtests being made when the runner reaches them
         for idx in order:
-            if self.tests_list[idx] is None:
+            subtests = self.tests_list[idx]
+            if subtests is None:
                 # None when test is ignored
                 continue
-            for test_data in self.tests_list[idx]:
-                test_id = self.get_test_id(
-                    scenario=scenario_index,
-                    test=idx,
-                    subtest=self.tests_list[idx].index(test_data),
-                )
-                test_data.id = test_id
 
-                # generate test case
-                test_func, test_data = test_generator(test_data)
-                skip = test_data.skip
-
-                logger.debug(
-                    'Add test named "%s", with description "%s": %s',
-                    test_id,
-                    test_data.desc,
-                    test_func,
-                )
-
-                # test_case = SelectableTestCase(test_data, test_func)
-                Test_case.add_test(test_data, test_func)
+            # the id of the first subtest, without its index
+            prefix = self.get_test_id(scenario=scenario_index, test=idx, subtest=0)[:-1]
+            GeneratedTestCase.add_subtests(prefix, subtests)
+            tests_suite.add_lazy_tests(GeneratedTestCase, prefix, range(len(subtests)))
+
+            first_idx = 0
+            if isinstance(subtests, LazySubtests):
+                subtests.table.id_prefix = prefix
+                if subtests.table.template.skip:
+                    for row in range(len(subtests.table)):
+                        GeneratedTestCase.skip(
+                            prefix + str(row), "Test skipped from file."
+                        )
+                first_idx = len(subtests.table)
+                subtests = subtests.appended
 
-                # add test case to test suite
-                if skip:
-                    tests_suite.add_skipped_test(
-                        Test_case, test_id, "Test skipped from file."
-                    )
-                else:
-                    tests_suite.add_selected_test(Test_case, test_id)
+            for subtest_idx, test_data in enumerate(subtests, first_idx):
+                test_id = prefix + str(subtest_idx)
+                test_data.id = test_id
+                if test_data.skip:
+                    GeneratedTestCase.skip(test_id, "Test skipped from file.")
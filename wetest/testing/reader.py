@@ -22,19 +22,26 @@ from __future__ import print_function
 from builtins import input
 from builtins import range
 from builtins import object
+import copy
+import functools
 import logging
 import os
 import pkg_resources
 import re
 import sys
+import threading
 import time
-import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from pkg_resources import resource_filename
+import pykwalify
 from pykwalify import errors
 from pykwalify.core import Core
+from pykwalify.rule import Rule
 import yaml
 
+from wetest.testing.cache import content_hash
 from wetest.common.constants import (
     TERSE_FORMATTER,
     FILE_HANDLER,
@@ -75,6 +82,12 @@ CHANGELOG_WARN = {
     },
 }
 
+# Number of threads reading included files
+INCLUDE_JOBS = 4
+
+# pykwalify version pinned in requirements.txt, see SchemaValidator
+PYKWALIFY_VERSION = "1.7.0"
+
 # Constants used elsewhere
 ABORT = "abort"
 PAUSE = "pause"
@@ -112,6 +125,50 @@ class MacroError(WeTestError):
     pass
 
 
+class SchemaValidator(Core):
+    """A pykwalify Core validating data in memory against the scenario schema.
+
+    The schema is read and compiled into pykwalify rules only once per process.
+    This overrides the private Core._start_validate of PYKWALIFY_VERSION, other
+    versions compile the schema on each validation as pykwalify does.
+    """
+
+    _schema = None
+    _root_rule = None
+    _lock = threading.Lock()
+
+    def __init__(self, source_data):
+        Core.__init__(self, source_data=source_data, schema_data=self.compiled()[0])
+
+    @classmethod
+    def compiled(cls):
+        """The scenario schema and its root rule, compiled on first call."""
+        with cls._lock:
+            if cls._root_rule is None:
+                schema_path = resource_filename(
+                    "wetest", "resources/scenario_schema.yaml"
+                )
+                with open(schema_path, "r") as schema_file:
+                    schema = yaml.safe_load(schema_file)
+                # as pykwalify, register partial schemas before the root rule
+                for key, value in list(schema.items()):
+                    if key.startswith("schema;"):
+                        pykwalify.partial_schemas[key.split(";", 1)[1]] = Rule(
+                            schema=value
+                        )
+                        del schema[key]
+                cls._schema = schema
+                cls._root_rule = Rule(schema=schema)
+            return cls._schema, cls._root_rule
+
+    def _start_validate(self, value=None):
+        if pykwalify.__version__ != PYKWALIFY_VERSION:
+            return Core._start_validate(self, value)
+        self.errors = []
+        self.root_rule = self.compiled()[1]
+        self._validate(value, self.root_rule, "", [])
+
+
 def display_changlog(file_version, wetest_version):
     """Displays the changelog warnings, only between the two versions."""
 
@@ -179,6 +236,150 @@ def query_yes_no(question, default=None):
             print("Please respond with 'yes' or 'no' (or 'y' or 'n').\n")
 
 
+# old regex was r"(\${.*?}|\$\(.*?\))" it was non greedy but incompatible with imbricated macros
+# new is non geedy because forbiding '${}()' characters in the macro name
+# and works with imbricated macros
+MACRO_REGEX = re.compile(r"\$[({]{1}[^${}()]*[)}]{1}")
+MACRO_NAME_REGEX = re.compile(r"\$[({]\s*(?P<macro_name>\S+)\s*[)}]")
+
+# number of substitutions of imbricated macros before a recursivity issue
+MAX_MACRO_DEPTH = 100
+
+# number of most recently used strings kept compiled by MacroTemplate.compile
+MACRO_TEMPLATES_CACHE_SIZE = 10000
+
+# strings that yaml.safe_load reads as themselves: words starting with a
+# letter, colons not followed by a space, unless a YAML boolean or null
+PLAIN_STRING_REGEX = re.compile(
+    r"[A-Za-z_](?:[\w.\-/]|:(?=[\w.\-/]))*(?: (?:[\w.\-/]|:(?=[\w.\-/]))+)*",
+    re.ASCII,
+)
+YAML_KEYWORDS = set(
+    word
+    for keyword in ["yes", "no", "true", "false", "on", "off", "null"]
+    for word in [keyword, keyword.capitalize(), keyword.upper()]
+)
+
+
+def typed_macro_value(new_str):
+    """Type a string in which macros were substituted.
+
+    :returns: a boolean, int, float, dict, list... or new_str itself.
+    """
+    # fallback value
+    output = new_str
+
+    # we can use yaml load to convert a string into a list, a dict, or a boolean
+    # however if a string ends with a colon it will be considered as a
+    # dict by yaml load, but we want to keep it a string
+    if PLAIN_STRING_REGEX.fullmatch(new_str) and new_str not in YAML_KEYWORDS:
+        # no need to parse what yaml load would give back as is
+        pass
+    elif not new_str.endswith(":"):
+        try:
+            output = yaml.safe_load(new_str)
+        except (ValueError, yaml.scanner.ScannerError) as e:
+            # we get a ScannerError when substituting with a macro that
+            # ends by a colon, in a multiline string:
+            # "mapping values are not allowed here"
+            logger.debug(e)
+            logger.debug("in: \n" + new_str)
+
+    # however we can not rely on yaml load to parse an int or a float
+    # especially for exponential notation or infinity or NAN
+    # they might endup being read as string
+    if isinstance(output, str):
+        # go back to raw new_str if yaml.safe_load returned a string,
+        # in order to maintain linebreaks
+        output = new_str
+
+        # is it a float ?
+        try:
+            output = float(new_str)
+        except ValueError:
+            pass
+
+        # or even better is it an integer ?
+        try:
+            output = int(new_str)
+        except ValueError:
+            pass
+
+    return output
+
+
+class MacroTemplate(object):
+    """A string compiled into literals and macro references.
+
+    The text is literals[0] + references[0] + literals[1] + ... where each
+    reference is a (macro name, raw text) tuple, the name being None when it
+    can not be worked out. Strings are compiled once while recently used, see
+    compile.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.literals = []
+        self.references = []
+        # typed values, see MacrosManager._resolve
+        self.results = dict()
+
+        position = 0
+        for match in MACRO_REGEX.finditer(text):
+            self.literals.append(text[position : match.start()])
+            raw = match.group(0)
+            macro_match = MACRO_NAME_REGEX.match(raw)
+            if not macro_match:  # Cannot workout the macro name
+                logger.debug("invalid macro syntax: %s", raw)
+                self.references.append((None, raw))
+            else:
+                self.references.append((macro_match.group("macro_name"), raw))
+            position = match.end()
+        self.literals.append(text[position:])
+
+        # valid macro names, without duplicates
+        self.names = tuple(
+            sorted(set(name for name, _ in self.references if name is not None))
+        )
+
+    @classmethod
+    def compile(cls, text):
+        """The MacroTemplate of text, compiled on first use."""
+        return _compile_template(text)
+
+    def render(self, known_macros, used, unknown, lookups):
+        """Substitute known macros, leaving unknown ones as is.
+
+        :param known_macros: dict of macro values.
+        :param used:         set updated with the substituted macro names.
+        :param unknown:      list extended with the unknown macro names.
+        :param lookups:      dict updated with the text of each macro looked
+                             up, None if unknown.
+        """
+        pieces = [self.literals[0]]
+        for (macro_name, raw), literal in zip(self.references, self.literals[1:]):
+            if macro_name is None:
+                pieces.append(raw)
+            elif macro_name in known_macros:
+                text = str(known_macros[macro_name])
+                used.add(macro_name)
+                lookups[macro_name] = text
+                pieces.append(text)
+            else:
+                logger.debug("unknown macro: %s", raw)
+                unknown.append(macro_name)
+                lookups[macro_name] = None
+                pieces.append(raw)
+            pieces.append(literal)
+        return "".join(pieces)
+
+
+@functools.lru_cache(maxsize=MACRO_TEMPLATES_CACHE_SIZE)
+def _compile_template(text):
+    """Shared by the include threads, lru_cache being thread-safe."""
+    return MacroTemplate(text)
+
+
 class MacrosManager(object):
     """A class to keep track of known, used and unknown variable.
 
@@ -192,7 +393,6 @@ class MacrosManager(object):
         self.used_macros = set()
         self.unknown_macros = dict()
 
-        self._trace_unkown = True
         self.read_errors = []
 
         if known_macros is not None:
@@ -266,102 +466,103 @@ class MacrosManager(object):
         if not isinstance(a_value, str):
             return a_value
 
-        # old regex was r"(\${.*?}|\$\(.*?\))" it was non greedy but incompatible with imbricated macros
-        # new is non geedy because forbiding '${}()' characters in the macro name
-        # and works with imbricated macros
-        self._trace_unkown = trace_unknown
-        new_str, nb_sub = re.subn(
-            r"\$[({]{1}[^${}()]*[)}]{1}", self.corresponding_macro, a_value
-        )
-        self._trace_unkown = True
-
-        # try to type the returned value (boolean, int, float, dict, list... instead of a string)
-        # but only if we did a substitution, otherwise give it back as it is
-        if nb_sub == 0:
+        # only type the returned value if we found a macro,
+        # otherwise give it back as it is
+        template = MacroTemplate.compile(a_value)
+        if not template.references:
             return a_value
-        else:
-            logger.debug("substitute found: `%s`", new_str)
-            # fallback value
-            output = new_str
 
-            # we can use yaml load to convert a string into a list, a dict, or a boolean
-            # however if a string ends with a colon it will be considered as a
-            # dict by yaml load, but we want to keep it a string
-            if not new_str.endswith(":"):
-                try:
-                    output = yaml.safe_load(new_str)
-                except (ValueError, yaml.scanner.ScannerError) as e:
-                    # we get a ScannerError when substituting with a macro that
-                    # ends by a colon, in a multiline string:
-                    # "mapping values are not allowed here"
-                    logger.debug(e)
-                    logger.debug("in: \n" + new_str)
-
-            # however we can not rely on yaml load to parse an int or a float
-            # especially for exponential notation or infinity or NAN
-            # they might endup being read as string
-            if isinstance(output, str):
-                # go back to raw new_str if yaml.safe_load returned a string,
-                # in order to maintain linebreaks
-                output = new_str
-
-                # is it a float ?
-                try:
-                    output = float(new_str)
-                except ValueError:
-                    pass
-
-                # or even better is it an integer ?
-                try:
-                    output = int(new_str)
-                except ValueError:
-                    pass
+        output, used, unknown = self._resolve(template)
 
-            logger.debug("cast into %s (%s)", output, type(output))
+        self.used_macros.update(used)
+        if trace_unknown:
+            for macro_name in unknown:
+                self.unknown_macros[macro_name] = (
+                    self.unknown_macros.get(macro_name, 0) + 1
+                )
 
-            # call substitute macro again on the result if it changed
-            # in order to substitute imbricated macros
-            if isinstance(output, str) and output != a_value:
-                try:
-                    return self.substitue_macros(new_str, trace_unknown=trace_unknown)
-                except RuntimeError:
-                    self.read_errors.append(
-                        "- Recusivity issue with macros:\n%s" % output
-                    )
+        # memoized lists and dicts are shared, do not let them be modified
+        if isinstance(output, (list, dict)):
+            output = copy.deepcopy(output)
+        return output
 
-            return output
+    def _macro_text(self, macro_name):
+        """The text substituted for macro_name, None if unknown."""
+        if macro_name in self.known_macros:
+            return str(self.known_macros[macro_name])
+        return None
 
-    def corresponding_macro(self, match):
-        """return the string to substitute for regex match
+    def _resolve(self, template):
+        """Typed value of template, with the names of used and unknown macros.
 
-        :param match: substring match
-        :returns: replacement string
+        Results are memoized in the template, for the text of all the macros
+        looked up while substituting it.
         """
-        # extract the match
-        match = match.group(0)
-
-        repl = match  # default return
-
-        macro_match = re.match(r"\$[({]\s*(?P<macro_name>\S+)\s*[)}]", match)
-
-        if not macro_match:  # Cannot workout the macro name
-            logger.debug("invalid macro syntax: %s", match)
-
-        else:  # the macro is valid
-            macro_name = macro_match.group("macro_name")
-
-            if macro_name not in self.known_macros:  # the macro is not defined
-                logger.debug("unknown macro: %s", match)
-                if self._trace_unkown:
-                    if macro_name in self.unknown_macros:
-                        self.unknown_macros[macro_name] += 1
-                    else:
-                        self.unknown_macros[macro_name] = 1
-
-            else:  # the macro is defined
-                repl = self.known_macros[macro_name]
-                self.used_macros.add(macro_name)
-        return str(repl)
+        key = tuple(self._macro_text(name) for name in template.names)
+        memoized = template.results.get(key)
+        if memoized is not None:
+            output, used, unknown, lookups = memoized
+            if all(self._macro_text(name) == text for name, text in lookups):
+                return output, used, unknown
+
+        nb_errors = len(self.read_errors)
+        output, used, unknown, lookups = self._expand(template)
+        if len(self.read_errors) == nb_errors:
+            template.results[key] = (output, used, unknown, tuple(lookups.items()))
+        return output, used, unknown
+
+    def _expand(self, template):
+        """Substitute macros in template until the value does not change.
+
+        Substituting again the result substitutes imbricated macros, such as
+        ${PREFIX_${INDEX}}, and macros defined by other macros. A macro
+        substituted again while it depends on itself, through the values of
+        known macros, is reported as a recursivity issue.
+        """
+        used = set()
+        unknown = []
+        lookups = dict()
+        expanded = set()
+        a_value = template.text
+
+        for _ in range(MAX_MACRO_DEPTH):
+            substituted = set()
+            new_str = template.render(self.known_macros, substituted, unknown, lookups)
+            logger.debug("substitute found: `%s`", new_str)
+            output = typed_macro_value(new_str)
+            logger.debug("cast into %s (%s)", output, type(output))
+            used |= substituted
+
+            # substitute again the result if it changed
+            if not isinstance(output, str) or output == a_value:
+                return output, used, unknown, lookups
+            if any(self._is_cyclic(name) for name in substituted & expanded):
+                break
+            expanded |= substituted
+
+            template = MacroTemplate.compile(new_str)
+            if not template.references:
+                return output, used, unknown, lookups
+            a_value = new_str
+
+        self.read_errors.append("- Recusivity issue with macros:\n%s" % output)
+        return output, used, unknown, lookups
+
+    def _is_cyclic(self, macro_name):
+        """Whether the value of macro_name refers to itself, maybe indirectly."""
+        visited = set()
+        to_visit = [macro_name]
+        while to_visit:
+            text = self._macro_text(to_visit.pop())
+            if text is None:
+                continue
+            for name in MacroTemplate.compile(text).names:
+                if name == macro_name:
+                    return True
+                if name not in visited:
+                    visited.add(name)
+                    to_visit.append(name)
+        return False
 
     def raise_errors(self):
         """Raise a MacroError exception if self.read_errors is not empty"""
@@ -372,6 +573,67 @@ class MacrosManager(object):
             raise MacroError()
 
 
+# A YAML file content, its hash and its deserialized content before macros
+ParsedFile = namedtuple("ParsedFile", ["content", "sha", "tree"])
+
+
+class IncludeLoader(object):
+    """Reads each included file once, and included files in parallel.
+
+    The deserialized content of each file is kept, before macros substitution,
+    for a file included several times with other macros to be parsed once.
+    Macros substitution does not modify the deserialized content.
+
+    The includes of a file are read and deserialized by a pool of threads,
+    their version check, macros substitution and validation are then done in
+    include order, for the prompts and logs to follow the include list.
+    """
+
+    def __init__(self, jobs=INCLUDE_JOBS):
+        self.jobs = jobs
+        self._parsed = {}
+        self._lock = threading.Lock()
+        self._file_locks = {}
+        self._executor = None
+
+    def parse(self, file_path):
+        """The ParsedFile of file_path, read and deserialized on first call."""
+        with self._lock:
+            file_lock = self._file_locks.setdefault(file_path, threading.Lock())
+        with file_lock:
+            if file_path not in self._parsed:
+                try:
+                    with open(file_path, "r") as wetest_file:
+                        content = wetest_file.read()
+                except IOError:
+                    raise FileNotFound("Could not find file %s" % file_path)
+                self._parsed[file_path] = ParsedFile(
+                    content, content_hash(content), yaml.safe_load(content)
+                )
+            return self._parsed[file_path]
+
+    def _prefetch(self, file_path):
+        """Parse file_path in advance, its errors are raised when it is read."""
+        try:
+            self.parse(file_path)
+        except Exception:
+            pass
+
+    def prefetch(self, file_paths):
+        """Start parsing file_paths in parallel, if there are several.
+
+        The files are still to be read in order with ScenarioReader, which
+        waits for the parsing of each file to end.
+        """
+        if len(file_paths) < 2:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.jobs)
+        for file_path in file_paths:
+            self._executor.submit(self._prefetch, file_path)
+
+
 class ScenarioReader(object):
     """Read WeTest YAML Scenario file
 
@@ -381,22 +643,52 @@ class ScenarioReader(object):
                         not necessarily for this scenario, should not be checked
                         when looking for unused macros
     :param propagate: a boolean, whether or not to share all macros with included files
+    :param cache: a ScenarioCache to reuse files already read and validated
+    :param loader: an IncludeLoader shared with other readers, to parse
+                   each file once
     """
 
-    def __init__(self, yaml_file, macros_mgr=None, suite_macros=None, propagate=False):
+    def __init__(
+        self,
+        yaml_file,
+        macros_mgr=None,
+        suite_macros=None,
+        propagate=False,
+        cache=None,
+        loader=None,
+    ):
         """Initialize Reader."""
         self.file_path = os.path.abspath(yaml_file)
-        try:
-            self.file = open(self.file_path, "r")
-        except IOError:
-            raise FileNotFound("Could not find file %s" % self.file_path)
+        self.loader = loader if loader is not None else IncludeLoader()
+        parsed = self.loader.parse(self.file_path)
 
         self.macros_mgr = macros_mgr if macros_mgr is not None else MacrosManager()
         self.suite_macros = suite_macros if suite_macros is not None else list()
         self.propagate = propagate
+        self.cache = cache
+        # content hash of this file and its includes
+        self.dependencies = {self.file_path: parsed.sha}
+        self.fully_valid = False
+        # whether the included files are fully valid too
+        self.includes_valid = True
+        self.from_cache = False
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(
+                self.file_path,
+                parsed.sha,
+                self.macros_mgr,
+                self.propagate,
+                self.suite_macros,
+            )
+            entry = self.cache.load(cache_key)
+            if entry is not None:
+                self._restore(entry)
+                return
 
         self.deserialized_scenarios = []
-        self.deserialized = self._deserialize()
+        self.deserialized = self._deserialize(parsed.tree)
 
         self.major = self.deserialized["version"]["major"]
         self.minor = self.deserialized["version"]["minor"]
@@ -408,22 +700,60 @@ class ScenarioReader(object):
         self.version_is_supported = self._version_is_supported()
 
         # Check YAML file schema and other validation
-        tempo_file = tempfile.NamedTemporaryFile(mode="w", suffix=".yml", delete=False)
-        tempo_file_path = tempo_file.name
-
-        with open(tempo_file_path, "w") as yml_wo_macros:
-            yaml.dump(self.deserialized, yml_wo_macros, default_flow_style=False)
-        self.file_is_valid = self._validate_file(tempo_file_path)
+        self.file_is_valid = self._validate_file()
 
         self.deserialized["scenarios"] = self.deserialized_scenarios
 
-    def _deserialize(self):
+        # only keep files without warnings, nor includes with warnings,
+        # for them to be shown again
+        if self.cache is not None and self.version_is_supported and self.fully_valid:
+            self.cache.store(cache_key, self._cache_entry())
+
+    def _cache_entry(self):
+        """What to store in the cache to restore this reader."""
+        return {
+            "dependencies": self.dependencies,
+            "deserialized": self.deserialized,
+            "known_macros": self.macros_mgr.known_macros,
+            "used_macros": self.macros_mgr.used_macros,
+            "unknown_macros": self.macros_mgr.unknown_macros,
+        }
+
+    def _restore(self, entry):
+        """Restore this reader from a cache entry, instead of reading the file."""
+        fv_logger.log(
+            LVL_FORMAT_VAL,
+            "Validated YAML scenario file from cache: %s",
+            self.file_path,
+        )
+        self.dependencies = entry["dependencies"]
+        self.deserialized = entry["deserialized"]
+        self.deserialized_scenarios = self.deserialized["scenarios"]
+        # update the macros manager as reading the file would
+        self.macros_mgr.known_macros.update(entry["known_macros"])
+        self.macros_mgr.used_macros.update(entry["used_macros"])
+        self.macros_mgr.unknown_macros.update(entry["unknown_macros"])
+
+        self.major = self.deserialized["version"]["major"]
+        self.minor = self.deserialized["version"]["minor"]
+        self.bugfix = self.deserialized["version"]["bugfix"]
+        self.version = "{}.{}.{}".format(
+            str(self.major), str(self.minor), str(self.bugfix)
+        )
+        self.version_is_supported = True
+        self.file_is_valid = True
+        self.fully_valid = True
+        self.from_cache = True
+
+    def _deserialize(self, tree):
         """Deserialize the YAML file and its included scenarios.
 
+        :param tree: The deserialized YAML file, before macros substitution.
+
         :returns: The deserialized file and scenarios.
         """
         logger.info("Reading file...")
-        wetest_file = self._substituteMacros(yaml.safe_load(self.file))
+        wetest_file = self._substituteMacros(tree)
         logger.info("Read file.")
 
         # initialise include, tests and config block if not defined
@@ -449,6 +779,9 @@ class ScenarioReader(object):
             )
             wetest_file["config"].setdefault("retry", 0)
             wetest_file["config"].setdefault("protocol", "PVA")
+            wetest_file["config"].setdefault("monitor", False)
+            wetest_file["config"].setdefault("settle_timeout", None)
+            wetest_file["config"].setdefault("put_mode", "delay")
 
         # transform local tests into something similar to an imported scenario
         local_tests = {
@@ -461,6 +794,15 @@ class ScenarioReader(object):
         logger.info("Reading scenario file(s)...")
         self.deserialized_scenarios = []
 
+        # read and deserialize the included files in parallel beforehand
+        self.loader.prefetch(
+            [
+                path
+                for path in map(self._include_path, wetest_file["include"])
+                if path is not None
+            ]
+        )
+
         for scenario in wetest_file["include"]:
             if self.propagate:
                 sc_macros_mgr = self.macros_mgr.deep_copy()
@@ -496,8 +838,12 @@ class ScenarioReader(object):
                 scenario_path,
                 macros_mgr=sc_macros_mgr,
                 suite_macros=self.macros_mgr.known_macros,
+                cache=self.cache,
+                loader=self.loader,
             )
             self.deserialized_scenarios += new_sc.deserialized_scenarios
+            self.dependencies.update(new_sc.dependencies)
+            self.includes_valid = self.includes_valid and new_sc.fully_valid
 
             # mark macro used in scenario as used for wetest_file
             self.macros_mgr.mark_as_used(new_sc.macros_mgr.used_macros)
@@ -506,6 +852,19 @@ class ScenarioReader(object):
 
         return wetest_file
 
+    def _include_path(self, scenario):
+        """Absolute path of an include list item, None if it has none."""
+        if isinstance(scenario, list) and scenario:
+            scenario = scenario[0]
+        elif isinstance(scenario, dict):
+            scenario = scenario.get("path")
+        if not isinstance(scenario, str) or scenario == "tests":
+            return None
+        try:
+            return self.get_full_path(scenario)
+        except FileNotFound:
+            return None
+
     def get_full_path(self, file_path):
         """Return the absolute path of a file, trying in this order:
         1- provided file_path is already absolute
@@ -539,19 +898,20 @@ class ScenarioReader(object):
         """Check if YAML file format is valid. Check if all found macro was defined.
 
         :param file_path: Specify the path of the file to check (should be
-                          useful for testing only).
+                          useful for testing only), otherwise the deserialized
+                          file, with macros substituted, is checked in memory.
 
         :returns: a boolean on whether it succeded or not.
         """
-        file_path = file_path or self.file_path
-        # we actually validate file_path and not self.filepath,
-        # but self.file_path holds more useful information to display
         fv_logger.log(
             LVL_FORMAT_VAL, "Validation of YAML scenario file: %s", self.file_path
         )
 
-        schema_path = resource_filename("wetest", "resources/scenario_schema.yaml")
-        config = Core(source_file=file_path, schema_files=[schema_path])
+        if file_path is None:
+            config = SchemaValidator(self.deserialized)
+        else:
+            schema_path = resource_filename("wetest", "resources/scenario_schema.yaml")
+            config = Core(source_file=file_path, schema_files=[schema_path])
 
         return self.validate_file(config)
 
@@ -879,4 +1239,11 @@ class ScenarioReader(object):
         else:
             fv_logger.info("Validated mandatory rules.")
 
+        self.fully_valid = (
+            config is not None
+            and schema_valid
+            and len(ncmp_valid) == 0
+            and self.includes_valid
+        )
+
         return schema_valid and ncmp_valid and mand_valid
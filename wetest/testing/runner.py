@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""Runs the tests of a SelectableTestSuite without unittest.TextTestRunner.
+
+Tests are run from their TestData, recording one Outcome per subtest with
+a one line summary of the exception instead of a formatted traceback.
+GUI messages, pause and abort are handled as with SelectableTestResult.
+"""
+
+import logging
+import threading
+import time
+import unittest
+from collections import namedtuple
+
+from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
+from wetest.gui.specific import STATUS_RUN, STATUS_SKIP
+from wetest.gui.specific import STATUS_SUCCESS, STATUS_FAIL, STATUS_ERROR
+from wetest.testing.generator import run_test_data
+from wetest.testing.selectable_tests import SelectableTestResult
+from wetest.testing.selectable_tests import control_on_failure
+
+# configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(TERSE_FORMATTER)
+logger.addHandler(stream_handler)
+logger.addHandler(FILE_HANDLER)
+
+# Result of one subtest, summary is the exception message or skip reason
+Outcome = namedtuple("Outcome", ["test_id", "status", "elapsed", "summary"])
+
+
+def summarize(exception):
+    """One line description of an exception, instead of its traceback."""
+    if isinstance(exception, AssertionError):
+        return str(exception)
+    return "%s: %s" % (type(exception).__name__, exception)
+
+
+class NativeResult(object):
+    """Outcomes of a NativeRunner run.
+
+    failures, errors and skipped list (test, summary) tuples,
+    so that the report can use it as a unittest.TestResult.
+    """
+
+    def __init__(self):
+        self.outcomes = []
+        self.failures = []
+        self.errors = []
+        self.skipped = []
+        self.testsRun = 0
+        self.shouldStop = False
+        self._lock = threading.Lock()
+
+    def stop(self):
+        self.shouldStop = True
+
+    def wasSuccessful(self):
+        return len(self.failures) == len(self.errors) == 0
+
+    def record(self, test, outcome):
+        """Record the outcome of test, without notifying the GUI nor manager."""
+        with self._lock:
+            self.testsRun += 1
+            self.outcomes.append(outcome)
+            if outcome.status == STATUS_FAIL:
+                self.failures.append((test, outcome.summary))
+            elif outcome.status == STATUS_ERROR:
+                self.errors.append((test, outcome.summary))
+            elif outcome.status == STATUS_SKIP:
+                self.skipped.append((test, outcome.summary))
+
+    def add_outcome(self, test, status, summary=None):
+        """Record the outcome of test, and send it to the GUI."""
+        test_data = test.test_data[test._testMethodName]
+        # skipped tests are not timed
+        elapsed = getattr(test_data, "elapsed", None)
+        exception = getattr(test_data, "exception", None)
+        self.record(test, Outcome(test_data.id, status, elapsed, summary))
+
+        queue_to_gui = SelectableTestResult.queue_to_gui
+        if queue_to_gui is not None:
+            queue_to_gui.put([test_data.id, STATUS_RUN, None, None])
+            queue_to_gui.put([test_data.id, status, elapsed, exception])
+
+        if status in [STATUS_FAIL, STATUS_ERROR]:
+            control_on_failure(self, test_data.on_failure)
+
+
+class NativeRunner(object):
+    """Runs a suite of SelectableTestCase calling their TestData directly."""
+
+    def run(self, suite, result=None):
+        """Run the tests of suite, in order, or a suite running its tests itself
+        such as a ConcurrentTestSuite.
+
+        :param result: The NativeResult to record outcomes in, or a new one.
+
+        :returns: The NativeResult.
+        """
+        if result is None:
+            result = NativeResult()
+        start_time = time.time()
+        self._run(suite, result)
+        logger.warning(
+            "Ran %d tests in %.3fs (%d failures, %d errors, %d skipped)",
+            result.testsRun,
+            time.time() - start_time,
+            len(result.failures),
+            len(result.errors),
+            len(result.skipped),
+        )
+        return result
+
+    def _run(self, suite, result):
+        if isinstance(suite, unittest.TestSuite):
+            for test in suite:
+                if result.shouldStop:
+                    break
+                self.run_test(test, result)
+        else:
+            suite(result)
+
+    def run_test(self, test, result):
+        """Run a SelectableTestCase test and record its outcome in result."""
+        test_id = test._testMethodName
+        if not type(test).is_selected(test_id):
+            try:
+                # logs and raises the skip reason
+                getattr(test, test_id)()
+            except unittest.SkipTest as e:
+                result.add_outcome(test, STATUS_SKIP, str(e))
+            return
+
+        try:
+            run_test_data(test, test.test_data[test_id], result)
+        except AssertionError as e:
+            result.add_outcome(test, STATUS_FAIL, summarize(e))
+        except Exception as e:
+            result.add_outcome(test, STATUS_ERROR, summarize(e))
+        else:
+            result.add_outcome(test, STATUS_SUCCESS)
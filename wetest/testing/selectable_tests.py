@@ -1,6 +1,11 @@
+import threading
 import unittest
+from collections.abc import Mapping
+from itertools import groupby
+from queue import Queue, Empty
 
 from wetest.testing.reader import ABORT, PAUSE
+from wetest.pvs.core import pvs_from_suite, test_id_sort
 
 from wetest.gui.specific import (
     STATUS_UNKNOWN,
@@ -118,22 +123,107 @@ class SelectableTestResult(unittest.TextTestResult):
         self.handler_errors(test)
 
     def handler_errors(self, test):
-        if test.test_data[test._testMethodName].on_failure == PAUSE:
-            if not self.queue_to_runner.empty():
-                self.queue_to_runner.get_nowait()
-            self.queue_to_pm.put(PAUSE_FROM_TEST)
-            cmd = self.queue_to_runner.get()
-            while cmd == PAUSE_FROM_MANAGER:
-                cmd = self.queue_to_runner.get()
-            if cmd == PLAY_FROM_MANAGER:
+        control_on_failure(self, test.test_data[test._testMethodName].on_failure)
+
+
+# Time between two reads of the manager commands while paused (in seconds)
+COMMAND_POLL_PERIOD = 0.1
+
+
+class RunControl(object):
+    """Commands of the manager, shared by all the threads running tests.
+
+    Commands read from queue_to_runner update a shared state, instead of
+    being handled by the thread reading them, so that a play or abort resumes
+    every paused thread, whichever thread reads it.
+    """
+
+    def __init__(self, queue_to_runner):
+        self.queue = queue_to_runner
+        self.paused = False
+        self.aborted = False
+        self._condition = threading.Condition()
+
+    def _read_commands(self):
+        """Apply the commands received, with the condition held."""
+        while True:
+            try:
+                cmd = self.queue.get_nowait()
+            except Empty:
                 return
+            if cmd == PAUSE_FROM_MANAGER:
+                self.paused = True
+            elif cmd == PLAY_FROM_MANAGER:
+                self.paused = False
             elif cmd == ABORT_FROM_MANAGER:
-                self.stop()
-                return
-        elif test.test_data[test._testMethodName].on_failure == ABORT:
-            self.queue_to_pm.put(ABORT_FROM_TEST)
-            self.stop()
-            return
+                self.aborted = True
+                self.paused = False
+            self._condition.notify_all()
+
+    def reset(self):
+        """Forget the commands of a previous run."""
+        with self._condition:
+            self._read_commands()
+            self.paused = False
+            self.aborted = False
+
+    def must_wait(self):
+        """Whether checkpoint may wait, for callers that should not block."""
+        return self.paused or not self.queue.empty()
+
+    def checkpoint(self, result):
+        """Wait while the run is paused, stop result if it was aborted."""
+        with self._condition:
+            self._read_commands()
+            while self.paused:
+                self._condition.wait(COMMAND_POLL_PERIOD)
+                self._read_commands()
+            aborted = self.aborted
+        if aborted:
+            result.stop()
+
+    def pause(self, result):
+        """Pause the run after a failure, until played or aborted."""
+        with self._condition:
+            self._read_commands()
+            if not self.aborted:
+                self.paused = True
+        SelectableTestResult.queue_to_pm.put(PAUSE_FROM_TEST)
+        self.checkpoint(result)
+
+
+_run_control = None
+_run_control_lock = threading.Lock()
+
+
+def run_control():
+    """The RunControl reading SelectableTestResult.queue_to_runner."""
+    global _run_control
+    with _run_control_lock:
+        queue_to_runner = SelectableTestResult.queue_to_runner
+        if _run_control is None or _run_control.queue is not queue_to_runner:
+            _run_control = RunControl(queue_to_runner)
+        return _run_control
+
+
+def control_on_failure(result, on_failure):
+    """Pause or abort the run after a failure, depending on on_failure.
+
+    Within a LockedTestResult call, this is done once its lock is released.
+
+    :param result:     The result of the run, stopped on abort.
+    :param on_failure: The test on_failure field (continue, pause or abort).
+    """
+    deferred = getattr(result, "deferred_control", None)
+    if deferred is not None and getattr(deferred, "active", False):
+        deferred.on_failure = on_failure
+        return
+
+    if on_failure == PAUSE:
+        run_control().pause(result)
+    elif on_failure == ABORT:
+        SelectableTestResult.queue_to_pm.put(ABORT_FROM_TEST)
+        result.stop()
 
 
 class SelectableTestCase(unittest.TestCase):
@@ -159,6 +249,90 @@ class SelectableTestCase(unittest.TestCase):
         """Unskip the test method `test_id`"""
         setattr(cls, test_id, cls.func_backup[test_id])
 
+    @classmethod
+    def is_selected(cls, test_id):
+        """Whether the test method `test_id` will run instead of being skipped"""
+        return vars(cls).get(test_id) is cls.func_backup.get(test_id)
+
+
+class LazyTests(object):
+    """Tests of a suite made only when the suite is iterated.
+
+    Their ids are prefix followed by a row number, test_case_cls(test_id)
+    making the test of a row. Tests are selected unless skipped.
+    """
+
+    def __init__(self, test_case_cls, prefix, rows):
+        """
+        :param test_case_cls: A SelectableTestCase class, made from a test id.
+        :param prefix:        The test ids without their row number.
+        :param rows:          The range of the rows of the tests, in order.
+        """
+        self.test_case_cls = test_case_cls
+        self.prefix = prefix
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        for test_id in self.test_ids():
+            yield self.test_case_cls(test_id)
+
+    def __call__(self, result):
+        for test in self:
+            if result.shouldStop:
+                break
+            test(result)
+        return result
+
+    def countTestCases(self):
+        return len(self.rows)
+
+    def test_ids(self):
+        """The ids of the tests, in order."""
+        return (self.prefix + str(row) for row in self.rows)
+
+    def row(self, test_id):
+        """The row of test_id, None if it is not one of the tests."""
+        row = test_id[len(self.prefix) :]
+        if test_id.startswith(self.prefix) and row.isdigit() and int(row) in self.rows:
+            return int(row)
+        return None
+
+    def subset(self, rows):
+        """LazyTests of some of the rows, rows being a range."""
+        return LazyTests(self.test_case_cls, self.prefix, rows)
+
+
+class TestsInfos(Mapping):
+    """Test data of a suite by test id, in the suite order.
+
+    The data of lazy tests is made again for each lookup.
+    """
+
+    def __init__(self, suite):
+        self._suite = suite
+
+    def __getitem__(self, test_id):
+        if test_id in self._suite._tests_data:
+            return self._suite._tests_data[test_id]
+        tests = self._suite._lazy_tests_of(test_id)
+        if tests is None:
+            raise KeyError(test_id)
+        return tests.test_case_cls.test_data[test_id]
+
+    def __iter__(self):
+        for test in self._suite._tests:
+            if isinstance(test, LazyTests):
+                for test_id in test.test_ids():
+                    yield test_id
+            else:
+                yield test._testMethodName
+
+    def __len__(self):
+        return self._suite.countTestCases()
+
 
 class SelectableTestSuite(unittest.TestSuite):
     """A unittest.TestSuite with conveniency method to skip and unskip tests."""
@@ -170,11 +344,24 @@ class SelectableTestSuite(unittest.TestSuite):
         self._tests_data = {}
         self._skipped_tests = {}
         self._selected_tests = {}
+        # LazyTests by prefix
+        self._lazy_tests = {}
+
+    def __iter__(self):
+        for test in self._tests:
+            if isinstance(test, LazyTests):
+                for lazy_test in test:
+                    yield lazy_test
+            else:
+                yield test
+
+    def countTestCases(self):
+        return sum(test.countTestCases() for test in self._tests)
 
     @property
     def tests_infos(self):
         """Keep test data available for later."""
-        return self._tests_data
+        return TestsInfos(self)
 
     def add_skipped_test(self, Test_case, test_id, reason):
         """Add a test to and its data to the suite and reference it as skipped."""
@@ -190,12 +377,44 @@ class SelectableTestSuite(unittest.TestSuite):
         self.addTest(Test_case(test_id))
         self._tests_data[test_id] = Test_case.test_data[test_id]
 
+    def add_lazy_tests(self, Test_case, prefix, rows):
+        """Add tests made when the suite reaches them, see LazyTests."""
+        self._add_lazy_tests(LazyTests(Test_case, prefix, rows))
+
+    def _add_lazy_tests(self, tests):
+        self.addTest(tests)
+        self._lazy_tests.setdefault(tests.prefix, []).append(tests)
+
+    def _lazy_tests_of(self, test_id):
+        """The LazyTests test_id is one of, None if it is not lazy."""
+        for tests in self._lazy_tests.get(test_id.rstrip("0123456789"), []):
+            if tests.row(test_id) is not None:
+                return tests
+        return None
+
+    def _test_case_cls(self, test_id):
+        if test_id in self._selected_tests:
+            return self._selected_tests[test_id]
+        if test_id in self._skipped_tests:
+            return self._skipped_tests[test_id]
+        return self._lazy_tests_of(test_id).test_case_cls
+
+    def test_case(self, test_id):
+        """A test case running test_id."""
+        return self._test_case_cls(test_id)(test_id)
+
+    def is_selected(self, test_id):
+        """Whether test_id will run instead of being skipped"""
+        return self._test_case_cls(test_id).is_selected(test_id)
+
     def select(self, test_id):
         """Ensure test is selected"""
         if test_id in self._skipped_tests:
             test_case = self._skipped_tests.pop(test_id)
             test_case.select(test_id)
             self._selected_tests[test_id] = test_case
+        elif test_id not in self._selected_tests:
+            self._lazy_tests_of(test_id).test_case_cls.select(test_id)
 
     def skip(self, test_id, reason):
         """Ensure test is skipped"""
@@ -203,9 +422,62 @@ class SelectableTestSuite(unittest.TestSuite):
             test_case = self._selected_tests.pop(test_id)
             test_case.skip(test_id, reason)
             self._skipped_tests[test_id] = test_case
+        elif test_id not in self._skipped_tests:
+            self._lazy_tests_of(test_id).test_case_cls.skip(test_id, reason)
+
+    def subset(self, test_ids):
+        """A SelectableTestSuite of the tests in test_ids, in test_ids order."""
+        tests = dict(
+            (test._testMethodName, test)
+            for test in self._tests
+            if not isinstance(test, LazyTests)
+        )
+        # test ids, and consecutive rows of LazyTests as [tests, first, last]
+        entries = []
+        for test_id in test_ids:
+            if test_id in tests:
+                entries.append(test_id)
+                continue
+            lazy_tests = self._lazy_tests_of(test_id)
+            if lazy_tests is None:
+                raise KeyError(test_id)
+            row = lazy_tests.row(test_id)
+            last = entries[-1] if entries else None
+            if isinstance(last, list) and last[0] is lazy_tests and last[2] + 1 == row:
+                last[2] = row
+            else:
+                entries.append([lazy_tests, row, row])
+
+        suite = SelectableTestSuite()
+        for entry in entries:
+            if isinstance(entry, list):
+                lazy_tests, first, last = entry
+                suite._add_lazy_tests(lazy_tests.subset(range(first, last + 1)))
+                continue
+            test_id = entry
+            suite.addTest(tests[test_id])
+            suite._tests_data[test_id] = self._tests_data[test_id]
+            if test_id in self._skipped_tests:
+                suite._skipped_tests[test_id] = self._skipped_tests[test_id]
+            if test_id in self._selected_tests:
+                suite._selected_tests[test_id] = self._selected_tests[test_id]
+        return suite
+
+    def split_scenarios(self):
+        """Split the suite in one SelectableTestSuite per scenario.
+
+        :returns: a list of (scenario index, suite), in the suite order.
+        """
+        scenarios = []
+        for scenario, test_ids in groupby(
+            self.tests_infos, key=lambda test_id: test_id_sort(test_id)[0]
+        ):
+            scenarios.append((scenario, self.subset(test_ids)))
+        return scenarios
 
     def apply_selection(self, selection, reason):
         """Tests and skip tests, based on test ids in selection list."""
+        selection = set(selection)
         already_selected = dict(self._selected_tests)
         already_skipped = dict(self._skipped_tests)
         for test_id in already_selected:
@@ -214,6 +486,175 @@ class SelectableTestSuite(unittest.TestSuite):
         for test_id in selection:
             if test_id in already_skipped:
                 self.select(test_id)
+        for lazy_tests in self._tests:
+            if isinstance(lazy_tests, LazyTests):
+                for test_id in lazy_tests.test_ids():
+                    if test_id in selection:
+                        lazy_tests.test_case_cls.select(test_id)
+                    else:
+                        lazy_tests.test_case_cls.skip(test_id, reason)
+
+
+class LockedTestResult(object):
+    """Serializes the calls to a TestResult shared by several threads.
+
+    Pausing or aborting after a failure is done once the lock is released,
+    for the other threads to report their results meanwhile.
+    """
+
+    def __init__(self, result):
+        self._result = result
+        self._lock = threading.RLock()
+        result.deferred_control = threading.local()
+
+    def __getattr__(self, name):
+        attr = getattr(self._result, name)
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+            deferred = self._result.deferred_control
+            with self._lock:
+                deferred.active = True
+                deferred.on_failure = None
+                try:
+                    value = attr(*args, **kwargs)
+                finally:
+                    deferred.active = False
+            if deferred.on_failure is not None:
+                control_on_failure(self._result, deferred.on_failure)
+            return value
+
+        return locked
+
+
+class ConcurrentTestSuite(object):
+    """Runs a SelectableTestSuite with tests and scenarios run concurrently.
+
+    In concurrent scenarios, each test (with its subtests in order) is run by
+    one of `jobs` worker threads, subtests sharing a setter PV being serialized.
+    Other scenarios run their tests in order.
+
+    Up to `scenario_jobs` scenarios run at once, a scenario waiting for all
+    the previous scenarios sharing a PV with it to be done.
+    """
+
+    def __init__(
+        self, suite, jobs, concurrent_scenarios, scenario_jobs=1, run_test=None
+    ):
+        """
+        :param suite:                The SelectableTestSuite to run.
+        :param jobs:                 Number of worker threads per scenario.
+        :param concurrent_scenarios: Indexes of the scenarios to run concurrently.
+        :param scenario_jobs:        Number of scenarios run at once.
+        :param run_test:             run_test(test, result) runs one test,
+                                     by default test(result).
+        """
+        self.suite = suite
+        self.run_test = run_test if run_test is not None else run_unittest
+        self.jobs = jobs
+        self.concurrent_scenarios = set(concurrent_scenarios)
+        self.scenario_jobs = scenario_jobs
+        self._setter_locks = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, result):
+        return self.run(result)
+
+    def countTestCases(self):
+        return self.suite.countTestCases()
+
+    def run(self, result):
+        locked_result = LockedTestResult(result)
+        scenarios = self.suite.split_scenarios()
+        if self.scenario_jobs > 1:
+            self._run_scheduled(scenarios, locked_result)
+        else:
+            for scenario, scenario_suite in scenarios:
+                if result.shouldStop:
+                    break
+                self._run_scenario(scenario, scenario_suite, locked_result)
+        return result
+
+    def _run_scenario(self, scenario, scenario_suite, result):
+        if scenario in self.concurrent_scenarios and self.jobs > 1:
+            self._run_concurrently(scenario_suite, result)
+        else:
+            for test in scenario_suite:
+                if result.shouldStop:
+                    break
+                self.run_test(test, result)
+
+    def _run_scheduled(self, scenarios, result):
+        """Run scenarios concurrently, unless they share PVs with previous ones."""
+        footprints = [
+            set(pvs_from_suite(scenario_suite)) for _, scenario_suite in scenarios
+        ]
+        done = [threading.Event() for _ in scenarios]
+        slots = threading.Semaphore(self.scenario_jobs)
+
+        def run_one(position):
+            try:
+                for previous in range(position):
+                    if footprints[previous] & footprints[position]:
+                        done[previous].wait()
+                with slots:
+                    if not result.shouldStop:
+                        self._run_scenario(*scenarios[position], result=result)
+            finally:
+                done[position].set()
+
+        threads = [
+            threading.Thread(target=run_one, args=(position,))
+            for position in range(len(scenarios))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _test_index(self, test_id):
+        return test_id_sort(test_id)[1]
+
+    def _setter_lock(self, setter):
+        with self._lock:
+            if setter not in self._setter_locks:
+                self._setter_locks[setter] = threading.Lock()
+            return self._setter_locks[setter]
+
+    def _run_concurrently(self, suite, result):
+        # a suite per test, its tests being made when run
+        groups = Queue()
+        for _, test_ids in groupby(suite.tests_infos, key=self._test_index):
+            groups.put(suite.subset(test_ids))
+        workers = [
+            threading.Thread(target=self._worker, args=(groups, result))
+            for _ in range(min(self.jobs, groups.qsize()))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def _worker(self, groups, result):
+        while not result.shouldStop:
+            try:
+                group = groups.get_nowait()
+            except Empty:
+                return
+            for test in group:
+                if result.shouldStop:
+                    return
+                setter = test.test_data[test._testMethodName].setter
+                if setter is None:
+                    self.run_test(test, result)
+                else:
+                    with self._setter_lock(setter):
+                        self.run_test(test, result)
+
+
+def run_unittest(test, result):
+    test(result)
 
 
 def skipped_test_factory(test_data, reason):
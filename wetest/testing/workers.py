@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2019 by CEA
+#
+# The full license specifying the redistribution, modification, usage and other
+# rights and obligations is included with the distribution of this project in
+# the file "LICENSE".
+#
+# THIS SOFTWARE IS PROVIDED AS-IS WITHOUT WARRANTY OF ANY KIND, NOT EVEN THE
+# IMPLIED WARRANTY OF MERCHANTABILITY. THE AUTHOR OF THIS SOFTWARE, ASSUMES
+# _NO_ RESPONSIBILITY FOR ANY CONSEQUENCE RESULTING FROM THE USE, MODIFICATION,
+# OR REDISTRIBUTION OF THIS SOFTWARE.
+
+"""Runs the tests of a SelectableTestSuite in worker processes.
+
+Scenarios are split in shards, scenarios sharing a PV being in the same
+shard. Each worker process is started afresh, with its own CA and PVA
+contexts, generates the tests from the scenario files and runs its shard
+with a NativeRunner.
+
+Workers send records over a pipe to the manager process:
+- ("gui", message): a message for the GUI, exceptions sent as strings,
+  including the ENeXAr AcquisitionFailure as they happen,
+- ("pm", command): a pause or abort request from a test,
+- ("outcome", outcome): the Outcome of a test,
+- ("latency", stats): the LatencyStats of the PV operations of the worker,
+- ("enexar", failures): the ENeXAr AcquisitionFailure of the worker,
+- ("done", None): the shard is done.
+The manager forwards its play, pause and abort commands to all the workers.
+"""
+
+import logging
+import multiprocessing
+import threading
+from multiprocessing.connection import wait
+from queue import Queue, Empty
+
+from wetest.common.constants import TERSE_FORMATTER, FILE_HANDLER
+from wetest.common.constants import ABORT_FROM_TEST, ABORT_FROM_MANAGER
+from wetest.gui.specific import STATUS_ERROR
+from wetest.pvs.core import PVConnection, pvs_from_suite
+from wetest.pvs.enexar import enexar_logger
+from wetest.testing.cache import ScenarioCache
+from wetest.testing.reader import MacrosManager
+from wetest.testing.runner import NativeResult, NativeRunner, Outcome
+from wetest.testing.selectable_tests import ConcurrentTestSuite
+from wetest.testing.selectable_tests import SelectableTestResult
+
+# configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(TERSE_FORMATTER)
+logger.addHandler(stream_handler)
+logger.addHandler(FILE_HANDLER)
+
+# delay between checks of the manager commands, in seconds
+COMMAND_PERIOD = 0.1
+
+# reason of the tests unselected in the manager
+SKIP_REASON = "Skipped from GUI."
+
+
+def split_shards(suite, processes):
+    """Split suite in at most `processes` lists of test ids.
+
+    Scenarios sharing a PV, even as getter, are kept in the same shard and
+    in order. Shards are balanced on their number of tests.
+
+    :param suite:     A SelectableTestSuite.
+    :param processes: The maximum number of shards.
+
+    :returns: A list of lists of test ids, each in the suite order.
+    """
+    scenarios = suite.split_scenarios()
+    footprints = [
+        set(pvs_from_suite(scenario_suite)) for _, scenario_suite in scenarios
+    ]
+
+    # group scenarios sharing PVs, directly or through other scenarios
+    groups = []
+    for position, footprint in enumerate(footprints):
+        group = {"positions": [position], "pvs": set(footprint)}
+        for other in list(groups):
+            if other["pvs"] & group["pvs"]:
+                groups.remove(other)
+                group["positions"] += other["positions"]
+                group["pvs"] |= other["pvs"]
+        groups.append(group)
+
+    # biggest groups first, each to the smallest shard
+    for group in groups:
+        group["size"] = sum(
+            scenarios[position][1].countTestCases() for position in group["positions"]
+        )
+    shards = [[] for _ in range(min(processes, len(groups)))]
+    sizes = [0] * len(shards)
+    for group in sorted(groups, key=lambda group: -group["size"]):
+        smallest = sizes.index(min(sizes))
+        shards[smallest] += group["positions"]
+        sizes[smallest] += group["size"]
+
+    return [
+        [
+            test_id
+            for position in sorted(positions)
+            for test_id in scenarios[position][1].tests_infos
+        ]
+        for positions in shards
+    ]
+
+
+class PipeQueue(object):
+    """Sends the items put in it over a pipe, as (kind, item) records."""
+
+    def __init__(self, conn, kind, lock):
+        self.conn = conn
+        self.kind = kind
+        self.lock = lock
+
+    def put(self, item):
+        if self.kind == "gui" and isinstance(item, list) and item[3] is not None:
+            # exceptions may not be unpickled in the manager
+            item = item[:3] + [str(item[3])]
+        with self.lock:
+            self.conn.send((self.kind, item))
+
+
+class WorkerResult(NativeResult):
+    """A NativeResult also sending its outcomes over a pipe."""
+
+    def __init__(self, conn, lock):
+        NativeResult.__init__(self)
+        self.conn = conn
+        self.send_lock = lock
+
+    def record(self, test, outcome):
+        NativeResult.record(self, test, outcome)
+        with self.send_lock:
+            self.conn.send(("outcome", outcome))
+
+
+def receive_commands(conn, queue_to_runner):
+    """Put the manager commands received on conn in queue_to_runner."""
+    while True:
+        try:
+            queue_to_runner.put(conn.recv())
+        except (EOFError, OSError):
+            return
+
+
+def worker_main(conn, generation, test_ids, skipped, run_args):
+    """Entry point of a worker process, running test_ids.
+
+    :param conn:       The worker end of the pipe to the manager.
+    :param generation: Arguments to generate the suite, see WorkerPool.
+    :param test_ids:   The ids of the tests to run, in order.
+    :param skipped:    The ids of the tests unselected in the manager.
+    :param run_args:   (jobs, concurrent_scenarios, scenario_jobs)
+    """
+    # imported here as the command line starts the process manager
+    from wetest.command_line import generate_tests, load_bundle
+
+    lock = threading.Lock()
+    SelectableTestResult.queue_to_gui = PipeQueue(conn, "gui", lock)
+    SelectableTestResult.queue_to_pm = PipeQueue(conn, "pm", lock)
+    SelectableTestResult.queue_to_runner = Queue()
+    enexar_logger.queue_to_gui = SelectableTestResult.queue_to_gui
+    receiver = threading.Thread(
+        target=receive_commands,
+        args=(conn, SelectableTestResult.queue_to_runner),
+        name="receive_commands",
+    )
+    receiver.daemon = True
+    receiver.start()
+
+    cache = ScenarioCache() if generation["cache"] else None
+    if generation.get("bundle") is not None:
+        suite, _, _ = load_bundle(generation["bundle"], cache=cache)
+    else:
+        suite, _ = generate_tests(
+            scenarios=list(generation["scenarios"]),
+            macros_mgr=MacrosManager(known_macros=dict(generation["macros"])),
+            propagate=generation["propagate"],
+            cache=cache,
+        )
+    skipped = set(skipped)
+    for test_id in test_ids:
+        if test_id in skipped:
+            suite.skip(test_id, SKIP_REASON)
+        else:
+            suite.select(test_id)
+    suite = suite.subset(test_ids)
+
+    runner = NativeRunner()
+    jobs, concurrent_scenarios, scenario_jobs = run_args
+    if jobs > 1 or scenario_jobs > 1:
+        suite = ConcurrentTestSuite(
+            suite,
+            jobs,
+            concurrent_scenarios,
+            scenario_jobs,
+            run_test=runner.run_test,
+        )
+    result = WorkerResult(conn, lock)
+    try:
+        runner.run(suite, result)
+    finally:
+        enexar_logger.flush()
+        with lock:
+            conn.send(("latency", PVConnection.latencies))
+            conn.send(("enexar", enexar_logger.failures))
+            conn.send(("done", None))
+        conn.close()
+
+
+class WorkerPool(object):
+    """Runs a SelectableTestSuite in worker processes, see module doc."""
+
+    def __init__(
+        self,
+        suite,
+        processes,
+        generation,
+        jobs=1,
+        concurrent_scenarios=(),
+        scenario_jobs=1,
+    ):
+        """
+        :param suite:                The SelectableTestSuite to run.
+        :param processes:            Maximum number of worker processes.
+        :param generation:           Arguments to generate the suite again,
+                                     a dict with the `scenarios` files,
+                                     the CLI `macros`, `propagate`,
+                                     whether to use the scenario `cache`
+                                     and the `bundle` to load, if any.
+        :param jobs:                 Number of threads per scenario, in workers.
+        :param concurrent_scenarios: Indexes of the scenarios to run concurrently.
+        :param scenario_jobs:        Number of scenarios run at once, in workers.
+        """
+        self.suite = suite
+        self.processes = processes
+        self.generation = generation
+        self.run_args = (jobs, list(concurrent_scenarios), scenario_jobs)
+        # fresh interpreters, not to share the CA and PVA contexts
+        self.context = multiprocessing.get_context("spawn")
+
+    def __call__(self, result):
+        return self.run(result)
+
+    def countTestCases(self):
+        return self.suite.countTestCases()
+
+    def run(self, result):
+        """Run the suite in worker processes, recording outcomes in result.
+
+        :param result: A NativeResult.
+        """
+        skipped = [
+            test_id
+            for test_id in self.suite.tests_infos
+            if not self.suite.is_selected(test_id)
+        ]
+
+        workers = {}
+        for index, test_ids in enumerate(split_shards(self.suite, self.processes)):
+            conn, worker_conn = self.context.Pipe()
+            process = self.context.Process(
+                target=worker_main,
+                args=(worker_conn, self.generation, test_ids, skipped, self.run_args),
+                name="wetest-worker-%d" % index,
+            )
+            process.start()
+            worker_conn.close()
+            workers[conn] = (process, test_ids)
+        logger.warning("Running tests in %d worker processes.", len(workers))
+
+        done = threading.Event()
+        forwarder = threading.Thread(
+            target=self._forward_commands,
+            args=(list(workers), result, done),
+            name="forward_commands",
+        )
+        forwarder.start()
+        try:
+            self._receive(workers, result)
+        finally:
+            done.set()
+            forwarder.join()
+            for process, _ in workers.values():
+                process.join()
+        return result
+
+    def _receive(self, workers, result):
+        reported = set()
+        conns = list(workers)
+        while conns:
+            for conn in wait(conns):
+                try:
+                    kind, item = conn.recv()
+                except EOFError:
+                    kind, item = "done", None
+                if kind == "gui":
+                    if SelectableTestResult.queue_to_gui is not None:
+                        SelectableTestResult.queue_to_gui.put(item)
+                elif kind == "pm":
+                    if item == ABORT_FROM_TEST:
+                        result.stop()
+                    if SelectableTestResult.queue_to_pm is not None:
+                        SelectableTestResult.queue_to_pm.put(item)
+                elif kind == "outcome":
+                    reported.add(item.test_id)
+                    result.record(self.suite.test_case(item.test_id), item)
+                elif kind == "latency":
+                    PVConnection.latencies.merge(item)
+                elif kind == "enexar":
+                    enexar_logger.failures.extend(item)
+                elif kind == "done":
+                    conns.remove(conn)
+                    conn.close()
+
+        # tests of crashed workers are errors, unless the run was aborted
+        for conn, (process, test_ids) in workers.items():
+            process.join()
+            if process.exitcode == 0 or result.shouldStop:
+                continue
+            logger.error(
+                "Worker process %s exited with code %s.",
+                process.name,
+                process.exitcode,
+            )
+            summary = "Worker process exited with code %s" % process.exitcode
+            for test_id in test_ids:
+                if test_id not in reported:
+                    result.record(
+                        self.suite.test_case(test_id),
+                        Outcome(test_id, STATUS_ERROR, None, summary),
+                    )
+
+    def _forward_commands(self, conns, result, done):
+        """Send the manager commands to all the workers, until done."""
+        queue_to_runner = SelectableTestResult.queue_to_runner
+        while not done.is_set() and queue_to_runner is not None:
+            try:
+                cmd = queue_to_runner.get(timeout=COMMAND_PERIOD)
+            except Empty:
+                continue
+            if cmd == ABORT_FROM_MANAGER:
+                result.stop()
+            for conn in conns:
+                try:
+                    conn.send(cmd)
+                except (OSError, ValueError):
+                    # worker already done
+                    pass
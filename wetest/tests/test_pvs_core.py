@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test pvs.core module."""
+
+import threading
+import time
+import unittest
+from queue import Queue
+from unittest import mock
+
+from p4p.client.thread import TimeoutError
+
+from wetest.pvs import core
+from wetest.pvs.core import PVConnection, PVConnectionPool, PVValueCache, StaleValue
+from wetest.pvs.core import LatencyHistogram, LatencyStats
+from wetest.pvs.core import PVData, PVsTable, PVEventBus, PVStatusBatch
+
+
+class FakeConnection(object):
+    """A connection that does not need any IOC."""
+
+    def __init__(self, name, protocol, monitor=False):
+        self.pvname = name
+        self.protocol = protocol
+        self.closed = False
+        self.callback = None
+
+    def subscribe(self, callback):
+        self.callback = callback
+
+    def close(self):
+        self.closed = True
+
+
+class TestPVConnectionPool(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_reuse_connection(self):
+        """Same name and protocol share the same connection."""
+        pool = PVConnectionPool(FakeConnection)
+        first = pool.get("PV:A", "CA")
+        self.assertIs(first, pool.get("PV:A", "ca"))
+        self.assertIsNot(first, pool.get("PV:A", "PVA"))
+        self.assertEqual(1, pool.hits)
+        self.assertEqual(2, pool.misses)
+
+    def test_lru_eviction(self):
+        """Least recently used connection is dropped first, without closing it."""
+        pool = PVConnectionPool(FakeConnection, max_size=2)
+        pv_a = pool.get("PV:A", "CA")
+        pv_b = pool.get("PV:B", "CA")
+        pool.get("PV:A", "CA")
+        pool.get("PV:C", "CA")
+        # may still be used by another thread
+        self.assertFalse(pv_b.closed)
+        self.assertFalse(pv_a.closed)
+        self.assertIn(("PV:A", "CA"), pool)
+        self.assertNotIn(("PV:B", "CA"), pool)
+        self.assertEqual(1, pool.evictions)
+        self.assertEqual(2, len(pool))
+
+    def test_connect_time(self):
+        """Connections are timed until they are connected."""
+
+        class SlowConnection(FakeConnection):
+            def wait_for_connection(self, timeout):
+                time.sleep(0.05)
+                return True
+
+        pool = PVConnectionPool(SlowConnection)
+        pool.get("PV:A", "CA")
+        self.assertGreaterEqual(pool.connect_time, 0.05)
+
+    def test_connect_unlocked(self):
+        """Pooled connections are served while another one is connecting."""
+        connecting = threading.Event()
+        release = threading.Event()
+
+        class BlockingConnection(FakeConnection):
+            def wait_for_connection(self, timeout):
+                if self.pvname == "PV:SLOW":
+                    connecting.set()
+                    release.wait(2)
+                return True
+
+        pool = PVConnectionPool(BlockingConnection)
+        pv_a = pool.get("PV:A", "CA")
+        thread = threading.Thread(target=pool.get, args=("PV:SLOW", "CA"))
+        thread.start()
+        self.assertTrue(connecting.wait(2))
+        self.assertIs(pv_a, pool.get("PV:A", "CA"))
+        self.assertNotIn(("PV:SLOW", "CA"), pool)
+        release.set()
+        thread.join(2)
+        self.assertIn(("PV:SLOW", "CA"), pool)
+
+    def test_clear(self):
+        """Clearing the pool closes the connections."""
+        pool = PVConnectionPool(FakeConnection)
+        pv_a = pool.get("PV:A", "CA")
+        pool.clear()
+        self.assertTrue(pv_a.closed)
+        self.assertEqual(0, pool.stats()["size"])
+
+
+class TestPVValueCache(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        self.connections = {}
+
+        def factory(name, protocol, monitor=False):
+            self.connections[name] = FakeConnection(name, protocol, monitor)
+            return self.connections[name]
+
+        self.cache = PVValueCache(factory)
+
+    def test_subscribe_once(self):
+        """A PV is only subscribed once."""
+        self.cache.subscribe("PV:A", "CA")
+        first = self.connections["PV:A"]
+        self.cache.subscribe("PV:A", "ca")
+        self.assertIs(first, self.connections["PV:A"])
+        self.assertIn(("PV:A", "CA"), self.cache)
+
+    def test_latest_value(self):
+        """The cache answers with the last monitored value."""
+        self.cache.subscribe("PV:A", "CA")
+        self.connections["PV:A"].callback(1, "one")
+        self.connections["PV:A"].callback(2, "two")
+        entry = self.cache.get("PV:A", "CA")
+        self.assertEqual(2, entry.value)
+        self.assertEqual("two", entry.char_value)
+
+    def test_newer_than(self):
+        """Requesting a value newer than the last update times out."""
+        self.cache.subscribe("PV:A", "CA")
+        self.connections["PV:A"].callback(1, None)
+        with self.assertRaises(StaleValue):
+            self.cache.get("PV:A", "CA", newer_than=time.time(), timeout=0.01)
+
+    def test_no_value(self):
+        """Reading a PV without any update times out."""
+        self.cache.subscribe("PV:A", "CA")
+        with self.assertRaises(StaleValue):
+            self.cache.get("PV:A", "CA", timeout=0.01)
+
+
+class TestBulkOperations(unittest.TestCase):
+    """Bulk get and put, without any IOC."""
+
+    def setUp(self):
+        for name, target, attribute in [
+            ("caget_many", core.epics, "caget_many"),
+            ("caput_many", core.epics, "caput_many"),
+            ("ctxt", PVConnection.PvaConnection, "ctxt"),
+        ]:
+            patcher = mock.patch.object(target, attribute)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_get_many(self):
+        """Values are returned in order, one round trip per protocol."""
+        self.caget_many.return_value = [1, 2]
+        self.ctxt.get.return_value = [3.5]
+        results = PVConnection.get_many(["CA:A", "CA:B"], "CA")
+        results += PVConnection.get_many(["PVA:C"], "pva")
+        self.assertEqual(
+            [("CA:A", 1, None), ("CA:B", 2, None), ("PVA:C", 3.5, None)],
+            [tuple(result) for result in results],
+        )
+        self.caget_many.assert_called_once_with(
+            ["CA:A", "CA:B"], as_string=False, timeout=core.GET_TIMEOUT
+        )
+        self.ctxt.get.assert_called_once_with(
+            ["PVA:C"], timeout=core.GET_TIMEOUT, throw=False
+        )
+
+    def test_get_many_as_string(self):
+        """PVA values are read as strings like CA ones."""
+        self.ctxt.get.return_value = [3.5]
+        results = PVConnection.get_many(["PVA:C"], "PVA", as_string=True)
+        self.assertEqual("3.5", results[0].value)
+
+    def test_get_many_disconnected(self):
+        """Disconnected PVs are reported without failing the others."""
+        self.caget_many.return_value = [1, None]
+        timeout = TimeoutError()
+        self.ctxt.get.return_value = [timeout, 3]
+        results = PVConnection.get_many(["CA:A", "CA:B"], "CA")
+        results += PVConnection.get_many(["PVA:C", "PVA:D"], "PVA")
+        self.assertEqual(
+            [None, "Unable to get CA:B", timeout, None],
+            [result.error for result in results],
+        )
+        self.assertEqual(3, results[3].value)
+
+    def test_put_many(self):
+        """Puts are sent in order, per-PV errors are reported."""
+        self.caput_many.return_value = [1, -1]
+        timeout = TimeoutError()
+        self.ctxt.put.return_value = [None, timeout]
+        results = PVConnection.put_many({"CA:A": 1, "CA:B": 2}, "CA", wait=True)
+        results += PVConnection.put_many({"PVA:C": 3, "PVA:D": 4}, "PVA")
+        self.assertEqual(
+            [None, "Unable to put CA:B", None, timeout],
+            [result.error for result in results],
+        )
+        self.caput_many.assert_called_once_with(
+            ["CA:A", "CA:B"], [1, 2], wait="all", put_timeout=core.PUT_TIMEOUT
+        )
+        self.ctxt.put.assert_called_once_with(
+            ["PVA:C", "PVA:D"],
+            [3, 4],
+            timeout=core.PUT_TIMEOUT,
+            throw=False,
+            wait=None,
+        )
+
+    def test_unknown_protocol(self):
+        """Bulk operations fail like single PV connections."""
+        with self.assertRaises(NotImplementedError) as single:
+            PVConnection.new_pv_connection("PV:A", "HTTP")
+        with self.assertRaises(NotImplementedError) as get_many:
+            PVConnection.get_many(["PV:A"], "HTTP")
+        with self.assertRaises(NotImplementedError) as put_many:
+            PVConnection.put_many({"PV:A": 1}, "HTTP")
+        self.assertEqual(str(single.exception), str(get_many.exception))
+        self.assertEqual(str(single.exception), str(put_many.exception))
+
+
+class TestCallbackPut(unittest.TestCase):
+    """Puts waiting for completion, as with put_mode: callback."""
+
+    def setUp(self):
+        patcher = mock.patch.object(core.epics, "PV")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ca = PVConnection.CaConnection("CA:A", None)
+
+    def test_ca_completed(self):
+        """A completed CA put callback is reported as such."""
+        self.ca.pv.put.return_value = 1
+        self.assertTrue(self.ca.put(5, wait=True, timeout=0.5))
+        self.ca.pv.put.assert_called_once_with(5, wait=True, timeout=0.5)
+
+    def test_ca_timeout(self):
+        """pyepics negates the status of puts not completed in time."""
+        self.ca.pv.put.return_value = -1
+        self.assertFalse(self.ca.put(5, wait=True, timeout=0.5))
+
+    def test_ca_no_wait(self):
+        """Without callback, the put is reported as completed at once."""
+        self.ca.pv.put.return_value = 1
+        self.assertTrue(self.ca.put(5))
+        self.ca.pv.put.assert_called_once_with(5, wait=False, timeout=core.PUT_TIMEOUT)
+
+    def test_pva_timeout(self):
+        """A PVA put not completed in time is reported, not raised."""
+        connection = PVConnection.PvaConnection("PVA:A", None)
+        with mock.patch.object(connection, "ctxt") as ctxt:
+            self.assertTrue(connection.put(5, wait=True, timeout=0.5))
+            ctxt.put.assert_called_once_with("PVA:A", 5, timeout=0.5, wait=True)
+            ctxt.put.side_effect = TimeoutError()
+            self.assertFalse(connection.put(5, wait=True, timeout=0.5))
+            with self.assertRaises(TimeoutError):
+                connection.put(5)
+
+
+class FakePVInfo(object):
+    """A PVInfo without connection."""
+
+    def __init__(self, name):
+        self.data = PVData(name)
+
+    @property
+    def connected(self):
+        return self.data.connected
+
+    @connected.setter
+    def connected(self, value):
+        self.data.connected = value
+
+
+class TestPVsTable(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        self.table = PVsTable()
+        for name in ["PV:A", "PV:B"]:
+            self.table.pvs_refs[name] = FakePVInfo(name)
+
+    def test_wait_for_connections(self):
+        """Waiting returns as soon as all the PVs are connected."""
+        for name in self.table.pvs_refs:
+            threading.Timer(
+                0.05,
+                self.table.connection_callback,
+                kwargs=dict(pvname=name, conn=True),
+            ).start()
+        start_time = time.time()
+        self.assertEqual(2, self.table.wait_for_connections(timeout=5))
+        self.assertLess(time.time() - start_time, 1)
+        self.assertTrue(self.table.pvs_refs["PV:A"].connected)
+
+    def test_wait_for_connections_timeout(self):
+        """Waiting stops at the deadline when a PV does not connect."""
+        self.table.connection_callback(pvname="PV:A", conn=True)
+        self.assertEqual(1, self.table.wait_for_connections(timeout=0.05))
+        self.table.connection_callback(pvname="PV:A", conn=False)
+        self.assertEqual(0, self.table.wait_for_connections(timeout=0.05))
+
+
+class TestPVEventBus(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        self.queue = Queue()
+        self.bus = PVEventBus(self.queue, period=60)
+        self.pv_a = PVData("PV:A")
+        self.pv_b = PVData("PV:B")
+
+    def get_all(self):
+        updates = []
+        while not self.queue.empty():
+            updates.append(self.queue.get_nowait())
+        return updates
+
+    def test_first_delivery(self):
+        """PVData is sent the first time a PV is forwarded."""
+        self.bus.post(self.pv_a)
+        self.bus.flush()
+        self.assertEqual([self.pv_a], self.get_all())
+
+    def test_coalesce(self):
+        """Only the latest state of each PV is forwarded, in a single batch."""
+        self.bus.post(self.pv_a)
+        self.bus.post(self.pv_b)
+        self.bus.flush()
+        self.get_all()
+        for connected in [True, False, True]:
+            self.pv_a.connected = connected
+            self.bus.post(self.pv_a)
+        self.pv_b.connected = False
+        self.bus.post(self.pv_b)
+        self.bus.close()
+        updates = self.get_all()
+        self.assertEqual(1, len(updates))
+        self.assertIsInstance(updates[0], PVStatusBatch)
+        self.assertEqual([("PV:A", True), ("PV:B", False)], updates[0])
+        self.assertEqual(6, self.bus.received)
+        self.assertEqual(4, self.bus.delivered)
+        self.assertEqual(1, self.bus.batches)
+
+
+class TestLatencyStats(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_percentiles(self):
+        """Percentiles are within a bucket of the exact value."""
+        histogram = LatencyHistogram()
+        for idx in range(1, 101):
+            histogram.add(idx * 1e-3)
+        self.assertEqual(100, histogram.count)
+        self.assertAlmostEqual(0.1, histogram.max)
+        for percent in [50, 95, 99]:
+            exact = percent * 1e-3
+            self.assertGreaterEqual(histogram.percentile(percent), exact)
+            self.assertLessEqual(histogram.percentile(percent), exact * 1.1)
+
+    def test_per_protocol_and_pv(self):
+        """Durations are recorded per protocol and per PV."""
+        stats = LatencyStats()
+        stats.record("get", "ca", "PV:A", 0.01)
+        stats.record("get", "CA", "PV:B", 0.1)
+        stats.record("put", "PVA", "PV:C", 0.001)
+        data = stats.to_dict()
+        self.assertEqual(2, data["protocols"]["CA"]["get"]["count"])
+        self.assertEqual(1, data["pvs"]["PV:C"]["put"]["count"])
+        self.assertEqual("PV:B", stats.slowest(1)[0][1])
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test pvs.enexar module."""
+
+import threading
+import unittest
+from queue import Queue
+
+from wetest.pvs.enexar import AcquisitionFailure, ENeXArLogger, acquisition_request
+
+
+class RecordingLogger(ENeXArLogger):
+    """Records the requests instead of sending them."""
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingLogger, self).__init__(*args, **kwargs)
+        self.groups = []
+        self.release = threading.Event()
+
+    def _send(self, server, requests):
+        self.release.wait()
+        self.groups.append((server, [request.value["pv"] for request in requests]))
+
+
+class TestENeXArLogger(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_acquisition_request(self):
+        """Logger entries are converted to RPC arguments."""
+        entry = {"server": "SRV:", "pv": "PV:A", "path": "data", "acquisitions": 3}
+        request = acquisition_request("test-0", entry)
+        self.assertEqual("SRV:", request.server)
+        self.assertEqual({"pv": "PV:A", "path": "data.h5", "n_acq": "3"}, request.value)
+        self.assertIn("server", entry)
+
+    def test_batch_per_server(self):
+        """Queued requests are sent in batches grouped per server."""
+        enexar = RecordingLogger()
+        enexar.submit(
+            "test-0",
+            [
+                {"server": "SRV1:", "pv": "PV:A", "path": "a.h5"},
+                {"server": "SRV2:", "pv": "PV:B", "path": "b.h5"},
+            ],
+        )
+        enexar.submit("test-1", [{"server": "SRV1:", "pv": "PV:C", "path": "c.h5"}])
+        self.assertFalse(enexar.flush(timeout=0.01))
+        enexar.release.set()
+        self.assertTrue(enexar.flush(timeout=5))
+        sent = [pv for server, pvs in enexar.groups for pv in pvs]
+        self.assertEqual(sorted(["PV:A", "PV:B", "PV:C"]), sorted(sent))
+        self.assertLessEqual(len(enexar.groups), 3)
+
+    def test_failures(self):
+        """Failures are sent to the GUI with their test id, as they happen."""
+
+        class FailingLogger(ENeXArLogger):
+            def _send(self, server, requests):
+                for request in requests:
+                    self._fail(request, ValueError("rejected"))
+
+        enexar = FailingLogger()
+        enexar.queue_to_gui = Queue()
+        enexar.submit("test-0", [{"server": "SRV:", "pv": "PV:A", "path": "a.h5"}])
+        self.assertTrue(enexar.flush(timeout=5))
+        failure = AcquisitionFailure("test-0", "PV:A", "rejected")
+        self.assertEqual([failure], enexar.failures)
+        self.assertEqual(failure, enexar.queue_to_gui.get_nowait())
+
+    def test_invalid_entry(self):
+        """Malformed logger entries are failures, not test errors."""
+        enexar = ENeXArLogger()
+        enexar.queue_to_gui = Queue()
+        enexar.submit("test-0", [{"pv": "PV:A", "path": "a.h5"}, "PV:B"])
+        self.assertTrue(enexar.flush(timeout=5))
+        self.assertEqual(
+            [
+                AcquisitionFailure(
+                    "test-0",
+                    "PV:A",
+                    "Invalid logger entry {'pv': 'PV:A', 'path': 'a.h5'}"
+                    + " (KeyError: 'server')",
+                ),
+                AcquisitionFailure(
+                    "test-0",
+                    None,
+                    "Invalid logger entry PV:B (AttributeError: "
+                    + "'str' object has no attribute 'copy')",
+                ),
+            ],
+            enexar.failures,
+        )
+        self.assertEqual(enexar.failures[0], enexar.queue_to_gui.get_nowait())
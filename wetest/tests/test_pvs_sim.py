@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test pvs.sim module."""
+
+import time
+import unittest
+
+from wetest.pvs.sim import SimulatedIOC, SimulatedPV
+from wetest.testing.generator import TestData
+
+
+def make_test_data(setter, set_value, getter, get_value):
+    return TestData(
+        test_title="test",
+        subtest_title="subtest",
+        test_id="test-0",
+        on_failure="continue",
+        setter=setter,
+        set_value=set_value,
+        getter=getter,
+        get_value=get_value,
+    )
+
+
+class TestSimulatedIOC(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_expected_response(self):
+        """Getters take the value expected by the test of the set value."""
+        ioc = SimulatedIOC(
+            [
+                make_test_data("ON_OFF", 1, "STATE", "ON"),
+                make_test_data("ON_OFF", 0, "STATE", "OFF"),
+            ]
+        )
+        ioc.put("ON_OFF", 0)
+        self.assertEqual("OFF", ioc.pvs["STATE"].value())
+        ioc.put("ON_OFF", 1)
+        self.assertEqual("ON", ioc.pvs["STATE"].value())
+
+    def test_follow(self):
+        """Getters follow values not used in tests."""
+        ioc = SimulatedIOC([make_test_data("SP", 1, "RB", 1)])
+        ioc.put("SP", 5)
+        self.assertEqual(5, ioc.pvs["SP"].value())
+        self.assertEqual(5, ioc.pvs["RB"].value())
+
+    def test_getter_only(self):
+        """A getter without setter is served with its expected value."""
+        ioc = SimulatedIOC([make_test_data(None, None, "RB", 3)])
+        self.assertEqual(3, ioc.pvs["RB"].value())
+
+
+class TestSimulatedPV(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_settle(self):
+        """Value reaches its target after settle_time."""
+        pv = SimulatedPV("RB", 0.0, settle_time=0.05)
+        pv.move_to(10)
+        self.assertTrue(pv.changing())
+        self.assertLess(pv.value(), 10)
+        time.sleep(0.06)
+        self.assertFalse(pv.changing())
+        self.assertEqual(10, pv.value())
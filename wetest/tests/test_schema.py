@@ -2,7 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import unittest
+from unittest import mock
+
+import pykwalify
 from pykwalify.core import Core
+from pykwalify.errors import SchemaError
+
+from wetest.testing.reader import SchemaValidator
 
 
 class TestReportGenerator(unittest.TestCase):
@@ -28,3 +34,28 @@ class TestReportGenerator(unittest.TestCase):
             schema_files=["wetest/resources/suite_schema.yaml"],
         )
         c.validate()
+
+
+class TestSchemaValidator(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_in_memory(self):
+        """Deserialized scenarios are validated without a file."""
+        scenario = {
+            "version": {"major": 1, "minor": 0, "bugfix": 0},
+            "config": {"name": "scenario"},
+            "tests": [{"name": "test", "setter": "SP", "values": [1, 2]}],
+        }
+        SchemaValidator(scenario).validate()
+        scenario["tests"][0]["unknown"] = 1
+        with self.assertRaisesRegex(SchemaError, "Key 'unknown' was not defined"):
+            SchemaValidator(scenario).validate()
+
+    def test_other_pykwalify(self):
+        """Other pykwalify versions validate without the compiled rules."""
+        with mock.patch.object(pykwalify, "__version__", "0.0.0"):
+            self.test_in_memory()
+
+    def test_compiled_once(self):
+        """The schema rules are shared by all validations."""
+        self.assertIs(SchemaValidator.compiled()[1], SchemaValidator.compiled()[1])
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test testing.aio module."""
+
+import asyncio
+import time
+import unittest
+from queue import Queue
+from unittest import mock
+
+from p4p.nt import NTEnum
+
+from wetest.common.constants import ABORT_FROM_MANAGER
+from wetest.gui.specific import STATUS_RETRY, STATUS_SUCCESS
+from wetest.pvs.aio import AsyncPVConnection
+from wetest.testing import generator
+from wetest.testing.aio import AsyncRunner, check_getter_async, run_test_data_async
+from wetest.testing.generator import TestData
+from wetest.testing.runner import NativeResult
+from wetest.testing.selectable_tests import SelectableTestCase
+from wetest.testing.selectable_tests import SelectableTestResult, SelectableTestSuite
+
+
+class FakeGetter(object):
+    """An awaitable getter returning successive values."""
+
+    def __init__(self, values):
+        self.pvname = "PV:A"
+        self.values = list(values)
+
+    async def get(self, as_string=False):
+        if len(self.values) > 1:
+            return self.values.pop(0)
+        return self.values[0]
+
+    async def wait_for_update(self, timeout):
+        await asyncio.sleep(0)
+        return True
+
+
+def make_test_data(get_value, settle_timeout=None):
+    return TestData(
+        test_title="test",
+        subtest_title="subtest",
+        test_id="test-0",
+        on_failure="continue",
+        getter="PV:A",
+        get_value=get_value,
+        settle_timeout=settle_timeout,
+    )
+
+
+class TestCheckGetterAsync(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_match(self):
+        """A matching value passes."""
+        getter = FakeGetter([1])
+        asyncio.run(check_getter_async(self, make_test_data(1), getter))
+
+    def test_mismatch(self):
+        """Without settle_timeout, the first value is checked."""
+        getter = FakeGetter([0, 1])
+        with self.assertRaises(AssertionError):
+            asyncio.run(check_getter_async(self, make_test_data(1), getter))
+
+    def test_settle(self):
+        """With settle_timeout, the getter is read until it matches."""
+        getter = FakeGetter([0, 0, 1])
+        asyncio.run(check_getter_async(self, make_test_data(1, 1.0), getter))
+
+    def test_not_settled(self):
+        """The last mismatch is raised at the deadline."""
+        getter = FakeGetter([0])
+        with self.assertRaisesRegex(AssertionError, "not settled"):
+            asyncio.run(check_getter_async(self, make_test_data(1, 0.01), getter))
+
+
+class FakeIOC(object):
+    """Awaitable connections to PVs whose getters follow their setters."""
+
+    def __init__(self, latency=0.0):
+        self.values = {}
+        self.sequences = {}
+        self.puts = []
+        self.latency = latency
+
+    def get_pv_connection(self, name, protocol):
+        return FakeConnection(self, name)
+
+
+class FakeConnection(object):
+    def __init__(self, ioc, name):
+        self.ioc = ioc
+        self.pvname = name
+
+    async def connect(self):
+        return True
+
+    async def put(self, value, wait=False, timeout=None):
+        await asyncio.sleep(self.ioc.latency)
+        self.ioc.puts.append((self.pvname, value, wait))
+        self.ioc.values[self.pvname.replace("SP", "RB")] = value
+        return True
+
+    async def get(self, as_string=False):
+        sequence = self.ioc.sequences.get(self.pvname)
+        if sequence:
+            return sequence.pop(0)
+        return self.ioc.values.get(self.pvname)
+
+    async def wait_for_update(self, timeout):
+        await asyncio.sleep(0)
+        return True
+
+
+class AsyncTestCase(SelectableTestCase):
+    """Test methods run by the async runner."""
+
+    test_data = {}
+    func_backup = {}
+
+
+def make_run_test_data(test_id, setter="SP", getter="RB", **kwargs):
+    kwargs.setdefault("delay", 0)
+    return TestData(
+        test_title="test",
+        subtest_title="subtest",
+        test_id=test_id,
+        on_failure="continue",
+        setter=setter,
+        getter=getter,
+        set_value=1,
+        get_value=1 if getter else None,
+        **kwargs
+    )
+
+
+class TestRunTestDataAsync(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        SelectableTestResult.queue_to_gui = Queue()
+        SelectableTestResult.queue_to_runner = Queue()
+        SelectableTestResult.queue_to_pm = Queue()
+        self.ioc = FakeIOC()
+        patcher = mock.patch.object(
+            AsyncPVConnection, "get_pv_connection", self.ioc.get_pv_connection
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        SelectableTestResult.queue_to_gui = None
+        SelectableTestResult.queue_to_runner = None
+        SelectableTestResult.queue_to_pm = None
+
+    def run_test_data(self, test_data, result=None):
+        asyncio.run(run_test_data_async(self, test_data, result or NativeResult()))
+
+    def test_put_callback(self):
+        """Puts waiting for completion are timed, and skip the delay."""
+        test_data = make_run_test_data("test-0-0-0", put_mode="callback", delay=10)
+        self.run_test_data(test_data)
+        self.assertEqual([("SP", 1, True)], self.ioc.puts)
+        self.assertIsNotNone(test_data.put_duration)
+        self.assertIsNone(test_data.exception)
+
+    def test_retry(self):
+        """A failed test is run again, the GUI being told about the retry."""
+        test_data = make_run_test_data("test-0-0-0", getter="RB:OTHER", retry=1)
+        self.ioc.sequences["RB:OTHER"] = [0, 1]
+        self.run_test_data(test_data)
+        self.assertIsNone(test_data.exception)
+        self.assertEqual(
+            STATUS_RETRY, SelectableTestResult.queue_to_gui.get_nowait()[1]
+        )
+
+    def test_failure(self):
+        """The last failure is raised once retries are exhausted."""
+        test_data = make_run_test_data("test-0-0-0", getter="RB:OTHER")
+        with self.assertRaises(AssertionError):
+            self.run_test_data(test_data)
+        self.assertIsInstance(test_data.exception, AssertionError)
+
+    def test_enexar(self):
+        """Logger blocks are submitted to ENeXAr after a success."""
+        pvlogger = [{"pv": "RB", "server": "SRV", "path": "data"}]
+        test_data = make_run_test_data("test-0-0-0", pvlogger=pvlogger)
+        with mock.patch.object(generator.enexar_logger, "submit") as submit:
+            self.run_test_data(test_data)
+        submit.assert_called_once_with("test-0-0-0", pvlogger)
+
+    def test_abort(self):
+        """An abort from the manager stops the run after the test."""
+        SelectableTestResult.queue_to_runner.put(ABORT_FROM_MANAGER)
+        result = NativeResult()
+        self.run_test_data(make_run_test_data("test-0-0-0"), result)
+        self.assertTrue(result.shouldStop)
+
+
+class TestAsyncRunner(TestRunTestDataAsync):
+    """Module's Unit Tests."""
+
+    def make_suite(self, setters):
+        suite = SelectableTestSuite()
+        for idx, setter in enumerate(setters):
+            test_data = make_run_test_data(
+                "test-0-%d-0" % idx, setter=setter, getter=None, delay=0.1
+            )
+            test_func, test_data = generator.test_generator(test_data)
+            AsyncTestCase.add_test(test_data, test_func)
+            suite.add_selected_test(AsyncTestCase, test_data.id)
+        return suite
+
+    def run_suite(self, suite, jobs, concurrent_scenarios):
+        start_time = time.time()
+        result = AsyncRunner(jobs, concurrent_scenarios).run(suite)
+        self.assertEqual(suite.countTestCases(), result.testsRun)
+        self.assertEqual(
+            [STATUS_SUCCESS] * result.testsRun,
+            [outcome.status for outcome in result.outcomes],
+        )
+        return time.time() - start_time
+
+    def test_concurrent(self):
+        """Tests of concurrent scenarios run together on the event loop."""
+        suite = self.make_suite(["SP%d" % idx for idx in range(8)])
+        self.assertLess(self.run_suite(suite, 8, [0]), 0.4)
+
+    def test_shared_setter(self):
+        """Tests sharing a setter run one after the other."""
+        suite = self.make_suite(["SP", "SP", "SP"])
+        self.assertGreaterEqual(self.run_suite(suite, 3, [0]), 0.3)
+
+    def test_serial(self):
+        """Tests of other scenarios run in order."""
+        suite = self.make_suite(["SP%d" % idx for idx in range(3)])
+        self.assertGreaterEqual(self.run_suite(suite, 3, []), 0.3)
+
+
+class TestAsyncPvaConnection(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_as_string(self):
+        """PVA values can be read as strings, enums giving their choice."""
+        enum = NTEnum()
+        value = enum.unwrap(enum.wrap({"index": 1, "choices": ["OFF", "ON"]}))
+
+        async def get(name):
+            return value
+
+        connection = AsyncPVConnection.AsyncPvaConnection("PV:ENUM")
+        with mock.patch.object(connection, "ctxt") as ctxt:
+            ctxt.get = get
+            self.assertEqual(1, asyncio.run(connection.get()))
+            self.assertEqual("ON", asyncio.run(connection.get(as_string=True)))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test testing.bundle module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from wetest.command_line import load_bundle, read_tests
+from wetest.testing import bundle
+from wetest.testing.bundle import BundleError, is_bundle, read_bundle, write_bundle
+from wetest.testing.reader import MAJOR, MINOR, BUGFIX
+from wetest.testing.reader import MacrosManager
+
+VERSION = "version: {major: %d, minor: %d, bugfix: %d}\n" % (MAJOR, MINOR, BUGFIX)
+
+SCENARIO = (
+    VERSION
+    + """
+config:
+    name: scenario
+    type: functional
+    prefix: "${DEVICE}:"
+tests:
+    - name: values
+      setter: SP
+      getter: RB
+      values: [1, 2]
+    - name: range
+      setter: SP
+      getter: RB
+      pipeline: true
+      range: {start: 0, stop: 2}
+"""
+)
+
+
+class TestBundle(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.scenario = os.path.join(self.directory, "scenario.yaml")
+        self.bundle = os.path.join(self.directory, "suite.bundle")
+        self.write(SCENARIO)
+        self.compile()
+
+    def write(self, content):
+        with open(self.scenario, "w") as yaml_file:
+            yaml_file.write(content)
+
+    def compile(self):
+        generation = {
+            "scenarios": [self.scenario],
+            "macros": {"DEVICE": "DEV"},
+            "propagate": False,
+        }
+        title, generators, dependencies = read_tests(
+            scenarios=[self.scenario],
+            macros_mgr=MacrosManager(known_macros=generation["macros"]),
+        )
+        write_bundle(self.bundle, title, generators, dependencies, generation)
+
+    def test_load(self):
+        """Bundles give back the tests, configs and PVs of the scenario."""
+        self.assertTrue(is_bundle(self.bundle))
+        self.assertFalse(is_bundle(self.scenario))
+        self.assertEqual(["DEV:RB", "DEV:SP"], read_bundle(self.bundle)["pvs"])
+
+        suite, configs, generation = load_bundle(self.bundle)
+        self.assertEqual("DEV:", configs[1]["prefix"])
+        self.assertEqual({"DEVICE": "DEV"}, generation["macros"])
+        tests_infos = suite.tests_infos
+        self.assertEqual(5, len(tests_infos))
+        self.assertEqual(2, tests_infos["test-0-0-1"].plan.set_value)
+        self.assertEqual("range: 2", tests_infos["test-0-1-2"].desc)
+
+        # pipelined subtests still share their sweep, finally statement excluded
+        sweep = tests_infos["test-0-1-0"].sweep
+        self.assertEqual(3, sweep.length)
+        for row in range(3):
+            subtest = tests_infos["test-0-1-%d" % row]
+            self.assertIs(sweep, subtest.sweep)
+            self.assertEqual(row, sweep.position(subtest))
+            self.assertEqual(subtest.id, sweep.subtests[row].id)
+
+    def test_outdated(self):
+        """Scenario files changed since compiling the bundle are read again."""
+        self.write(SCENARIO.replace("[1, 2]", "[1, 2, 3]"))
+        suite, _, _ = load_bundle(self.bundle)
+        self.assertEqual(6, suite.countTestCases())
+
+    def test_version(self):
+        """Bundles of another WeTest version are not loaded."""
+        version = bundle.VERSION
+        self.addCleanup(setattr, bundle, "VERSION", version)
+        bundle.VERSION = "0.0.0"
+        self.assertRaises(BundleError, read_bundle, self.bundle)
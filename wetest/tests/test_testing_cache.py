@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test testing.cache module."""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from wetest.testing.cache import ScenarioCache
+from wetest.testing.reader import MAJOR, MINOR, BUGFIX
+from wetest.testing.reader import MacrosManager, ScenarioReader
+
+
+class Unpicklable(object):
+    def __reduce__(self):
+        raise pickle.PicklingError("not picklable")
+
+
+VERSION = "version: {major: %d, minor: %d, bugfix: %d}\n" % (MAJOR, MINOR, BUGFIX)
+
+SUITE = (
+    VERSION
+    + """
+name: suite
+include:
+    - [scenario.yaml, DEVICE: "${DEVICE}"]
+"""
+)
+
+SCENARIO = (
+    VERSION
+    + """
+config:
+    name: scenario
+    prefix: "${DEVICE}:"
+tests:
+    - name: sp
+      setter: SP
+      getter: RB
+      values: [%s]
+"""
+)
+
+
+class TestScenarioCache(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = ScenarioCache(os.path.join(self.directory, "cache"))
+        self.write("suite.yaml", SUITE)
+        self.write("scenario.yaml", SCENARIO % "1, 2")
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory, name), "w") as yaml_file:
+            yaml_file.write(content)
+
+    def read(self, device="DEV"):
+        macros_mgr = MacrosManager(known_macros={"DEVICE": device})
+        reader = ScenarioReader(
+            os.path.join(self.directory, "suite.yaml"),
+            macros_mgr=macros_mgr,
+            cache=self.cache,
+        )
+        return reader, macros_mgr
+
+    def test_warm(self):
+        """Files read again are restored from the cache, with used macros."""
+        cold, _ = self.read()
+        warm, macros_mgr = self.read()
+        self.assertFalse(cold.from_cache)
+        self.assertTrue(warm.from_cache)
+        self.assertEqual(cold.get_deserialized(), warm.get_deserialized())
+        self.assertEqual(
+            "DEV:", warm.get_deserialized()["scenarios"][0]["config"]["prefix"]
+        )
+        self.assertIn("DEVICE", macros_mgr.used_macros)
+
+    def test_macros(self):
+        """Files read with other macros are read again."""
+        self.read()
+        reader, _ = self.read("OTHER")
+        self.assertEqual(
+            "OTHER:", reader.get_deserialized()["scenarios"][0]["config"]["prefix"]
+        )
+
+    def test_include_changed(self):
+        """Files are read again when an included file changed."""
+        self.read()
+        self.write("scenario.yaml", SCENARIO % "1, 2, 3")
+        reader, _ = self.read()
+        self.assertFalse(reader.from_cache)
+        self.assertEqual(
+            [1, 2, 3], reader.get_deserialized()["scenarios"][0]["tests"][0]["values"]
+        )
+
+    def test_include_warnings(self):
+        """Files including files with warnings are not cached."""
+        self.write("suite.yaml", SUITE.replace('"${DEVICE}"', '"${DEVICE}", EXTRA: 1'))
+        cold, _ = self.read()
+        self.assertFalse(cold.fully_valid)
+        warm, _ = self.read()
+        self.assertFalse(warm.from_cache)
+
+    def test_store_error(self):
+        """Entries that can not be written leave no file behind."""
+        self.cache.store("key", {"dependencies": {}, "value": Unpicklable()})
+        self.assertIsNone(self.cache.load("key"))
+        self.assertEqual([], os.listdir(self.cache.directory))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test the include loading of testing.reader module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from wetest.testing.reader import MAJOR, MINOR, BUGFIX
+from wetest.testing.reader import FileNotFound, IncludeLoader, ScenarioReader
+
+VERSION = "version: {major: %d, minor: %d, bugfix: %d}\n" % (MAJOR, MINOR, BUGFIX)
+
+TEMPLATE = (
+    VERSION
+    + """
+config:
+    name: "power supply ${PS}"
+    prefix: "PS${PS}:"
+tests:
+    - name: current
+      setter: I
+      getter: IMes
+      values: [1, 2]
+"""
+)
+
+
+class TestIncludeLoader(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.write("template.yaml", TEMPLATE)
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory, name), "w") as yaml_file:
+            yaml_file.write(content)
+
+    def test_template(self):
+        """A file included with other macros is parsed once, included in order."""
+        self.write(
+            "suite.yaml",
+            VERSION
+            + "name: suite\ninclude:\n"
+            + "".join("    - [template.yaml, PS: %d]\n" % idx for idx in range(20)),
+        )
+        loader = IncludeLoader()
+        reader = ScenarioReader(
+            os.path.join(self.directory, "suite.yaml"), loader=loader
+        )
+
+        self.assertEqual(
+            ["PS%d:" % idx for idx in range(20)],
+            [
+                scenario["config"]["prefix"]
+                for scenario in reader.get_deserialized()["scenarios"]
+            ],
+        )
+        self.assertEqual(2, len(loader._parsed))
+        # macros substitution leaves the parsed template as is
+        template = loader.parse(os.path.join(self.directory, "template.yaml"))
+        self.assertEqual("PS${PS}:", template.tree["config"]["prefix"])
+
+    def test_order(self):
+        """Includes are checked in order, though read in parallel."""
+        self.write("first.yaml", VERSION + "include:\n    - first_missing.yaml\n")
+        self.write(
+            "suite.yaml",
+            VERSION
+            + "name: suite\ninclude:\n"
+            + "    - first.yaml\n"
+            + "    - [template.yaml, PS: 1]\n"
+            + "    - second_missing.yaml\n",
+        )
+        with self.assertRaisesRegex(FileNotFound, "first_missing"):
+            ScenarioReader(os.path.join(self.directory, "suite.yaml"))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test the macros substitution of testing.reader module."""
+
+import unittest
+
+from wetest.testing import reader
+from wetest.testing.reader import MacrosManager, MacroTemplate
+
+
+class TestMacroTemplate(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_compile(self):
+        """Strings are compiled once into literals and macro references."""
+        template = MacroTemplate.compile("${A}:$( B )_${}")
+        self.assertIs(template, MacroTemplate.compile("${A}:$( B )_${}"))
+        self.assertEqual(["", ":", "_", ""], template.literals)
+        self.assertEqual(
+            [("A", "${A}"), ("B", "$( B )"), (None, "${}")], template.references
+        )
+        self.assertEqual(("A", "B"), template.names)
+
+    def test_compile_bounded(self):
+        """Least recently used strings are compiled again."""
+        first = MacroTemplate.compile("${FIRST}")
+        for idx in range(reader.MACRO_TEMPLATES_CACHE_SIZE):
+            MacroTemplate.compile("${A%d}" % idx)
+        self.assertIsNot(first, MacroTemplate.compile("${FIRST}"))
+
+
+class TestMacrosManager(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        self.macros_mgr = MacrosManager(
+            known_macros={
+                "INT": 1,
+                "FLOAT": "1e-3",
+                "BOOL": "true",
+                "LIST": "[1, 2]",
+                "COLON": "PS1:",
+                "NAME": "power supply",
+                "P_1": "first",
+                "ALIAS": "${NAME}",
+            }
+        )
+
+    def test_typing(self):
+        """Substituted values are typed, other values are left as is."""
+        for a_value, expected in [
+            ("${INT}", 1),
+            ("${FLOAT}", 1e-3),
+            ("${BOOL}", True),
+            ("${LIST}", [1, 2]),
+            ("${COLON}", "PS1:"),
+            ("${NAME} ${INT}", "power supply 1"),
+            ("${COLON}SP", "PS1:SP"),
+            ("1e-3", "1e-3"),
+            (3, 3),
+        ]:
+            self.assertEqual(expected, self.macros_mgr.substitue_macros(a_value))
+            self.assertEqual(
+                type(expected), type(self.macros_mgr.substitue_macros(a_value))
+            )
+
+    def test_memoized(self):
+        """Memoized values follow the macros and are not shared."""
+        self.macros_mgr.substitue_macros("${LIST}").append(3)
+        self.assertEqual([1, 2], self.macros_mgr.substitue_macros("${LIST}"))
+        self.assertEqual("power supply", self.macros_mgr.substitue_macros("${ALIAS}"))
+        self.macros_mgr.known_macros["NAME"] = "magnet"
+        self.assertEqual("magnet", self.macros_mgr.substitue_macros("${ALIAS}"))
+
+    def test_imbricated(self):
+        """Imbricated macros and macros values are substituted."""
+        self.assertEqual("first", self.macros_mgr.substitue_macros("${P_${INT}}"))
+        self.assertEqual({"INT", "P_1"}, self.macros_mgr.used_macros & {"INT", "P_1"})
+
+    def test_unknown(self):
+        """Unknown macros are left as is and counted, if traced."""
+        self.assertEqual("${X}_1", self.macros_mgr.substitue_macros("${X}_${INT}"))
+        self.assertEqual(
+            "${X}", self.macros_mgr.substitue_macros("${X}", trace_unknown=False)
+        )
+        # counted again when substituting the imbricated macros
+        self.assertEqual({"X": 2}, self.macros_mgr.unknown_macros)
+
+    def test_cycle(self):
+        """Macros depending on themselves are reported."""
+        macros_mgr = MacrosManager()
+        macros_mgr.add_new_macros([{"B": "1${A}"}, {"A": "${B}"}])
+        macros_mgr.substitue_macros("${A}")
+        self.assertEqual(1, len(macros_mgr.read_errors))
+        self.assertIn("Recusivity issue", macros_mgr.read_errors[0])
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test the test plans of testing.generator module."""
+
+import unittest
+
+import numpy
+
+from wetest.testing.generator import InconsistantTest, TestData
+
+
+def make_test_data(get_value, set_value=None, getter="RB", **kwargs):
+    return TestData(
+        test_title="test",
+        subtest_title="subtest",
+        test_id="test-0",
+        on_failure="continue",
+        setter=None if set_value is None else "SP",
+        set_value=set_value,
+        getter=getter,
+        get_value=get_value,
+        **kwargs
+    )
+
+
+class TestTestPlan(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_inconsistent(self):
+        """Inconsistent tests keep their error to raise when running."""
+        plan = make_test_data(None).plan
+        self.assertIsInstance(plan.error, InconsistantTest)
+
+    def test_set_value(self):
+        """Waveforms are converted once for pyepics."""
+        plan = make_test_data(None, ["a", "12", "1.5", 3], getter=None).compile()
+        self.assertIsNone(plan.error)
+        self.assertEqual([97, 12, 1.5, 3], plan.set_value)
+
+    def test_string(self):
+        """Strings are read as strings and compared exactly."""
+        plan = make_test_data("ON").plan
+        self.assertTrue(plan.as_string)
+        plan.check(self, "ON")
+        with self.assertRaisesRegex(AssertionError, "Expected RB to be `ON`"):
+            plan.check(self, "OFF")
+
+    def test_tolerance(self):
+        """Numbers are compared within the largest of margin and delta."""
+        plan = make_test_data(10, margin=0.1, delta=0.5).plan
+        plan.check(self, 10.9)
+        with self.assertRaisesRegex(AssertionError, r"within \[9,11\]"):
+            plan.check(self, 11.1)
+
+    def test_array(self):
+        """Waveforms are padded with zeros and compared element-wise."""
+        plan = make_test_data([1, 2]).plan
+        plan.check(self, numpy.array([1, 2, 0]))
+        with self.assertRaisesRegex(AssertionError, "1 of 3 elements differ"):
+            plan.check(self, numpy.array([1, 3, 0]))
+
+    def test_large_array(self):
+        """Differences of large waveforms are summarized in a bounded message."""
+        plan = make_test_data([0] * 10, delta=0.5).plan
+        measured = numpy.zeros(1000000)
+        measured[[3, 500000, 700000]] = [1, 5, 2]
+        with self.assertRaises(AssertionError) as context:
+            plan.check(self, measured)
+        message = str(context.exception)
+        self.assertLess(len(message), 1000)
+        self.assertIn("3 of 1000000 elements differ, max abs error 5", message)
+        self.assertIn("worst differences: [500000] 5.0 instead of 0", message)
+
+    def test_unsigned_array(self):
+        """Integer waveforms are compared without wrapping around."""
+        plan = make_test_data([5, 5], delta=1).plan
+        plan.check(self, numpy.array([4, 6], dtype=numpy.uint8))
+        with self.assertRaises(AssertionError):
+            plan.check(self, numpy.array([3, 5], dtype=numpy.uint8))
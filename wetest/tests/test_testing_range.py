@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test the range tests of testing.generator module."""
+
+import unittest
+
+from wetest.testing.generator import LazySubtests, SubtestTable, TestsGenerator
+from wetest.testing.generator import range_values
+from wetest.testing.runner import NativeResult, NativeRunner
+from wetest.testing.selectable_tests import SelectableTestSuite
+
+
+def make_table(values):
+    return SubtestTable(
+        values,
+        test_title="sweep",
+        on_failure="continue",
+        setter="SP",
+        getter="RB",
+        prefix="P:",
+    )
+
+
+def make_generator():
+    """A generator of a range of 100001 values, with a finally statement."""
+    return TestsGenerator(
+        {
+            "config": {
+                "type": "functional",
+                "prefix": "",
+                "use_prefix": True,
+                "delay": 0,
+                "ignore": False,
+                "skip": False,
+                "on_failure": "continue",
+                "retry": 0,
+                "protocol": "PVA",
+                "monitor": False,
+                "settle_timeout": None,
+                "put_mode": "delay",
+            },
+            "tests": [
+                {
+                    "name": "sweep",
+                    "setter": "SP",
+                    "getter": "RB",
+                    "range": {"start": 0, "stop": 100000},
+                    "finally": {"value": 0},
+                }
+            ],
+        }
+    )
+
+
+class TestRangeValues(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_step(self):
+        """Integer ranges keep integer values, stop included."""
+        self.assertEqual([0, 1, 2, 3], range_values(0, 3, 1, 0, 0).tolist())
+
+    def test_merge(self):
+        """Step and lin values only differing by rounding are tested once."""
+        values = range_values(0, 1, 0.1, 11, 0)
+        self.assertEqual(11, len(values))
+        self.assertEqual([0, 1], [values[0], values[-1]])
+
+    def test_bounds(self):
+        """Start and stop can be excluded."""
+        values = range_values(0, 10, 0, 3, 0, include_start=False, include_stop=False)
+        self.assertEqual([10 / 3.0, 20 / 3.0], values.tolist())
+
+    def test_reverse(self):
+        """Values can be tested in decreasing order."""
+        self.assertEqual(
+            [2, 1, 0], range_values(0, 2, 1, 0, 0, sort="reverse").tolist()
+        )
+
+
+class TestLazySubtests(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_lazy(self):
+        """Range subtests are made on each access, finally statement appended."""
+        subtests = LazySubtests(make_table(range_values(0, 999999, 1, 0, 0)))
+        subtests.append("finally")
+        self.assertEqual(1000001, len(subtests))
+        self.assertEqual("finally", subtests[-1])
+        self.assertEqual(["finally"], subtests.appended)
+        subtests[10].elapsed = 0.5
+        self.assertIsNot(subtests[10], subtests[10])
+        self.assertEqual(0.5, subtests[10].elapsed)
+
+    def test_view(self):
+        """Views expose the TestData attributes of their row."""
+        view = LazySubtests(make_table(range_values(0, 9, 1, 0, 0)))[5]
+        self.assertEqual("P:SP", view.setter)
+        self.assertEqual(5, view.set_value)
+        self.assertEqual("sweep: 5", view.desc)
+        self.assertIsNone(view.elapsed)
+        view.id = "test-0-1-5"
+        view.elapsed = 0.5
+        self.assertEqual("test-0-1-5", view.id)
+        self.assertEqual(0.5, view.table.elapsed[5])
+        self.assertIsNone(view.plan.error)
+        self.assertIs(view.plan, view.plan)
+        with self.assertRaises(AttributeError):
+            view.delay = 1
+
+    def test_generator(self):
+        """Range tests are generated with one view per value."""
+        generator = make_generator()
+        subtests = generator.tests_list[0]
+        self.assertEqual(100002, len(subtests))
+        self.assertEqual("5", subtests[5].subtest_title)
+        self.assertEqual("Final statement", subtests[-1].subtest_title)
+
+    def test_suite(self):
+        """Range subtests are added to a suite without making them."""
+        suite = SelectableTestSuite()
+        make_generator().append_to_suite(suite)
+        self.assertEqual(100002, suite.countTestCases())
+        # the rows and the finally statement, made when the suite reaches them
+        self.assertEqual(1, len(suite._tests))
+        self.assertEqual(
+            "Final statement", suite.tests_infos["test-0-0-100001"].subtest_title
+        )
+        self.assertEqual("sweep: 5", suite.tests_infos["test-0-0-5"].desc)
+        self.assertEqual("test-0-0-100001", list(suite.tests_infos)[-1])
+
+        suite.skip("test-0-0-2", "skipped")
+        self.assertFalse(suite.is_selected("test-0-0-2"))
+        self.assertTrue(suite.is_selected("test-0-0-3"))
+        subset = suite.subset(["test-0-0-1", "test-0-0-2", "test-0-0-4"])
+        self.assertEqual(2, len(subset._tests))
+        self.assertEqual(
+            ["test-0-0-1", "test-0-0-2", "test-0-0-4"], list(subset.tests_infos)
+        )
+
+        result = NativeRunner().run(suite.subset(["test-0-0-2"]), NativeResult())
+        self.assertEqual(
+            [("test-0-0-2", "skipped")],
+            [(outcome.test_id, outcome.summary) for outcome in result.outcomes],
+        )
+        suite.select("test-0-0-2")
+        self.assertTrue(suite.is_selected("test-0-0-2"))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test run_test_data from testing.generator module."""
+
+import threading
+import unittest
+from queue import Queue
+from unittest import mock
+
+from wetest.pvs.core import PVConnection, PVValueCache
+from wetest.testing import generator
+from wetest.testing.generator import TestData, run_test_data
+from wetest.testing.selectable_tests import SelectableTestResult
+
+
+class FakeConnection(object):
+    """A monitored getter, updated by hand."""
+
+    def __init__(self, name, protocol, monitor=False):
+        self.pvname = name
+        self.callback = None
+
+    def subscribe(self, callback):
+        self.callback = callback
+
+    def close(self):
+        pass
+
+
+class FakeSetter(object):
+    """A setter whose getter monitor sends the new value after a while.
+
+    If halfway, the getter first sends half the new value, then the new value
+    after as long again.
+    """
+
+    def __init__(self, getter, latency, halfway=False):
+        self.pvname = "SP"
+        self.status = 1
+        self.getter = getter
+        self.latency = latency
+        self.halfway = halfway
+
+    def put(self, value, wait=False, timeout=None):
+        latency = self.latency
+        if self.halfway:
+            timer = threading.Timer(latency, self.getter.callback, (value / 2.0, None))
+            timer.start()
+            latency *= 2
+        timer = threading.Timer(latency, self.getter.callback, (value, None))
+        timer.start()
+        return True
+
+
+class TestMonitoredGetter(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        SelectableTestResult.queue_to_runner = Queue()
+        SelectableTestResult.queue_to_gui = Queue()
+
+        cache = PVValueCache(FakeConnection)
+        cache.subscribe("RB", "PVA")
+        self.getter = cache._connections[("RB", "PVA")]
+        self.getter.callback(0, None)  # value from before the put
+        self.setter = FakeSetter(self.getter, latency=0.05)
+
+        patches = [
+            mock.patch.object(PVConnection, "cache", cache),
+            mock.patch.object(
+                PVConnection, "get_pv_connection", return_value=self.setter
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_late_update(self):
+        """The value cached before the put is not checked."""
+        test_data = TestData(
+            on_failure="continue",
+            test_title="test",
+            subtest_title="subtest",
+            test_id="test-0",
+            setter="SP",
+            getter="RB",
+            set_value=1,
+            get_value=1,
+            monitor=True,
+        )
+        run_test_data(self, test_data, result=None)
+        self.assertIsNone(test_data.exception)
+
+    def settling_test(self, get_value, settle_timeout, delay=1):
+        """A test putting 1, its getter settling on it after 0.2s."""
+        self.setter.latency = 0.1
+        self.setter.halfway = True
+        return TestData(
+            on_failure="continue",
+            test_title="test",
+            subtest_title="subtest",
+            test_id="test-0",
+            setter="SP",
+            getter="RB",
+            set_value=1,
+            get_value=get_value,
+            delay=delay,
+            settle_timeout=settle_timeout,
+            monitor=True,
+        )
+
+    def test_settle_match(self):
+        """The getter is checked again until it matches."""
+        test_data = self.settling_test(get_value=1, settle_timeout=2)
+        run_test_data(self, test_data, result=None)
+        self.assertIsNone(test_data.exception)
+        # matched once settled, not at the halfway value nor at the timeout
+        self.assertGreater(test_data.elapsed, 0.15)
+        self.assertLess(test_data.elapsed, 2)
+
+    def test_settle_timeout(self):
+        """The last value is reported if the getter does not match in time."""
+        test_data = self.settling_test(get_value=2, settle_timeout=0.5)
+        with self.assertRaises(AssertionError) as context:
+            run_test_data(self, test_data, result=None)
+        self.assertIn("Expected RB to be 2, but got 1\n", str(context.exception))
+        self.assertIn("(not settled after 0.5s)", str(context.exception))
+
+    def test_settle_no_delay(self):
+        """The delay is not waited before checking the getter."""
+        test_data = self.settling_test(get_value=1, settle_timeout=2, delay=10)
+        with mock.patch.object(generator.time, "sleep") as sleep:
+            run_test_data(self, test_data, result=None)
+        sleep.assert_not_called()
+        self.assertIsNone(test_data.exception)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test testing.runner module."""
+
+import threading
+import time
+import unittest
+from unittest import mock
+from queue import Queue
+
+from wetest.common.constants import PAUSE_FROM_TEST, PLAY_FROM_MANAGER
+
+from wetest.gui.specific import STATUS_RUN, STATUS_SKIP
+from wetest.gui.specific import STATUS_SUCCESS, STATUS_FAIL, STATUS_ERROR
+from wetest.testing import generator
+from wetest.testing.generator import TestData
+from wetest.testing.runner import NativeResult, NativeRunner, Outcome
+from wetest.testing.selectable_tests import ConcurrentTestSuite, LockedTestResult
+from wetest.testing.selectable_tests import run_control
+from wetest.testing.selectable_tests import SelectableTestCase
+from wetest.testing.selectable_tests import SelectableTestResult, SelectableTestSuite
+
+
+class RunnerTestCase(SelectableTestCase):
+    """Test methods run by the native runner."""
+
+    test_data = {}
+    func_backup = {}
+
+
+def make_suite(tests):
+    """Returns a SelectableTestSuite from (test id, outcome) tuples."""
+    suite = SelectableTestSuite()
+    for test_id, outcome in tests:
+        test_data = TestData(
+            test_title="test",
+            subtest_title=outcome,
+            test_id=test_id,
+            on_failure="continue",
+            getter="RB",
+            get_value=1,
+        )
+        test_func, test_data = generator.test_generator(test_data)
+        RunnerTestCase.add_test(test_data, test_func)
+        suite.add_selected_test(RunnerTestCase, test_id)
+    return suite
+
+
+def run_test_data(test_case, test_data, result):
+    """Runs tests without PV access, with the outcome in their subtest title."""
+    test_data.elapsed = 0.0
+    test_data.exception = None
+    try:
+        if test_data.subtest_title == "fail":
+            test_case.fail("Expected RB to be 1, but got 2")
+        elif test_data.subtest_title == "error":
+            raise generator.InconsistantTest("[getter error] No getter.")
+        elif test_data.subtest_title == "slow":
+            time.sleep(0.1)
+    finally:
+        # as generator.run_test_data
+        run_control().checkpoint(result)
+
+
+class TestNativeRunner(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        SelectableTestResult.queue_to_gui = Queue()
+        SelectableTestResult.queue_to_runner = Queue()
+        SelectableTestResult.queue_to_pm = Queue()
+        patcher = mock.patch("wetest.testing.runner.run_test_data", run_test_data)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        SelectableTestResult.queue_to_gui = None
+        SelectableTestResult.queue_to_runner = None
+        SelectableTestResult.queue_to_pm = None
+
+    def test_outcomes(self):
+        """Outcomes are recorded and sent to the GUI."""
+        suite = make_suite(
+            [
+                ("test-0-0-0", "success"),
+                ("test-0-0-1", "fail"),
+                ("test-0-0-2", "error"),
+                ("test-0-0-3", "success"),
+            ]
+        )
+        RunnerTestCase.skip("test-0-0-3", "skipped")
+        result = NativeRunner().run(suite)
+
+        self.assertEqual(4, result.testsRun)
+        statuses = [STATUS_SUCCESS, STATUS_FAIL, STATUS_ERROR, STATUS_SKIP]
+        self.assertEqual(statuses, [outcome.status for outcome in result.outcomes])
+        self.assertEqual("Expected RB to be 1, but got 2", result.failures[0][1])
+        self.assertEqual(
+            "InconsistantTest: [getter error] No getter.", result.errors[0][1]
+        )
+        self.assertEqual("skipped", result.skipped[0][1])
+        self.assertFalse(result.wasSuccessful())
+
+        messages = []
+        while not SelectableTestResult.queue_to_gui.empty():
+            messages.append(SelectableTestResult.queue_to_gui.get()[:2])
+        self.assertEqual(
+            [
+                ["test-0-0-%d" % idx, sent]
+                for idx, status in enumerate(statuses)
+                for sent in [STATUS_RUN, status]
+            ],
+            messages,
+        )
+
+    def test_abort(self):
+        """Tests after a failure aborting the run are not run."""
+        suite = make_suite([("test-0-1-0", "fail"), ("test-0-1-1", "success")])
+        RunnerTestCase.test_data["test-0-1-0"].on_failure = "abort"
+        result = NativeRunner().run(suite)
+        self.assertEqual(1, result.testsRun)
+        self.assertTrue(result.shouldStop)
+
+    def test_concurrent(self):
+        """Concurrent suites run their tests through the native runner."""
+        suite = make_suite([("test-1-0-%d" % idx, "success") for idx in range(4)])
+        runner = NativeRunner()
+        result = runner.run(
+            ConcurrentTestSuite(suite, 4, [1], run_test=runner.run_test)
+        )
+        self.assertEqual(4, result.testsRun)
+        self.assertTrue(result.wasSuccessful())
+
+    def wait_for_pause(self):
+        self.assertEqual(
+            PAUSE_FROM_TEST, SelectableTestResult.queue_to_pm.get(timeout=2)
+        )
+
+    def test_pause_concurrent(self):
+        """A play resumes all the workers paused, whichever reads it."""
+        suite = make_suite([("test-1-0-0", "fail"), ("test-1-1-0", "slow")])
+        RunnerTestCase.test_data["test-1-0-0"].on_failure = "pause"
+        runner = NativeRunner()
+        result = NativeResult()
+        thread = threading.Thread(
+            target=runner.run,
+            args=(ConcurrentTestSuite(suite, 2, [1], run_test=runner.run_test), result),
+        )
+        thread.start()
+        self.wait_for_pause()
+        # the slow test reaches the end of its run while paused
+        time.sleep(0.2)
+        self.assertEqual(1, result.testsRun)
+        SelectableTestResult.queue_to_runner.put(PLAY_FROM_MANAGER)
+        thread.join(2)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(2, result.testsRun)
+        self.assertFalse(result.shouldStop)
+
+    def test_pause_unlocked(self):
+        """Other workers report their outcomes while a failure pauses the run."""
+        suite = make_suite([("test-1-2-0", "fail"), ("test-1-2-1", "success")])
+        failed, other = list(suite)
+        RunnerTestCase.test_data["test-1-2-0"].on_failure = "pause"
+        result = LockedTestResult(NativeResult())
+        thread = threading.Thread(
+            target=result.add_outcome, args=(failed, STATUS_FAIL, "failed")
+        )
+        thread.start()
+        self.wait_for_pause()
+        result.record(other, Outcome("test-1-2-1", STATUS_SUCCESS, 0.0, None))
+        self.assertEqual(2, result.testsRun)
+        SelectableTestResult.queue_to_runner.put(PLAY_FROM_MANAGER)
+        thread.join(2)
+        self.assertFalse(thread.is_alive())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test testing.selectable_tests module."""
+
+import threading
+import time
+import unittest
+
+from wetest.testing.generator import TestData
+from wetest.testing.selectable_tests import ConcurrentTestSuite
+from wetest.testing.selectable_tests import SelectableTestCase, SelectableTestSuite
+
+
+class SleepingTestCase(SelectableTestCase):
+    """Test methods sleeping while holding their setter."""
+
+    test_data = {}
+    func_backup = {}
+    running = {}
+    max_running = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def make_test(cls, setter):
+        def test(self):
+            with cls.lock:
+                cls.running[setter] = cls.running.get(setter, 0) + 1
+                cls.max_running[setter] = max(
+                    cls.max_running.get(setter, 0), cls.running[setter]
+                )
+            time.sleep(0.05)
+            with cls.lock:
+                cls.running[setter] -= 1
+
+        return test
+
+
+def make_suite(tests):
+    """Returns a SelectableTestSuite from (test id, setter, getter) tuples."""
+    suite = SelectableTestSuite()
+    for test_id, setter, getter in tests:
+        test_data = TestData(
+            test_title="test",
+            subtest_title="subtest",
+            test_id=test_id,
+            on_failure="continue",
+            setter=setter,
+            set_value=0,
+            getter=getter,
+            get_value=0,
+        )
+        SleepingTestCase.add_test(test_data, SleepingTestCase.make_test(setter))
+        suite.add_selected_test(SleepingTestCase, test_id)
+    return suite
+
+
+class TestConcurrentTestSuite(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        SleepingTestCase.running.clear()
+        SleepingTestCase.max_running.clear()
+
+    def run_suite(self, suite, *args, **kwargs):
+        result = unittest.TestResult()
+        start_time = time.time()
+        ConcurrentTestSuite(suite, *args, **kwargs)(result)
+        self.assertEqual(suite.countTestCases(), result.testsRun)
+        return time.time() - start_time
+
+    def test_concurrent_scenario(self):
+        """Tests run concurrently, except when sharing a setter."""
+        suite = make_suite(
+            [("test-0-%d-0" % idx, "SP%d" % (idx % 3), None) for idx in range(6)]
+        )
+        self.assertLess(self.run_suite(suite, 6, [0]), 0.25)
+        self.assertEqual({"SP0": 1, "SP1": 1, "SP2": 1}, SleepingTestCase.max_running)
+
+    def test_serial_scenario(self):
+        """Tests of other scenarios run one after the other."""
+        suite = make_suite(
+            [("test-1-%d-0" % idx, "SP%d" % idx, None) for idx in range(3)]
+        )
+        self.assertGreaterEqual(self.run_suite(suite, 3, [0]), 0.15)
+
+    def test_disjoint_scenarios(self):
+        """Scenarios without common PVs run concurrently."""
+        suite = make_suite(
+            [
+                ("test-%d-%d-0" % (sc_idx, idx), "SP%d:%d" % (sc_idx, idx), None)
+                for sc_idx in range(4)
+                for idx in range(2)
+            ]
+        )
+        self.assertLess(self.run_suite(suite, 1, [], scenario_jobs=4), 0.2)
+
+    def test_overlapping_scenarios(self):
+        """Scenarios sharing a PV, even as getter, run one after the other."""
+        suite = make_suite(
+            [
+                ("test-0-0-0", "SP:A", "RB:A"),
+                ("test-1-0-0", "SP:B", "RB:A"),
+                ("test-2-0-0", "SP:C", None),
+            ]
+        )
+        self.assertGreaterEqual(self.run_suite(suite, 1, [], scenario_jobs=4), 0.1)
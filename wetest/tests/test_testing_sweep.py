@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test the pipelined sweeps of testing.generator module."""
+
+import unittest
+
+from wetest.testing.generator import Sweep, TestData
+from wetest.testing.selectable_tests import SelectableTestCase
+
+
+class SweepTestCase(SelectableTestCase):
+    """Test methods of the sweeps."""
+
+    test_data = {}
+    func_backup = {}
+
+
+def make_sweep(pvs):
+    """Returns a Sweep with one subtest per (setter, getter) tuple."""
+    subtests = []
+    for idx, (setter, getter) in enumerate(pvs):
+        test_data = TestData(
+            test_title="test",
+            subtest_title="subtest",
+            test_id="test-0-0-%d" % idx,
+            on_failure="continue",
+            setter=setter,
+            set_value=None if setter is None else idx,
+            getter=getter,
+            get_value=None if getter is None else idx,
+        )
+        SweepTestCase.add_test(test_data, lambda self: None)
+        subtests.append(test_data)
+    return Sweep(subtests)
+
+
+def batch_ids(sweep, start):
+    return [
+        subtest.id for subtest in sweep.next_batch(SweepTestCase, sweep.subtests[start])
+    ]
+
+
+class TestSweep(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_same_setter(self):
+        """A range on a single setter puts one value per batch."""
+        sweep = make_sweep([("SP", "RB")] * 3)
+        self.assertEqual(["test-0-0-0"], batch_ids(sweep, 0))
+        self.assertEqual(["test-0-0-2"], batch_ids(sweep, 2))
+
+    def test_readback_only(self):
+        """Subtests without setter all share a batch."""
+        sweep = make_sweep([(None, "RB")] * 4)
+        self.assertEqual(4, len(batch_ids(sweep, 0)))
+
+    def test_reused_pv(self):
+        """A batch ends before a setter already put or read."""
+        sweep = make_sweep([("SP:A", "RB:A"), ("SP:B", "RB:B"), ("RB:A", None)])
+        self.assertEqual(["test-0-0-0", "test-0-0-1"], batch_ids(sweep, 0))
+        self.assertEqual(["test-0-0-1", "test-0-0-2"], batch_ids(sweep, 1))
+
+    def test_skipped(self):
+        """Skipped subtests are left out of batches."""
+        sweep = make_sweep([("SP:A", None), ("SP:B", None), ("SP:C", None)])
+        SweepTestCase.skip("test-0-0-1", "skipped")
+        self.assertEqual(["test-0-0-0", "test-0-0-2"], batch_ids(sweep, 0))
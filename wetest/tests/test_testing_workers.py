@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test testing.workers module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from queue import Queue
+
+from p4p.nt import NTScalar
+from p4p.server import Server
+from p4p.server.thread import SharedPV
+
+from wetest.command_line import generate_tests
+from wetest.pvs.core import PVConnection
+from wetest.pvs.enexar import ACQUIRE_SUFFIX, enexar_logger
+from wetest.pvs import sim
+from wetest.testing.generator import TestData
+from wetest.testing.reader import MAJOR, MINOR, BUGFIX
+from wetest.testing.reader import MacrosManager
+from wetest.testing.runner import NativeResult
+from wetest.testing.selectable_tests import SelectableTestCase, SelectableTestSuite
+from wetest.testing.selectable_tests import SelectableTestResult
+from wetest.testing.workers import WorkerPool, split_shards
+
+# PV names not to be served by anything else
+PREFIX = "WETEST%d:" % os.getpid()
+
+SCENARIO = """
+version: {major: %d, minor: %d, bugfix: %d}
+config:
+    name: worker
+    type: functional
+    prefix: "%s"
+tests:
+    - name: logged
+      setter: SP
+      getter: RB
+      values: [1]
+      logger:
+          - {pv: "%sRB", server: "%sSRV:", path: data}
+""" % (
+    MAJOR,
+    MINOR,
+    BUGFIX,
+    PREFIX,
+    PREFIX,
+    PREFIX,
+)
+
+
+class ShardedTestCase(SelectableTestCase):
+    """Test methods split in shards."""
+
+    test_data = {}
+    func_backup = {}
+
+
+def make_suite(tests):
+    """Returns a SelectableTestSuite from (test id, setter, getter) tuples."""
+    suite = SelectableTestSuite()
+    for test_id, setter, getter in tests:
+        test_data = TestData(
+            test_title="test",
+            subtest_title="subtest",
+            test_id=test_id,
+            on_failure="continue",
+            setter=setter,
+            set_value=0,
+            getter=getter,
+            get_value=0,
+        )
+        ShardedTestCase.add_test(test_data, lambda self: None)
+        suite.add_selected_test(ShardedTestCase, test_id)
+    return suite
+
+
+class TestSplitShards(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def test_disjoint(self):
+        """Scenarios without common PVs are balanced between shards."""
+        suite = make_suite(
+            [("test-0-0-%d" % idx, "SP0:%d" % idx, None) for idx in range(3)]
+            + [("test-1-0-0", "SP1", None)]
+            + [("test-2-0-0", "SP2", None), ("test-2-0-1", "SP2", None)]
+        )
+        self.assertEqual(
+            [
+                ["test-0-0-0", "test-0-0-1", "test-0-0-2"],
+                ["test-2-0-0", "test-2-0-1"],
+                ["test-1-0-0"],
+            ],
+            split_shards(suite, 3),
+        )
+        self.assertEqual(
+            [
+                ["test-0-0-0", "test-0-0-1", "test-0-0-2"],
+                ["test-1-0-0", "test-2-0-0", "test-2-0-1"],
+            ],
+            split_shards(suite, 2),
+        )
+
+    def test_overlapping(self):
+        """Scenarios sharing a PV, even through another one, share a shard."""
+        suite = make_suite(
+            [
+                ("test-0-0-0", "SP:A", None),
+                ("test-1-0-0", "SP:B", "SP:C"),
+                ("test-2-0-0", "SP:C", "SP:A"),
+                ("test-3-0-0", "SP:D", None),
+            ]
+        )
+        self.assertEqual(
+            [["test-0-0-0", "test-1-0-0", "test-2-0-0"], ["test-3-0-0"]],
+            split_shards(suite, 4),
+        )
+
+
+class TestWorkerPool(unittest.TestCase):
+    """Module's Unit Tests."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.scenario = os.path.join(directory, "scenario.yaml")
+        with open(self.scenario, "w") as yaml_file:
+            yaml_file.write(SCENARIO)
+
+        # serve the scenario PVs, and an ENeXAr server rejecting requests
+        ioc = sim.SimulatedIOC(sim.tests_from_scenarios([self.scenario]), latency=0)
+        pvs = sim.PvaBackend(ioc, ioc.names("PVA")).pvs
+        enexar = SharedPV(nt=NTScalar("?"), initial=False)
+
+        @enexar.rpc
+        def reject(pv, op):
+            op.done(error="rejected")
+
+        pvs[PREFIX + "SRV:" + ACQUIRE_SUFFIX] = enexar
+        server = Server(providers=[pvs])
+        self.addCleanup(server.stop)
+
+        SelectableTestResult.queue_to_gui = Queue()
+        SelectableTestResult.queue_to_pm = None
+        SelectableTestResult.queue_to_runner = Queue()
+        PVConnection.latencies.clear()
+        self.addCleanup(PVConnection.latencies.clear)
+        self.addCleanup(enexar_logger.failures.clear)
+
+    def test_worker_records(self):
+        """Workers send back their outcomes, PV latencies and ENeXAr failures."""
+        suite, _ = generate_tests(scenarios=[self.scenario], macros_mgr=MacrosManager())
+        generation = {
+            "scenarios": [self.scenario],
+            "macros": {},
+            "propagate": False,
+            "cache": False,
+        }
+        result = WorkerPool(suite, 2, generation).run(NativeResult())
+
+        self.assertTrue(result.wasSuccessful())
+        self.assertEqual(1, result.testsRun)
+        latencies = PVConnection.latencies.to_dict()
+        self.assertEqual(1, latencies["pvs"][PREFIX + "SP"]["put"]["count"])
+        self.assertIn("rpc", latencies["protocols"]["PVA"])
+        self.assertEqual(["test-0-0-0"], [f.test_id for f in enexar_logger.failures])
+        self.assertIn("rejected", enexar_logger.failures[0].message)
+        gui_messages = []
+        while not SelectableTestResult.queue_to_gui.empty():
+            gui_messages.append(SelectableTestResult.queue_to_gui.get_nowait())
+        self.assertIn(enexar_logger.failures[0], gui_messages)